@@ -1,10 +1,33 @@
 #!/bin/bash
 
-# Usage: ./init-repository.sh /path/to/config
+# Usage: ./init-repository.sh /path/to/config /path/to/partitions
 
 CONFIG_DIR=${1:-/config}
 CONFIG_FILE="$CONFIG_DIR/repository-template.ttl"
 
+# Dataset partitions written by data_converter_csv_to_nt.py; each line of the
+# manifest is "<file> <named graph> <content hash>"
+PARTITIONS_DIR=${2:-/import/partitions}
+MANIFEST="$PARTITIONS_DIR/manifest.txt"
+
+REPOSITORY_URL="http://localhost:7200/repositories/football"
+# Hash of the last imported version of each partition, kept in the repository itself
+PARTITIONS_GRAPH="http://football.org/graph/partitions"
+HASH_PREDICATE="http://football.org/rel/contentHash"
+
+# Prints "<graph>,<hash>" for every imported partition (after a CSV header)
+get_imported_hashes() {
+  curl -s -H "Accept: text/csv" \
+    --data-urlencode "query=SELECT ?graph ?hash WHERE { GRAPH <$PARTITIONS_GRAPH> { ?graph <$HASH_PREDICATE> ?hash } }" \
+    "$REPOSITORY_URL" | tr -d '\r'
+}
+
+forget_partition() {
+  curl -s -f -o /dev/null \
+    --data-urlencode "update=DELETE WHERE { GRAPH <$PARTITIONS_GRAPH> { <$1> <$HASH_PREDICATE> ?hash } }" \
+    "$REPOSITORY_URL/statements"
+}
+
 # Wait for GraphDB to start
 echo "Waiting for GraphDB to start..."
 until curl -s -f -o /dev/null "http://localhost:7200/rest/repositories"
@@ -45,8 +68,8 @@ if [ "$REPO_EXISTS" -eq "0" ]; then
     echo "Failed to create repository"
     exit 1
   fi
-else
-  echo "Repository 'football' already exists"
+elif [ -z "$(get_imported_hashes | tail -n +2)" ]; then
+  echo "Repository 'football' already exists, without dataset partitions"
   echo "Deleting existing repository to avoid duplicates..."
   curl -X DELETE "http://localhost:7200/rest/repositories/football"
   
@@ -71,6 +94,8 @@ else
     echo "Failed to delete repository"
     exit 1
   fi
+else
+  echo "Repository 'football' already exists, only changed partitions will be imported"
 fi
 
 # Import the ontology to the football repository using REST API
@@ -94,25 +119,48 @@ else
   exit 1
 fi
 
-# Import the dataset to the football repository using REST API
-echo "Importing dataset from server file..."
-IMPORT_DATASET=$(curl -s -o /dev/null -w "%{http_code}" -X POST \
-  -H "Content-Type: application/json" \
-  -d '{
-    "fileNames": [
-      "football_rdf_data.nt"
-    ]
-  }' \
-    "http://localhost:7200/rest/repositories/football/import/server")
-
-if [ "$IMPORT_DATASET" -eq "202" ]; then
-    echo ""
-    echo "Dataset import initiated successfully"
-    # Wait for import to complete
-    sleep 5
-else
-  echo "Failed to import dataset"
+# Import the dataset partitions that changed since the last import, each one
+# replacing its named graph
+echo "Importing dataset partitions..."
+if [ ! -f "$MANIFEST" ]; then
+  echo "ERROR: $MANIFEST not found, run data_converter_csv_to_nt.py first"
   exit 1
 fi
 
+IMPORTED=$(get_imported_hashes)
+while read -r FILE GRAPH HASH; do
+  [ -z "$FILE" ] && continue
+  if echo "$IMPORTED" | grep -qx "$GRAPH,$HASH"; then
+    echo "$FILE unchanged, skipped"
+    continue
+  fi
+
+  IMPORT_PARTITION=$(curl -s -o /dev/null -w "%{http_code}" -X PUT \
+    -H "Content-Type: application/n-triples" \
+    --data-binary "@$PARTITIONS_DIR/$FILE" \
+    "$REPOSITORY_URL/rdf-graphs/service?graph=$GRAPH")
+  case "$IMPORT_PARTITION" in
+    2??) ;;
+    *) echo "Failed to import $FILE ($IMPORT_PARTITION)"; exit 1 ;;
+  esac
+
+  forget_partition "$GRAPH" && curl -s -f -o /dev/null \
+    --data-urlencode "update=INSERT DATA { GRAPH <$PARTITIONS_GRAPH> { <$GRAPH> <$HASH_PREDICATE> \"$HASH\" } }" \
+    "$REPOSITORY_URL/statements"
+  if [ $? -ne 0 ]; then
+    echo "Failed to record the hash of $FILE"
+    exit 1
+  fi
+  echo "$FILE imported into <$GRAPH>"
+done < "$MANIFEST"
+
+# Drop the partitions that are no longer built (e.g. a removed season)
+echo "$IMPORTED" | tail -n +2 | while IFS=, read -r GRAPH HASH; do
+  if ! grep -q " $GRAPH " "$MANIFEST"; then
+    curl -s -o /dev/null -X DELETE "$REPOSITORY_URL/rdf-graphs/service?graph=$GRAPH"
+    forget_partition "$GRAPH"
+    echo "Removed <$GRAPH>, no longer in the manifest"
+  fi
+done
+
 echo "Setup complete!"
@@ -1,21 +1,51 @@
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import argparse
 import pandas as pd
 from rdflib import Graph, URIRef, Literal, Namespace
 from rdflib.namespace import RDF
 from urllib.parse import quote
 from unidecode import unidecode
+from concurrent.futures import ProcessPoolExecutor
+from team_index import TeamIndex
+
+parser = argparse.ArgumentParser(description='Convert the players CSV files into RDF (N-Triples), one partition per season')
+parser.add_argument('--force', action='store_true', help='Rebuild every partition, even the ones whose inputs did not change')
+parser.add_argument('--n3', action='store_true', help='Also write import/football_rdf_data.n3 with all the partitions')
+parser.add_argument('--report', default='resolution_report.csv', help='CSV file for the ambiguous and failed club/country matches')
+parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processes converting the leagues of a season in parallel (1 converts them serially)')
+
+# Uma época por ficheiro players_data_light-<época>.csv
+SEASON_FILE_PREFIX = 'players_data_light-'
+# Fotos de cada época (output do scraping/players_photo_scraping.py), por defeito players-<época>.csv
+PHOTO_FILES = {'2024_2025': 'players.csv'}
+
+# Partições: entities.nt (countries, leagues e clubs) e season_<época>.nt (players e stats da época),
+# cada uma importada para o seu named graph. O manifest guarda o hash dos inputs de cada partição.
+# Só a época atual (a mais recente) tem os clubs e as stats nos próprios players e clubs; as anteriores
+# ficam em nós por época (ver get_season_entity_id), para a app continuar a ver um só valor de cada.
+PARTITIONS_DIR = 'import/partitions'
+MANIFEST_PATH = os.path.join(PARTITIONS_DIR, 'manifest.txt')
+GRAPH_BASE_URL = 'http://football.org/graph/'
+
+# O código do conversor também é um input de todas as partições
+CONVERTER_FILES = ['data_converter_csv_to_nt.py', 'team_index.py']
+
+# Shards de uma época (um por league) antes de serem juntados na partição
+SHARDS_DIR = os.path.join(PARTITIONS_DIR, 'shards')
 
-df_main = pd.read_csv('players_data_light-2024_2025.csv')
-df_colors_logos = pd.read_csv('teams.csv')
-df_clubs_info = pd.read_csv('venues.csv')
-df_players_info = pd.read_csv('players.csv')
-
-players = set()
-clubs = set()
-leagues = set()
 countries = set()
 
+# Preenchidos pela resolução no teams.csv e venues.csv (ver main)
 league_code_to_country_code = {}
 club_name_to_club_id = {}
+country_rows = {}
+club_rows = {}
+venue_rows = {}
 
 BASE_URL = 'http://football.org/'
 ns_ent = Namespace(BASE_URL + 'ent/')
@@ -24,7 +54,44 @@ ns_stat = Namespace(BASE_URL + 'stat/')
 ns_stat_type = Namespace(BASE_URL + 'stat_type/')
 ns_ont = Namespace(BASE_URL + 'ontology#')
 
-g = Graph()
+# Linhas escritas de cada vez no ficheiro de output
+CHUNK_SIZE = 10000
+
+class NTriplesWriter:
+    """
+    Escreve os triplos num ficheiro N-Triples em blocos de CHUNK_SIZE linhas,
+    em vez de guardar o grafo todo em memória até ao fim.
+    O ficheiro só substitui o anterior no close, para uma partição nunca ficar a meio.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path + '.tmp', 'w', encoding='utf-8')
+        self.buffer = []
+        self.count = 0
+
+    def add(self, triple):
+        s, p, o = triple
+        self.buffer.append(f"{s.n3()} {p.n3()} {o.n3()} .\n")
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.file.writelines(self.buffer)
+        self.count += len(self.buffer)
+        self.buffer = []
+
+    def add_file(self, path, count):
+        """Copia para o output um ficheiro N-Triples já escrito (um shard) com count triplos."""
+        self.flush()
+        with open(path, encoding='utf-8') as file:
+            shutil.copyfileobj(file, self.file)
+        self.count += count
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        os.replace(self.path + '.tmp', self.path)
+
 
 def convert_stat_name_to_id(stat_name):
     return stat_name.lower().replace('%', '_pct').replace('+', '_plus_')
@@ -84,151 +151,132 @@ stat_mappings = {
 }
 
 def get_country_info(country_abrv):
-    # pesquisar no df_colors_logos pelo country na coluna 'abbreviation'
+    # linha do teams.csv do country, pela coluna 'abbreviation' (ver team_index.py)
     # country_name --> 'name'
     # country_flag --> 'logoURL'
-    country_info = df_colors_logos[(df_colors_logos['abbreviation'] == country_abrv) & (~df_colors_logos['name'].str.contains(r'U(?:17|19|20|21|23)', na=False))]
-    if (len(country_info) > 1):
-        country_info = country_info[country_info['logoURL'].notna()]
-    if (len(country_info) > 1):
-        country_info = country_info[country_info['logoURL'].str.contains('countries')]
-    country_name = country_info['name'].values[0]
-    country_flag = country_info['logoURL'].values[0]
-
-    if (country_abrv == 'GLP'): # este estava a dar erro, corrigi manualmente
-        country_name = 'Guadalupe'
-        country_flag = 'https://upload.wikimedia.org/wikipedia/commons/thumb/7/7d/Flag_of_Guadeloupe_%28local%29_variant.svg/220px-Flag_of_Guadeloupe_%28local%29_variant.svg.png'
-
-    return country_name, country_flag
+    country_info = country_rows[country_abrv]
+    return country_info['name'], country_info['logoURL']
 
 def convert_entity_name_to_id(entity_name):
     return quote(unidecode(entity_name.lower().replace(' ', '_')))
 
-def check_player_exists(player_name):
-    player_name_unidecoded = unidecode(player_name)
-    if player_name_unidecoded not in players:
-        players.add(player_name_unidecoded)
-        return False, convert_entity_name_to_id(player_name)
-    else:
-        # se o player já existe, é necessário verificar se é um falso duplicado
-        # verificar se o 'Born' e 'Nation' são iguais
-        df_main['Player_unidecoded'] = df_main['Player'].apply(unidecode)
-        repeated_player_info = df_main[df_main['Player_unidecoded'] == unidecode(player_name_unidecoded)]
-        born_years = repeated_player_info['Born'].unique()
-        nation = repeated_player_info['Nation'].unique()
-        if len(born_years) > 1 or len(nation) > 1 or player_name == 'Vitinha':  # Há 2 Vitinha da mesma idade e país
-            # são jogadores diferentes, precisa de id diferente
-            return False, convert_entity_name_to_id(player_name)+"_2"
-        else:
-            return True, convert_entity_name_to_id(player_name)
-
-def update_stat_on_graph(uri, stat, new_value, g):
-    stat_id = convert_stat_name_to_id(stat)
-    stat_predicate = URIRef(ns_stat + stat_id)
-
-    if stat_id in ['pka', 'pksv', 'saves', 'ga', 'cs']: # por alguma razao estes estao a vir com casas decimais e deveriam ser int
-        new_value = int(new_value)
-
-    current_value = g.value(uri, stat_predicate)
-    if (type(new_value)) == int or new_value is None:
-        current_value = int(current_value if current_value is not None else 0)
-    else:
-        current_value = float(current_value if current_value is not None else 0)
-    updated_value = current_value + new_value
-    g.set((uri, stat_predicate, Literal(updated_value)))
-
-for index, row in df_main.iterrows():
-    club = row['Squad']
-    league = row['Comp']
-    country_abrv = row['Nation'].split(' ')[-1]
-
+def get_club_id(club_info):
+    club_id = club_info['shortDisplayName']
+    if "'" in club_id:
+        club_id = club_info['name']
+    return convert_entity_name_to_id(club_id)
+
+# Stats que vêm com casas decimais mas deveriam ser int
+INT_STATS = ['pka', 'pksv', 'saves', 'ga', 'cs']
+
+MISSING_PHOTO_URL = "https://resources.premierleague.com/premierleague/photos/players/250x250/Photo-Missing.png"
+
+def add_country(g, country_abrv):
+    if country_abrv in countries:
+        return
+    countries.add(country_abrv)
+
+    country_name, country_flag = get_country_info(country_abrv)
+
+    country_uri = URIRef(ns_ent + country_abrv)
+    g.add((country_uri, ns_rel.abrv, Literal(country_abrv)))
+    g.add((country_uri, ns_rel.name, Literal(country_name)))
+    g.add((country_uri, ns_rel.flag, Literal(country_flag)))
+    g.add((country_uri, RDF.type, ns_ont.Country))  # FIXED
+
+def get_season_entity_id(entity_id, season):
+    """Id do nó com os dados de um player ou club numa época anterior (ex.: max_aarons__2023_2024)."""
+    return f'{entity_id}__{season}'
+
+def add_season_entity(g, entity_id, season, season_class, relation):
+    """Cria o nó de uma época anterior de um player ou club e devolve-o."""
+    season_uri = URIRef(ns_ent + get_season_entity_id(entity_id, season))
+    g.add((season_uri, RDF.type, season_class))
+    g.add((season_uri, relation, URIRef(ns_ent + entity_id)))
+    g.add((season_uri, ns_rel.season, Literal(season)))
+    return season_uri
+
+def add_stats(g, df_main, sums, applies):
+    """
+    Escreve as stats somadas por entidade (linhas de sums, indexadas pelo id da entidade).
+    applies indica que entidades têm cada stat.
+    """
+    for stat in sums.columns:
+        stat_id = convert_stat_name_to_id(stat)
+        stat_predicate = URIRef(ns_stat + stat_id)
+        is_int = stat_id in INT_STATS or pd.api.types.is_integer_dtype(df_main[stat])
+        for entity_id, value in sums.loc[applies[stat], stat].items():
+            g.add((URIRef(ns_ent + entity_id), stat_predicate, Literal(int(value) if is_int else float(value))))
+
+def read_file(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+def hash_inputs(*inputs):
+    """Hash do conteúdo dos inputs de uma partição (bytes ou str), e do código do conversor."""
+    digest = hashlib.sha256()
+    for part in [*map(read_file, CONVERTER_FILES), *inputs]:
+        digest.update(part if isinstance(part, bytes) else part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def read_manifest():
+    """Devolve {ficheiro: (graph, hash)} das partições do último build."""
+    manifest = {}
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH, encoding='utf-8') as file:
+            for line in file:
+                file_name, graph, digest = line.split()
+                manifest[file_name] = (graph, digest)
+    return manifest
+
+
+def write_entities(g, df_all):
     # --- Countries ---
-    if country_abrv not in countries:
-        countries.add(country_abrv)
-
-        country_name, country_flag = get_country_info(country_abrv)
-        
-        country_uri = URIRef(ns_ent + country_abrv)
-        g.add((country_uri, ns_rel.abrv, Literal(country_abrv)))
-        g.add((country_uri, ns_rel.name, Literal(country_name)))
-        g.add((country_uri, ns_rel.flag, Literal(country_flag)))
-        g.add((country_uri, RDF.type, ns_ont.Country))  # FIXED
+    for country_abrv in df_all['Nation'].str.split(' ').str[-1].unique():
+        add_country(g, country_abrv)
 
     # --- Leagues ---
-    if league not in leagues:
+    for league in df_all['Comp'].unique():
         # verificar se o country da league já existe
-        # se não existir, pesquisar no df_main 'Nation' por uma linha com o cod pequeno para obter o cod grande
-        # pesquisar no df_colors_logos pelo country na coluna 'abbreviation', usando o cod grande
         # se ja existir, é só adicionar a liga
         # league_name --> 'Comp'
         # league_country --> cod grande
         league_id = league.split(' ')[0]
         league_name = ' '.join(league.split(' ')[1:])
-        country_id = df_main[df_main['Nation'].str.contains(f'{league_id} ')]['Nation'].values[0].split(' ')[-1]
-        if country_id not in countries:
-            country_name, country_flag = get_country_info(country_id)
-            country_uri = URIRef(ns_ent + country_id)
-            g.add((country_uri, ns_rel.abrv, Literal(country_id)))
-            g.add((country_uri, ns_rel.name, Literal(country_name)))
-            g.add((country_uri, ns_rel.flag, Literal(country_flag)))
-            g.add((country_uri, RDF.type, ns_ont.Country))  # FIXED
+        country_id = league_code_to_country_code[league_id]
+        add_country(g, country_id)
 
         league_uri = URIRef(ns_ent + league_id)
         g.add((league_uri, ns_rel.name, Literal(league_name)))
         g.add((league_uri, ns_rel.country, URIRef(ns_ent + country_id)))
         g.add((league_uri, RDF.type, ns_ont.League))  # FIXED
 
-        leagues.add(league)
-        league_code_to_country_code[league_id] = country_id
-
     # --- Clubs ---
-    if club not in clubs:
-        club_original_name = club
-        if 'Utd' in club:
-            club = club.replace('Utd', 'United')
-        if 'Paris' in club:
-            club = 'PSG'
-        if 'Wolves' in club:
-            club = 'Wolverhampton'
-
-        # Pesquisar no df_colors_logos pelo club na coluna 'name'
-        # club_id              --> 'abbreviation'
+    # a league de um club é a da época mais recente
+    for club, league in df_all.drop_duplicates('Squad', keep='last')[['Squad', 'Comp']].itertuples(index=False):
+        # Linha do teams.csv do club (ver team_index.py)
         # club_name            --> 'name'
         # club_color           --> 'color'
         # club_alternate_color --> 'alternateColor'
         # club_logo            --> 'logoURL'
-        club_info = df_colors_logos[df_colors_logos['name'].str.contains(club, na=False)]
-        if (len(club_info) == 0):
-            club_info = df_colors_logos[df_colors_logos['name'].str.contains(club, na=False)]
-        if (len(club_info) == 0):
-            club_info = df_colors_logos[df_colors_logos['shortDisplayName'].str.contains(club, na=False)]
-        if (len(club_info) == 0):
-            club_name_parts = club.split(' ')
-            for part in club_name_parts:
-                club_info = df_colors_logos[df_colors_logos['name'].str.contains(part, na=False)]
-                if (len(club_info) == 1):
-                    break
-
-        club_id = club_info['shortDisplayName'].values[0]
-        club_abrv = club_info['abbreviation'].values[0]
-        club_name = club_info['name'].values[0]
-        club_color = club_info['color'].values[0]
-        club_alternate_color = club_info['alternateColor'].values[0]
-        club_logo = club_info['logoURL'].values[0]
-
-        num_to_search_location = club_info['venueId'].values[0] # Usar este ID para pesquisar no df_clubs_info
-        club_location = df_clubs_info[df_clubs_info['venueId'] == num_to_search_location]
-        club_stadium = club_location['fullName'].values[0]
-        club_city = club_location['city'].values[0]
+        club_info = club_rows[club]
+        club_abrv = club_info['abbreviation']
+        club_name = club_info['name']
+        club_color = club_info['color']
+        club_alternate_color = club_info['alternateColor']
+        club_logo = club_info['logoURL']
+
+        # Estádio pelo 'venueId' do club, no venues.csv
+        club_location = venue_rows[club]
+        club_stadium = club_location['fullName']
+        club_city = club_location['city']
 
         # Ir buscar o country_id já existente
         league_id = league.split(' ')[0]
         club_country_id = league_code_to_country_code[league_id]
-    
-        if "'" in club_id:
-            club_id = club_name
-        club_id = convert_entity_name_to_id(club_id)
-        club_uri = URIRef(ns_ent + club_id)
+
+        club_uri = URIRef(ns_ent + club_name_to_club_id[club])
         g.add((club_uri, ns_rel.name, Literal(club_name)))
         g.add((club_uri, ns_rel.abrv, Literal(club_abrv)))
         g.add((club_uri, ns_rel.color, Literal(club_color)))
@@ -240,77 +288,272 @@ for index, row in df_main.iterrows():
         g.add((club_uri, ns_rel.league, URIRef(ns_ent + league_id)))
         g.add((club_uri, RDF.type, ns_ont.Club))  # FIXED
 
-        clubs.add(club_original_name)
-        club_name_to_club_id[club_original_name] = club_id
 
+def prepare_season(df_main, df_players_info):
+    """Colunas de cada linha da época que não dependem das outras linhas (country, club, foto, ...)."""
+    df_main = df_main.copy()
+    df_main['country_abrv'] = df_main['Nation'].str.split(' ').str[-1]
+    df_main['club_id'] = df_main['Squad'].map(club_name_to_club_id)
+    df_main['player_key'] = df_main['Player'].map(unidecode)
+    df_main['born'] = pd.to_numeric(df_main['Born'], errors='coerce').fillna(0).astype(int)
 
+    # Photo URL
+    df_main = df_main.merge(df_players_info[['Rk', 'UrlPhoto']], on='Rk', how='left')
+    df_main['photo_url'] = df_main['UrlPhoto'].mask(df_main['UrlPhoto'].isna() | df_main['UrlPhoto'].str.contains('.jpg', regex=False, na=False), MISSING_PHOTO_URL)
+    return df_main
+
+def get_stat_values(df_main):
+    """Devolve (valores das stats de cada linha, stats que cada linha tem)."""
+    stat_values = df_main[list(stat_mappings)].copy()
+    stat_values['Save%'] = stat_values['Save%'].fillna(0.0) # GK que estão com coluna vazia em vez de 0
+    stat_values['CS%'] = stat_values['CS%'].fillna(df_main['CS'] / df_main['MP'] * 100)
+
+    # Stats de cada linha: as de GK para os guarda-redes, as de PLAYER para os restantes
+    is_gk = df_main['Pos'].str.split(',').str[0] == 'GK'
+    stat_applies = pd.DataFrame({
+        stat: is_gk & (GK in mapping["entities"]) | ~is_gk & (PLAYER in mapping["entities"])
+        for stat, mapping in stat_mappings.items()
+    })
+    return stat_values.where(stat_applies), stat_applies
+
+def write_players(g, df_main, past_season=None):
+    """
+    Escreve os players (e as suas stats) das linhas de df_main, que têm de incluir todas as linhas de cada player.
+    Numa época anterior (past_season), as posições, os clubs e as stats ficam no nó do player nessa época.
+    """
     # --- Players ---
         # player_id
         # player_name --> 'Player'
         # player_pos --> 'Pos'
         # player_year --> 'Born'
         # player_nation --> 'Nation' (country_abrv)
-        # player_club --> 'Squad' (club_name_to_club_id)
-    player_name = row['Player']
-    player_exists, player_id = check_player_exists(player_name)
-    player_uri = URIRef(ns_ent + player_id)
-    player_pos = row['Pos'].split(',')
-    player_club = club_name_to_club_id[row['Squad']]
-
-    if not player_exists:
-        try:
-            player_year = int(row['Born'])
-        except:
-            player_year = 0
-        player_nation = country_abrv
-
-        g.add((player_uri, ns_rel.name, Literal(player_name)))
-        for pos in player_pos:
-            g.add((player_uri, ns_rel.position, Literal(pos)))
-        g.add((player_uri, ns_rel.born, Literal(player_year)))
-        g.add((player_uri, ns_rel.nation, URIRef(ns_ent + player_nation)))
-
-    else:
-        # indicar que já saiu do clube anterior
-        club_registed = g.value(player_uri, ns_rel.club)
-        g.remove((player_uri, ns_rel.club, club_registed))
-        g.add((player_uri, ns_rel.past_club, club_registed))
-
-        # adicionar pos nova se necessário
-        actual_pos = {str(pos) for pos in g.objects(player_uri, ns_rel.position)}
-        new_pos = set(player_pos)
-        diff_pos = new_pos.difference(actual_pos)
-        for pos in diff_pos:
+        # player_club --> 'Squad' (club_id)
+    # Um jogador que aparece em várias linhas mudou de clube, a não ser que seja um falso duplicado:
+    # jogadores com o mesmo nome (sem acentos) mas 'Born' ou 'Nation' diferentes são jogadores diferentes
+    repeated = df_main.duplicated('player_key')
+    homonyms = df_main.groupby('player_key')[['Born', 'Nation']].nunique(dropna=False).gt(1).any(axis=1)
+    different_player = df_main['player_key'].map(homonyms) | (df_main['Player'] == 'Vitinha')  # Há 2 Vitinha da mesma idade e país
+    df_main = df_main.assign(
+        player_id=df_main['Player'].map(convert_entity_name_to_id).where(~(repeated & different_player), lambda ids: ids + '_2'),
+        player_moved=repeated & ~different_player,
+    )
+
+    # nome, ano e país vêm da primeira linha do jogador; o clube atual da última
+    player_info = df_main[~df_main['player_moved']].groupby('player_id', sort=False).agg(
+        name=('Player', 'unique'), born=('born', 'unique'), nation=('country_abrv', 'unique')
+    )
+    player_clubs = df_main.groupby('player_id', sort=False).agg(
+        clubs=('club_id', list), moved=('player_moved', 'any'), photo_url=('photo_url', 'last')
+    )
+    player_positions = df_main.assign(Pos=df_main['Pos'].str.split(',')).explode('Pos').groupby('player_id', sort=False)['Pos'].unique()
+
+    for player_id, info in player_info.iterrows():
+        player_uri = URIRef(ns_ent + player_id)
+        if past_season:
+            player_uri = add_season_entity(g, player_id, past_season, ns_ont.PlayerSeason, ns_rel.player)
+        for player_name in info['name']:
+            g.add((player_uri, ns_rel.name, Literal(player_name)))
+        if not past_season:
+            for player_year in info['born']:
+                g.add((player_uri, ns_rel.born, Literal(int(player_year))))
+            for player_nation in info['nation']:
+                g.add((player_uri, ns_rel.nation, URIRef(ns_ent + player_nation)))
+        for pos in player_positions[player_id]:
             g.add((player_uri, ns_rel.position, Literal(pos)))
 
-    club_uri = URIRef(ns_ent + player_club)
-    g.add((player_uri, ns_rel.club, club_uri))
-    g.add((player_uri, RDF.type, ns_ont.Player))  # already correct
-
-    # Photo URL
-    photo = df_players_info[df_players_info['Rk'] == row['Rk']]
-    photo_url = photo['UrlPhoto'].values[0]
-    if pd.isna(photo_url) or '.jpg' in photo_url:
-        photo_url = "https://resources.premierleague.com/premierleague/photos/players/250x250/Photo-Missing.png"   
-    g.set((player_uri, ns_rel.photo_url, Literal(photo_url)))
-
-    # --- Stats ---
-    main_pos = player_pos[0]
-    for stat in stat_mappings:
-        # Player stats
-        if (main_pos == "GK" and GK in stat_mappings[stat]["entities"] or main_pos != "GK" and PLAYER in stat_mappings[stat]["entities"]):
-            stat_value = row[stat]
-            if (pd.isna(stat_value)):
-                if (stat == "Save%"):
-                    stat_value = 0.0 # GK que estão com coluna vazia em vez de 0
-                if (stat == "CS%"):
-                    stat_value = row['CS'] / row['MP'] * 100
-            update_stat_on_graph(player_uri, stat, stat_value, g)
-
-            # Team stats
-            if (TEAM in stat_mappings[stat]["entities"]):
-                update_stat_on_graph(club_uri, stat, stat_value, g)
-
-
-g.serialize(destination="import/football_rdf_data.nt", format="nt", encoding="utf-8")
-g.serialize(destination="import/football_rdf_data.n3", format="n3", encoding="utf-8")
\ No newline at end of file
+        # se mudou de clube, o clube atual é o da última linha e os anteriores ficam como past_club
+        player_club_ids = player_clubs.at[player_id, 'clubs']
+        if player_clubs.at[player_id, 'moved']:
+            for past_club_id in set(player_club_ids[:-1]):
+                g.add((player_uri, ns_rel.past_club, URIRef(ns_ent + past_club_id)))
+            player_club_ids = player_club_ids[-1:]
+        for club_id in set(player_club_ids):
+            g.add((player_uri, ns_rel.club, URIRef(ns_ent + club_id)))
+        if not past_season:
+            g.add((player_uri, RDF.type, ns_ont.Player))  # already correct
+            g.add((player_uri, ns_rel.photo_url, Literal(player_clubs.at[player_id, 'photo_url'])))
+
+    # Player stats (somadas para quem jogou em vários clubes)
+    entity_ids = df_main['player_id']
+    if past_season:
+        entity_ids = entity_ids.map(lambda player_id: get_season_entity_id(player_id, past_season))
+    stat_values, stat_applies = get_stat_values(df_main)
+    add_stats(
+        g, df_main,
+        stat_values.groupby(entity_ids, sort=False).sum(),
+        stat_applies.groupby(entity_ids, sort=False).any(),
+    )
+
+def write_club_stats(g, df_main, past_season=None):
+    """
+    Escreve as stats somadas dos clubs das linhas de df_main, que têm de incluir todas as linhas de cada club.
+    Numa época anterior (past_season), as stats ficam no nó do club nessa época.
+    """
+    entity_ids = df_main['club_id']
+    if past_season:
+        for club_id in entity_ids.unique():
+            add_season_entity(g, club_id, past_season, ns_ont.ClubSeason, ns_rel.club)
+        entity_ids = entity_ids.map(lambda club_id: get_season_entity_id(club_id, past_season))
+    stat_values, stat_applies = get_stat_values(df_main)
+    team_stats = [stat for stat, mapping in stat_mappings.items() if TEAM in mapping["entities"]]
+    add_stats(
+        g, df_main,
+        stat_values[team_stats].groupby(entity_ids, sort=False).sum(),
+        stat_applies[team_stats].groupby(entity_ids, sort=False).any(),
+    )
+
+
+def get_shared(df_main, column):
+    """Valores de column (players ou clubs) que aparecem em mais de uma league."""
+    leagues_per_value = df_main.groupby(column)['Comp'].nunique()
+    return set(leagues_per_value.index[leagues_per_value > 1])
+
+def convert_league_shard(path, df_league, shared_players, shared_clubs, past_season):
+    """
+    Converte as linhas de uma league para um shard (corre num processo do pool).
+    Os players e clubs que também aparecem noutras leagues ficam para o merge.
+    Devolve o número de triplos escritos.
+    """
+    g = NTriplesWriter(path)
+    write_players(g, df_league[~df_league['player_key'].isin(shared_players)], past_season)
+    write_club_stats(g, df_league[~df_league['club_id'].isin(shared_clubs)], past_season)
+    g.close()
+    return g.count
+
+def write_season(g, df_main, df_players_info, season, workers, current):
+    """
+    Escreve a partição de uma época. As leagues são quase independentes, por isso são convertidas em
+    paralelo, cada uma para um shard. No merge, os players que aparecem em mais de uma league (mudaram
+    de clube ou são homónimos) e os clubs em mais de uma league são convertidos com todas as suas
+    linhas, tal como numa conversão em série, e os shards são juntados à partição.
+    Se não for a época atual (current), os dados ficam nos nós da época (ver write_players).
+    """
+    past_season = None if current else season
+    df_main = prepare_season(df_main, df_players_info)
+    leagues = df_main['Comp'].unique()
+    if workers <= 1 or len(leagues) <= 1:
+        write_players(g, df_main, past_season)
+        write_club_stats(g, df_main, past_season)
+        return
+
+    shared_players = get_shared(df_main, 'player_key')
+    shared_clubs = get_shared(df_main, 'club_id')
+
+    os.makedirs(SHARDS_DIR, exist_ok=True)
+    shard_paths = [os.path.join(SHARDS_DIR, f"season_{season}_{league.split(' ')[0]}.nt") for league in leagues]
+    with ProcessPoolExecutor(max_workers=min(workers, len(leagues))) as pool:
+        counts = list(pool.map(
+            convert_league_shard,
+            shard_paths,
+            [df_main[df_main['Comp'] == league] for league in leagues],
+            [shared_players] * len(leagues),
+            [shared_clubs] * len(leagues),
+            [past_season] * len(leagues),
+        ))
+
+    # --- Merge ---
+    write_players(g, df_main[df_main['player_key'].isin(shared_players)], past_season)
+    write_club_stats(g, df_main[df_main['club_id'].isin(shared_clubs)], past_season)
+    for path, count in zip(shard_paths, counts):
+        g.add_file(path, count)
+        os.remove(path)
+    os.rmdir(SHARDS_DIR)
+
+
+def main():
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    seasons = {
+        path[len(SEASON_FILE_PREFIX):-len('.csv')]: pd.read_csv(path)
+        for path in sorted(glob.glob(f'{SEASON_FILE_PREFIX}*.csv'))
+    }
+    df_all = pd.concat(seasons.values(), ignore_index=True)
+    df_colors_logos = pd.read_csv('teams.csv')
+    df_clubs_info = pd.read_csv('venues.csv')
+
+    # --- Resolução dos countries, clubs e estádios no teams.csv e venues.csv (de todas as épocas) ---
+    team_index = TeamIndex(df_colors_logos, df_clubs_info)
+
+    # country da league: pesquisar no 'Nation' por uma linha com o cod pequeno para obter o cod grande
+    for league in df_all['Comp'].unique():
+        league_id = league.split(' ')[0]
+        league_code_to_country_code[league_id] = df_all[df_all['Nation'].str.contains(f'{league_id} ')]['Nation'].values[0].split(' ')[-1]
+
+    country_rows.update({
+        country_abrv: team_index.resolve_country(country_abrv)
+        for country_abrv in [*df_all['Nation'].str.split(' ').str[-1].unique(), *league_code_to_country_code.values()]
+    })
+    club_rows.update({club: team_index.resolve_club(club) for club in df_all['Squad'].unique()})
+    venue_rows.update({
+        club: team_index.get_venue(club_info['venueId'])
+        for club, club_info in club_rows.items() if club_info is not None
+    })
+
+    team_index.write_report(args.report)
+    failures = team_index.get_failures()
+    if failures:
+        raise SystemExit(f"{len(failures)} countries/clubs/venues could not be matched, see {args.report}: "
+                         + ', '.join(str(failure['query']) for failure in failures))
+
+    for club, club_info in club_rows.items():
+        club_name_to_club_id[club] = get_club_id(club_info)
+
+    # --- Partições ---
+    # (ficheiro, graph, hash dos inputs, função que escreve a partição)
+    # entities: teams.csv, venues.csv e os countries, leagues e clubs que aparecem nas épocas
+    entity_keys = df_all[['Nation', 'Comp', 'Squad']].drop_duplicates().sort_values(['Nation', 'Comp', 'Squad'])
+    partitions = [(
+        'entities.nt', GRAPH_BASE_URL + 'entities',
+        hash_inputs(read_file('teams.csv'), read_file('venues.csv'), entity_keys.to_csv(index=False)),
+        lambda g: write_entities(g, df_all),
+    )]
+    # épocas: o ficheiro da época, o das fotos, os ids dos clubs da época e se é a época atual
+    # (só os clubs da época, para que um club novo noutra época não mude este hash; ao juntar uma
+    # época nova, só a que era a atual é reescrita)
+    current_season = max(seasons)
+    for season, df_season in seasons.items():
+        photos_file = PHOTO_FILES.get(season, f'players-{season}.csv')
+        club_ids = json.dumps({squad: club_name_to_club_id[squad] for squad in df_season['Squad'].unique()}, sort_keys=True)
+        current = season == current_season
+        partitions.append((
+            f'season_{season}.nt', GRAPH_BASE_URL + 'season/' + season,
+            hash_inputs(read_file(f'{SEASON_FILE_PREFIX}{season}.csv'), read_file(photos_file), club_ids, 'current' if current else 'past'),
+            lambda g, season=season, df_season=df_season, photos_file=photos_file, current=current: write_season(g, df_season, pd.read_csv(photos_file), season, args.workers, current),
+        ))
+
+    os.makedirs(PARTITIONS_DIR, exist_ok=True)
+    previous = read_manifest()
+    for file_name, graph, digest, write_partition in partitions:
+        path = os.path.join(PARTITIONS_DIR, file_name)
+        if not args.force and previous.get(file_name) == (graph, digest) and os.path.exists(path):
+            print(f"{path}: inputs unchanged, skipped")
+            continue
+
+        g = NTriplesWriter(path)
+        write_partition(g)
+        g.close()
+        print(f"{path}: {g.count} triples written")
+
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as manifest:
+        for file_name, graph, digest, _ in partitions:
+            manifest.write(f"{file_name} {graph} {digest}\n")
+
+    # partições de épocas que deixaram de existir
+    for file_name in previous.keys() - {file_name for file_name, *_ in partitions}:
+        path = os.path.join(PARTITIONS_DIR, file_name)
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"{path}: season removed, deleted")
+
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+    if args.n3:
+        graph = Graph()
+        for file_name, *_ in partitions:
+            graph.parse(os.path.join(PARTITIONS_DIR, file_name), format='nt')
+        graph.serialize(destination="import/football_rdf_data.n3", format="n3", encoding="utf-8")
+
+
+if __name__ == '__main__':
+    main()
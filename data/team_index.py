@@ -0,0 +1,170 @@
+"""
+Resolução de países, clubes e estádios a partir do teams.csv e do venues.csv.
+
+Os índices são construídos uma só vez (palavras normalizadas do name e do
+shortDisplayName e abreviatura -> linhas do teams.csv; venueId -> estádio),
+por isso cada pesquisa é um acesso a um dict em vez de um str.contains sobre
+o ficheiro todo. As regras de correspondência não dependem do conversor e
+podem ser testadas com um DataFrame pequeno:
+
+    index = TeamIndex(pd.DataFrame([...]), pd.DataFrame([...]))
+    index.resolve_club('Eint Frankfurt')
+
+As correspondências ambíguas (mais de uma linha candidata, fica a primeira do
+ficheiro) e as falhadas ficam em index.report e podem ser escritas com
+write_report.
+"""
+
+import re
+import pandas as pd
+from unidecode import unidecode
+
+# Seleções jovens têm a mesma abreviatura que a seleção principal
+YOUTH_TEAM = re.compile(r'U(?:17|19|20|21|23)')
+
+# Nomes do players_data que não correspondem a nenhum nome do teams.csv
+CLUB_ALIASES = {
+    'Paris S-G': 'Paris Saint-Germain',
+    'Wolves': 'Wolverhampton',
+    'Inter': 'Internazionale',
+    'Eint Frankfurt': 'Eintracht Frankfurt',
+}
+
+# Abreviaturas usadas nos nomes do players_data
+TOKEN_ALIASES = {
+    'utd': 'united',
+}
+
+# Países que não estão (bem) no teams.csv, corrigidos manualmente
+COUNTRY_OVERRIDES = {
+    'GLP': {
+        'name': 'Guadalupe',
+        'logoURL': 'https://upload.wikimedia.org/wikipedia/commons/thumb/7/7d/Flag_of_Guadeloupe_%28local%29_variant.svg/220px-Flag_of_Guadeloupe_%28local%29_variant.svg.png',
+    },
+}
+
+
+def normalize_name(name):
+    """Nome sem acentos, em minúsculas e só com letras, números e espaços."""
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', unidecode(str(name)).lower()).split())
+
+def get_tokens(name):
+    return [TOKEN_ALIASES.get(token, token) for token in normalize_name(name).split()]
+
+
+class TeamIndex:
+    """Índices do teams.csv e do venues.csv, com o relatório das correspondências."""
+
+    def __init__(self, teams, venues):
+        self.teams = teams.reset_index(drop=True)
+        self.by_token = {}
+        self.by_short_token = {}
+        self.by_abbreviation = {}
+        self.report = []
+
+        for position, row in enumerate(self.teams.itertuples(index=False)):
+            if pd.notna(row.name):
+                for token in set(get_tokens(row.name)):
+                    self.by_token.setdefault(token, []).append(position)
+            if pd.notna(row.shortDisplayName):
+                for token in set(get_tokens(row.shortDisplayName)):
+                    self.by_short_token.setdefault(token, []).append(position)
+            if pd.notna(row.abbreviation):
+                self.by_abbreviation.setdefault(row.abbreviation, []).append(position)
+
+        self.venues = {
+            row['venueId']: row
+            for row in venues.to_dict('records')
+        }
+
+    def get_team(self, position):
+        return self.teams.iloc[position].to_dict()
+
+    def add_report(self, kind, query, status, rule, candidates):
+        self.report.append({
+            'type': kind,
+            'query': query,
+            'status': status,
+            'rule': rule,
+            'match': self.teams.at[candidates[0], 'name'] if candidates else None,
+            'candidates': ' | '.join(str(self.teams.at[position, 'name']) for position in candidates),
+        })
+
+    @staticmethod
+    def match_tokens(index, tokens):
+        """Posições (por ordem do ficheiro) das linhas com todas as palavras."""
+        if not tokens:
+            return []
+        candidates = set(index.get(tokens[0], []))
+        for token in tokens[1:]:
+            candidates &= set(index.get(token, []))
+        return sorted(candidates)
+
+    def match_club(self, club):
+        """
+        Devolve (regra, posições candidatas) para o nome de um clube. Regras, por ordem:
+        - name: nomes com todas as palavras do clube
+        - short_name: shortDisplayNames com todas as palavras do clube
+        - word: a primeira palavra do clube que só aparece num nome
+        Fica a primeira candidata do ficheiro (as equipas principais vêm antes das femininas e das jovens).
+        """
+        tokens = get_tokens(CLUB_ALIASES.get(club, club))
+
+        candidates = self.match_tokens(self.by_token, tokens)
+        if candidates:
+            return 'name', candidates
+        candidates = self.match_tokens(self.by_short_token, tokens)
+        if candidates:
+            return 'short_name', candidates
+
+        for token in tokens:
+            if len(self.by_token.get(token, [])) == 1:
+                return 'word', self.by_token[token]
+        return None, []
+
+    def resolve_club(self, club):
+        """Devolve a linha do teams.csv de um clube (dict), ou None se não encontrar nenhuma."""
+        rule, candidates = self.match_club(club)
+        if not candidates:
+            self.add_report('club', club, 'failed', rule, candidates)
+            return None
+        if len(candidates) > 1:
+            self.add_report('club', club, 'ambiguous', rule, candidates)
+        return self.get_team(candidates[0])
+
+    def resolve_country(self, country_abrv):
+        """
+        Devolve a linha do teams.csv (dict com 'name' e 'logoURL') de um país pela abreviatura,
+        ignorando as seleções jovens e preferindo as linhas com bandeira; None se não encontrar nenhuma.
+        """
+        if country_abrv in COUNTRY_OVERRIDES:
+            return COUNTRY_OVERRIDES[country_abrv]
+
+        candidates = [
+            position for position in self.by_abbreviation.get(country_abrv, [])
+            if not YOUTH_TEAM.search(str(self.teams.at[position, 'name']))
+        ]
+        if len(candidates) > 1:
+            candidates = [position for position in candidates if pd.notna(self.teams.at[position, 'logoURL'])] or candidates
+        if len(candidates) > 1:
+            candidates = [position for position in candidates if 'countries' in str(self.teams.at[position, 'logoURL'])] or candidates
+
+        if not candidates:
+            self.add_report('country', country_abrv, 'failed', 'abbreviation', candidates)
+            return None
+        if len({(self.teams.at[position, 'name'], self.teams.at[position, 'logoURL']) for position in candidates}) > 1:
+            self.add_report('country', country_abrv, 'ambiguous', 'abbreviation', candidates)
+        return self.get_team(candidates[0])
+
+    def get_venue(self, venue_id):
+        """Devolve a linha do venues.csv (dict com 'fullName' e 'city') de um venueId, ou None."""
+        venue = self.venues.get(venue_id)
+        if venue is None:
+            self.report.append({'type': 'venue', 'query': venue_id, 'status': 'failed', 'rule': 'venueId', 'match': None, 'candidates': ''})
+        return venue
+
+    def get_failures(self):
+        return [entry for entry in self.report if entry['status'] == 'failed']
+
+    def write_report(self, path):
+        pd.DataFrame(self.report, columns=['type', 'query', 'status', 'rule', 'match', 'candidates']).to_csv(path, index=False)
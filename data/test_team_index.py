@@ -0,0 +1,141 @@
+"""
+Testes das regras de correspondência do team_index.py, com DataFrames pequenos.
+
+    python -m unittest test_team_index
+"""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from team_index import TeamIndex, COUNTRY_OVERRIDES
+
+FLAG = 'https://a.espncdn.com/i/teamlogos/countries/500/{}.png'
+LOGO = 'https://a.espncdn.com/i/teamlogos/soccer/500/{}.png'
+
+TEAMS = pd.DataFrame([
+    # clubs
+    {'name': 'Manchester United', 'shortDisplayName': 'Man United', 'abbreviation': 'MAN', 'logoURL': LOGO.format(1), 'venueId': 10},
+    {'name': 'Manchester United Women', 'shortDisplayName': 'Man United', 'abbreviation': 'MANW', 'logoURL': LOGO.format(2), 'venueId': 10},
+    {'name': 'Manchester City', 'shortDisplayName': 'Man City', 'abbreviation': 'MNC', 'logoURL': LOGO.format(3), 'venueId': 11},
+    {'name': 'Paris Saint-Germain', 'shortDisplayName': 'PSG', 'abbreviation': 'PSG', 'logoURL': LOGO.format(4), 'venueId': 12},
+    {'name': 'Tottenham Hotspur', 'shortDisplayName': 'Spurs', 'abbreviation': 'TOT', 'logoURL': LOGO.format(5), 'venueId': 99},
+    {'name': 'Real Betis', 'shortDisplayName': 'Betis', 'abbreviation': 'BET', 'logoURL': LOGO.format(6), 'venueId': 13},
+    {'name': 'Sevilla', 'shortDisplayName': 'Sevilla', 'abbreviation': 'SEV', 'logoURL': LOGO.format(7), 'venueId': 14},
+    {'name': 'Internazionale', 'shortDisplayName': 'Internazionale', 'abbreviation': 'INT', 'logoURL': LOGO.format(8), 'venueId': 15},
+    # countries
+    {'name': 'Portugal U21', 'shortDisplayName': 'Portugal U21', 'abbreviation': 'POR', 'logoURL': FLAG.format('por'), 'venueId': None},
+    {'name': 'Portugal', 'shortDisplayName': 'Portugal', 'abbreviation': 'POR', 'logoURL': None, 'venueId': None},
+    {'name': 'Portugal', 'shortDisplayName': 'Portugal', 'abbreviation': 'POR', 'logoURL': FLAG.format('por'), 'venueId': None},
+    {'name': 'Spain', 'shortDisplayName': 'Spain', 'abbreviation': 'ESP', 'logoURL': FLAG.format('esp'), 'venueId': None},
+    {'name': 'Spain', 'shortDisplayName': 'Spain', 'abbreviation': 'ESP', 'logoURL': FLAG.format('esp'), 'venueId': None},
+    {'name': 'Espanyol', 'shortDisplayName': 'Espanyol', 'abbreviation': 'ESP', 'logoURL': LOGO.format(9), 'venueId': 16},
+    {'name': 'England', 'shortDisplayName': 'England', 'abbreviation': 'ENG', 'logoURL': FLAG.format('eng'), 'venueId': None},
+    {'name': 'England C', 'shortDisplayName': 'England C', 'abbreviation': 'ENG', 'logoURL': FLAG.format('eng-c'), 'venueId': None},
+    {'name': 'Brazil U20', 'shortDisplayName': 'Brazil U20', 'abbreviation': 'BRA', 'logoURL': FLAG.format('bra'), 'venueId': None},
+    {'name': 'Guadeloupe', 'shortDisplayName': 'Guadeloupe', 'abbreviation': 'GLP', 'logoURL': None, 'venueId': None},
+])
+
+VENUES = pd.DataFrame([
+    {'venueId': 10, 'fullName': 'Old Trafford', 'city': 'Manchester'},
+    {'venueId': 12, 'fullName': 'Parc des Princes', 'city': 'Paris'},
+])
+
+
+class MatchClubTests(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TeamIndex(TEAMS, VENUES)
+
+    def test_name(self):
+        self.assertEqual(self.index.match_club('Manchester City'), ('name', [2]))
+
+    def test_alias(self):
+        self.assertEqual(self.index.match_club('Paris S-G'), ('name', [3]))
+        self.assertEqual(self.index.match_club('Inter'), ('name', [7]))
+
+    def test_utd_is_united(self):
+        # a equipa principal vem antes da feminina no ficheiro
+        self.assertEqual(self.index.match_club('Manchester Utd'), ('name', [0, 1]))
+
+    def test_short_name(self):
+        self.assertEqual(self.index.match_club('Spurs'), ('short_name', [4]))
+
+    def test_word(self):
+        # nenhum nome tem as duas palavras, mas 'betis' só aparece num
+        self.assertEqual(self.index.match_club('Betis Sevilla'), ('word', [5]))
+
+    def test_no_match(self):
+        self.assertEqual(self.index.match_club('Nowhere Rovers'), (None, []))
+
+    def test_resolve_club_reports_ambiguous_and_failed(self):
+        self.assertEqual(self.index.resolve_club('Manchester Utd')['name'], 'Manchester United')
+        self.assertIsNone(self.index.resolve_club('Nowhere Rovers'))
+        self.assertEqual(self.index.resolve_club('Spurs')['name'], 'Tottenham Hotspur')
+
+        self.assertEqual(self.index.report, [
+            {'type': 'club', 'query': 'Manchester Utd', 'status': 'ambiguous', 'rule': 'name',
+             'match': 'Manchester United', 'candidates': 'Manchester United | Manchester United Women'},
+            {'type': 'club', 'query': 'Nowhere Rovers', 'status': 'failed', 'rule': None,
+             'match': None, 'candidates': ''},
+        ])
+        self.assertEqual([entry['query'] for entry in self.index.get_failures()], ['Nowhere Rovers'])
+
+
+class ResolveCountryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TeamIndex(TEAMS, VENUES)
+
+    def test_skips_youth_teams_and_prefers_flags(self):
+        country = self.index.resolve_country('POR')
+        self.assertEqual((country['name'], country['logoURL']), ('Portugal', FLAG.format('por')))
+        self.assertEqual(self.index.report, [])
+
+    def test_prefers_country_flags_over_club_logos(self):
+        # linhas repetidas com o mesmo nome e bandeira não são ambíguas
+        self.assertEqual(self.index.resolve_country('ESP')['name'], 'Spain')
+        self.assertEqual(self.index.report, [])
+
+    def test_ambiguous(self):
+        self.assertEqual(self.index.resolve_country('ENG')['name'], 'England')
+        self.assertEqual(self.index.report, [
+            {'type': 'country', 'query': 'ENG', 'status': 'ambiguous', 'rule': 'abbreviation',
+             'match': 'England', 'candidates': 'England | England C'},
+        ])
+
+    def test_only_youth_teams_fails(self):
+        self.assertIsNone(self.index.resolve_country('BRA'))
+        self.assertIsNone(self.index.resolve_country('XYZ'))
+        self.assertEqual([(entry['query'], entry['status'], entry['rule']) for entry in self.index.report], [
+            ('BRA', 'failed', 'abbreviation'),
+            ('XYZ', 'failed', 'abbreviation'),
+        ])
+
+    def test_override(self):
+        self.assertEqual(self.index.resolve_country('GLP'), COUNTRY_OVERRIDES['GLP'])
+        self.assertEqual(self.index.report, [])
+
+
+class VenueTests(unittest.TestCase):
+
+    def test_get_venue_and_report(self):
+        index = TeamIndex(TEAMS, VENUES)
+        self.assertEqual(index.get_venue(index.resolve_club('Paris S-G')['venueId'])['fullName'], 'Parc des Princes')
+        self.assertIsNone(index.get_venue(index.resolve_club('Spurs')['venueId']))
+        self.assertEqual(index.get_failures(), [
+            {'type': 'venue', 'query': 99, 'status': 'failed', 'rule': 'venueId', 'match': None, 'candidates': ''},
+        ])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.csv')
+            index.write_report(path)
+            report = pd.read_csv(path)
+        self.assertEqual(list(report.columns), ['type', 'query', 'status', 'rule', 'match', 'candidates'])
+        self.assertEqual(report['status'].tolist(), ['failed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
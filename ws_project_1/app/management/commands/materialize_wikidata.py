@@ -0,0 +1,117 @@
+"""
+Write the Wikidata enrichment of clubs, stadiums and leagues into GraphDB.
+
+    python manage.py materialize_wikidata [--max-age DAYS] [--all] [--batch-size 50] [--delay SECONDS] [--skip-resolve]
+
+Club and league ids are resolved first (see resolve_wikidata_ids). Every
+entity that is not in the Wikidata named graph yet, or was fetched more than
+--max-age days ago, is fetched again in batched requests and its triples are
+replaced in the graph (see wikidata_graph.py); --all refreshes everything.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.sparql_queries import get_leagues_query
+from app.utils.sparql_transport import execute_query
+from app.utils.wikidata_batch import WikidataBatchFetcher
+from app.utils.wikidata_graph import (
+    ENDPOINT_URL, get_materialized_triples, write_enrichment, get_enrichment_ages, get_materialized_stadiums
+)
+from app.utils.wikidata_ids import get_wikidata_ids
+from app.utils.wikidata_queries import get_clubs_details_query, get_stadiums_details_query, get_leagues_details_query, get_leagues_winners_query
+
+ENT = "http://football.org/ent/"
+
+
+class Command(BaseCommand):
+    help = "Materialize the Wikidata details of clubs, stadiums and leagues into a GraphDB named graph"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-age", type=float, default=7,
+                            help="Days after which a materialized entity is fetched again")
+        parser.add_argument("--all", action="store_true",
+                            help="Fetch every entity again, whatever its age")
+        parser.add_argument("--batch-size", type=int, default=50,
+                            help="Wikidata ids per request")
+        parser.add_argument("--delay", type=float, default=1.0,
+                            help="Seconds to wait between Wikidata requests")
+        parser.add_argument("--skip-resolve", action="store_true",
+                            help="Use the saved club and league ids without resolving new ones")
+
+    def handle(self, *args, **options):
+        self.fetcher = WikidataBatchFetcher(options["batch_size"], options["delay"])
+        started = time.perf_counter()
+
+        if not options["skip_resolve"]:
+            call_command("resolve_wikidata_ids", delay=options["delay"], stdout=self.stdout)
+
+        mapping = get_wikidata_ids()
+        clubs = {club_id: club["qid"] for club_id, club in mapping.get("clubs", {}).items()}
+        leagues = {name: league["qid"] for name, league in mapping.get("leagues", {}).items()}
+        if not clubs and not leagues:
+            raise CommandError("No Wikidata ids saved: run resolve_wikidata_ids first")
+
+        league_iris = {
+            row["name"]["value"]: row["league"]["value"]
+            for row in execute_query(ENDPOINT_URL, get_leagues_query())["results"]["bindings"]
+        }
+
+        ages = get_enrichment_ages()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=options["max_age"])
+
+        def is_stale(qid):
+            return options["all"] or qid not in ages or ages[qid][1] < cutoff
+
+        try:
+            # Clubs
+            links = {}
+            for club_id, qid in clubs.items():
+                links.setdefault(qid, []).append(ENT + club_id)
+            stale_clubs = sorted(qid for qid in links if is_stale(qid))
+            self.materialize("Club", stale_clubs, get_clubs_details_query, "club", links)
+
+            # Stadiums of the materialized clubs
+            stadiums = get_materialized_stadiums()
+            stale_stadiums = sorted(qid for qid in stadiums if is_stale(qid))
+            self.materialize("Stadium", stale_stadiums, get_stadiums_details_query, "stadium")
+
+            # Leagues, with the winners of each season
+            links = {}
+            for name, qid in leagues.items():
+                if name in league_iris:
+                    links.setdefault(qid, []).append(league_iris[name])
+            stale_leagues = sorted(qid for qid in links if is_stale(qid))
+            winners = dict(self.fetcher.fetch_rows(stale_leagues, get_leagues_winners_query, "league"))
+            self.materialize("League", stale_leagues, get_leagues_details_query, "league", links, winners)
+        except Exception as e:
+            raise CommandError(f"Materializing the Wikidata details failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {len(stale_clubs)} of {len(set(clubs.values()))} clubs, {len(stale_stadiums)} of {len(stadiums)} stadiums "
+            f"and {len(stale_leagues)} of {len(set(leagues.values()))} leagues "
+            f"with {self.fetcher.requests} Wikidata requests in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def materialize(self, kind, qids, get_batch_query, variable, links=None, seasons=None):
+        """Fetch some entities in batches and replace their triples, one GraphDB update per batch."""
+        batch, linked, triples = [], [], []
+        for qid, results in self.fetcher.fetch_rows(qids, get_batch_query, variable):
+            entity_links = (links or {}).get(qid, [])
+            triples += get_materialized_triples(
+                kind, qid, results["results"]["bindings"], datetime.now(timezone.utc), linked=entity_links,
+                seasons=seasons[qid]["results"]["bindings"] if seasons else None,
+            )
+            batch.append(qid)
+            linked += entity_links
+
+            if len(batch) == self.fetcher.batch_size:
+                write_enrichment(batch, linked, triples)
+                batch, linked, triples = [], [], []
+
+        if batch:
+            write_enrichment(batch, linked, triples)
+        self.stdout.write(f"{kind}: {len(qids)} entities refreshed")
@@ -0,0 +1,87 @@
+"""
+Fetch the Wikidata enrichment of every club, stadium and league ahead of time.
+
+    python manage.py prefetch_wikidata [--batch-size 50] [--delay SECONDS] [--stale-only] [--skip-resolve]
+
+Club and league ids are resolved first (see resolve_wikidata_ids). Details are
+then fetched in batched VALUES queries (--batch-size ids per request, waiting
+--delay seconds between requests), split per entity and stored in the on-disk
+Wikidata cache under the same key a page would use. Club, stadium and league
+pages are then served from the cache without going to the network.
+"""
+
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.wikidata_batch import WikidataBatchFetcher, ENTITY_PREFIX
+from app.utils.wikidata_cache import store_results, is_fresh, get_cached_results
+from app.utils.wikidata_ids import get_wikidata_ids
+from app.utils.wikidata_queries import (
+    get_club_details_query, get_clubs_details_query, get_stadium_details_query, get_stadiums_details_query,
+    get_league_details_query, get_leagues_details_query, get_league_winners_query, get_leagues_winners_query
+)
+
+
+class Command(BaseCommand):
+    help = "Prefetch the Wikidata details of every club, stadium and league into the local cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50,
+                            help="Wikidata ids per request")
+        parser.add_argument("--delay", type=float, default=1.0,
+                            help="Seconds to wait between Wikidata requests")
+        parser.add_argument("--stale-only", action="store_true",
+                            help="Only fetch entities whose cached details are missing or expired")
+        parser.add_argument("--skip-resolve", action="store_true",
+                            help="Use the saved club and league ids without resolving new ones")
+
+    def handle(self, *args, **options):
+        self.fetcher = WikidataBatchFetcher(options["batch_size"], options["delay"])
+        self.stale_only = options["stale_only"]
+        started = time.perf_counter()
+
+        if not options["skip_resolve"]:
+            call_command("resolve_wikidata_ids", delay=options["delay"], stdout=self.stdout)
+
+        mapping = get_wikidata_ids()
+        club_ids = sorted({club["qid"] for club in mapping.get("clubs", {}).values()})
+        league_ids = sorted({league["qid"] for league in mapping.get("leagues", {}).values()})
+        if not club_ids and not league_ids:
+            raise CommandError("No Wikidata ids saved: run resolve_wikidata_ids first")
+
+        self.prefetch("club_details", club_ids, get_clubs_details_query, get_club_details_query, "club")
+
+        # Stadiums are the venues found in the club details
+        stadium_ids = set()
+        for club_id in club_ids:
+            results = get_cached_results(get_club_details_query(club_id)) or {}
+            for row in results.get("results", {}).get("bindings", []):
+                if "stadiumInfo" in row:
+                    stadium_ids.add(row["stadiumInfo"]["value"].split("|")[0].replace(ENTITY_PREFIX, ""))
+        self.prefetch("stadium_details", sorted(stadium_ids), get_stadiums_details_query, get_stadium_details_query, "stadium")
+
+        self.prefetch("league_details", league_ids, get_leagues_details_query, get_league_details_query, "league")
+        self.prefetch("league_winners", league_ids, get_leagues_winners_query, get_league_winners_query, "league")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Prefetched {len(club_ids)} clubs, {len(stadium_ids)} stadiums and {len(league_ids)} leagues "
+            f"with {self.fetcher.requests} Wikidata requests in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def prefetch(self, family, ids, get_batch_query, get_single_query, variable):
+        """
+        Fetch one family of details in batches and cache each entity's rows
+        under its single-entity query (empty results for ids Wikidata has no rows for).
+        """
+        if self.stale_only:
+            ids = [id for id in ids if not is_fresh(get_single_query(id))]
+
+        try:
+            for id, results in self.fetcher.fetch_rows(ids, get_batch_query, variable):
+                store_results(get_single_query(id), results, family)
+        except Exception as e:
+            raise CommandError(f"Wikidata request failed: {e}")
+
+        self.stdout.write(f"{family}: {len(ids)} entities")
@@ -0,0 +1,98 @@
+"""
+Resolve the Wikidata ids (QIDs) of every club and league in the graph.
+
+    python manage.py resolve_wikidata_ids [--force] [--delay SECONDS]
+
+Clubs and leagues are read from GraphDB and searched on Wikidata by label
+(with the fixes of app/data/wikidata_overrides.json), one polite request at a
+time. The results are saved in app/data/wikidata_ids.json, so club and league
+pages no longer search Wikidata. Already resolved entries are kept unless
+--force is given; entries pinned by an override are never searched.
+
+Searches answered by the Wikidata cache (see wikidata_cache.py) do not send a
+request; with --force the cache is bypassed and refreshed with the new results.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.sparql_client import query_all_clubs
+from app.utils.wikidata_client import (
+    fetch_wikidata, get_club_id_search_query, get_league_id_search_query, process_club_id, process_league_id
+)
+from app.utils.wikidata_cache import get_cached_results, store_results
+from app.utils.wikidata_ids import get_wikidata_ids, get_overrides, save_wikidata_ids
+
+
+class Command(BaseCommand):
+    help = "Resolve and save the Wikidata ids of every club and league"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true",
+                            help="Search again the clubs and leagues that are already resolved")
+        parser.add_argument("--delay", type=float, default=1.0,
+                            help="Seconds to wait between Wikidata requests")
+
+    def handle(self, *args, **options):
+        clubs = query_all_clubs()
+        if not clubs:
+            raise CommandError("No clubs found in GraphDB")
+
+        resolved = get_wikidata_ids()
+        self.delay = options["delay"]
+        self.requests = 0
+
+        club_ids, failed_clubs = {}, []
+        for club in sorted(clubs, key=lambda club: club["id"]):
+            previous = resolved.get("clubs", {}).get(club["id"], {}).get("qid")
+            qid = self.resolve("clubs", club["id"], previous, options["force"],
+                               get_club_id_search_query(club["name"], club["id"]), "club_id", process_club_id)
+            if qid:
+                club_ids[club["id"]] = {"name": club["name"], "qid": qid}
+            else:
+                failed_clubs.append(f"{club['id']} ({club['name']})")
+
+        league_ids, failed_leagues = {}, []
+        for league in sorted({club["league"] for club in clubs}):
+            previous = resolved.get("leagues", {}).get(league, {}).get("qid")
+            qid = self.resolve("leagues", league, previous, options["force"],
+                               get_league_id_search_query(league), "league_id", process_league_id)
+            if qid:
+                league_ids[league] = {"qid": qid}
+            else:
+                failed_leagues.append(league)
+
+        save_wikidata_ids(club_ids, league_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Resolved {len(club_ids)} clubs and {len(league_ids)} leagues with {self.requests} Wikidata requests"
+        ))
+        for kind, failed in (("clubs", failed_clubs), ("leagues", failed_leagues)):
+            if failed:
+                self.stdout.write(self.style.WARNING(
+                    f"Unresolved {kind} (add a label or qid to app/data/wikidata_overrides.json): {', '.join(failed)}"
+                ))
+
+    def resolve(self, kind, key, previous, force, query, family, process):
+        """
+        Returns the QID of one entry: pinned by an override, kept from the last run, or searched
+        (in the Wikidata cache, unless forced, and otherwise on Wikidata).
+        """
+        pinned = get_overrides(kind, key).get("qid")
+        if pinned:
+            return pinned
+        if previous and not force:
+            return previous
+
+        results = None if force else get_cached_results(query)
+        if results is None:
+            if self.requests:
+                time.sleep(self.delay)
+            self.requests += 1
+            try:
+                results = fetch_wikidata(query)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Wikidata search failed for {kind} {key}: {e}"))
+                return None
+            store_results(query, results, family)
+        return process(results)
@@ -0,0 +1,83 @@
+"""
+Check that the native SPIN evaluator (app/utils/spin_engine.py) infers exactly
+the same triples as the SPARQL rules.
+
+    python manage.py spin_parity [--keep]
+
+The SPARQL rules are run against GraphDB (clearing previous inferences), the
+stored inferences of each rule's predicates are compared with the native
+results, and the store is left as it was unless --keep is given.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.utils.sparql_transport import execute_query
+from app.utils.spin_client import ENDPOINT_URL, execute_spin_rules, clear_spin_inferences, count_predicate_triples
+from app.utils.spin_engine import evaluate_spin_rules, expand, DECIMAL_TYPES, FLOAT_TYPES
+from app.utils.spin_queries import get_spin_rule_definitions, get_inferred_triples_query
+from app.utils.sparql_queries import term, XSD
+
+
+def normalize(value):
+    """Compare literals by value (e.g. "0.50" and "0.5" decimals are the same inference)."""
+    kind, lexical, datatype, lang = value
+    if kind != "literal":
+        return value
+    if datatype in DECIMAL_TYPES or datatype in FLOAT_TYPES:
+        try:
+            return ("number", "double" if datatype in FLOAT_TYPES else "decimal", Decimal(lexical))
+        except InvalidOperation:
+            return value
+    if datatype == XSD + "boolean":
+        return ("boolean", lexical in ("true", "1"))
+    return ("literal", lexical, datatype or XSD + "string", lang)
+
+
+class Command(BaseCommand):
+    help = "Check that the native SPIN evaluator infers the same triples as the SPARQL rules"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", action="store_true",
+                            help="Keep the SPARQL inferences in the store afterwards")
+        parser.add_argument("--samples", type=int, default=5,
+                            help="Mismatching triples shown per predicate")
+
+    def handle(self, *args, **options):
+        rules = get_spin_rule_definitions()
+        predicates = sorted({predicate for rule in rules for predicate in rule["writes"]})
+        had_inferences = count_predicate_triples(predicates) > 0
+
+        self.stdout.write("Evaluating rules natively...")
+        native = {}
+        for triples in evaluate_spin_rules().values():
+            for subject, predicate, value in triples:
+                native.setdefault(predicate, set()).add((normalize(subject), normalize(value)))
+
+        self.stdout.write("Running the SPARQL rules...")
+        if not execute_spin_rules(engine="sparql"):
+            raise CommandError("The SPARQL rules failed")
+
+        try:
+            mismatches = 0
+            for predicate in predicates:
+                results = execute_query(ENDPOINT_URL, get_inferred_triples_query([predicate]))
+                stored = {(normalize(term(row["s"])), normalize(term(row["o"])))
+                          for row in results["results"]["bindings"]}
+                expected = native.get(expand(predicate), set())
+
+                missing, extra = stored - expected, expected - stored
+                status = "ok" if not missing and not extra else "MISMATCH"
+                self.stdout.write(f"{predicate}: {len(stored)} SPARQL, {len(expected)} native - {status}")
+                for label, triples in (("only in SPARQL", missing), ("only native", extra)):
+                    for subject, value in sorted(triples, key=repr)[:options["samples"]]:
+                        self.stdout.write(f"    {label}: {subject} {value}")
+                mismatches += len(missing) + len(extra)
+        finally:
+            if not options["keep"] and not had_inferences:
+                clear_spin_inferences()
+
+        if mismatches:
+            raise CommandError(f"{mismatches} triples differ between the native and the SPARQL rules")
+        self.stdout.write(self.style.SUCCESS("Native rules match the SPARQL rules"))
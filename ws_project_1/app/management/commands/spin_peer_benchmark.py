@@ -0,0 +1,124 @@
+"""
+Compare the two ways of storing the pairwise SPIN relations (SPIN_PEER_MODE):
+materialized edges between every pair of players, or one membership triple
+per player pointing to a group node per club/nation/past club.
+
+    python manage.py spin_peer_benchmark [--players 20] [--offset 0] [--repeat 3]
+
+For each mode the teammate, compatriot and past teammate rules are run
+against GraphDB, then the stored triples are counted and the teammates,
+compatriots and connection queries are timed for a sample of players. The
+store is left as it was (the rules are re-run if they were active).
+"""
+
+import time
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from app.utils import spin_queries
+from app.utils.sparql_transport import execute_query
+from app.utils.sparql_queries import get_players_page_query, get_player_connections_query
+from app.utils.spin_client import (
+    ENDPOINT_URL, execute_spin_rule, execute_spin_rules, clear_spin_inferences, count_predicate_triples
+)
+from app.utils.spin_scheduler import run_rule_graph
+
+MODES = ["edges", "groups"]
+
+
+def ids(results, variable):
+    return sorted(row[variable]["value"] for row in results["results"]["bindings"] if variable in row)
+
+
+def timed(query):
+    start = time.perf_counter()
+    results = execute_query(ENDPOINT_URL, query)
+    return results, (time.perf_counter() - start) * 1000
+
+
+class Command(BaseCommand):
+    help = "Compare triple counts and query latency of edge and group node storage of teammates/compatriots"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=20, help="Number of sample players")
+        parser.add_argument("--offset", type=int, default=0, help="Offset of the sample in the players list")
+        parser.add_argument("--repeat", type=int, default=3, help="Times each query is timed")
+
+    def handle(self, *args, **options):
+        written = sorted({
+            predicate
+            for mode in MODES
+            for rule in self.rule_definitions(mode)
+            for predicate in rule["writes"]
+        })
+        all_rules = {predicate for rule in spin_queries.get_spin_rule_definitions() for predicate in rule["writes"]}
+        had_inferences = count_predicate_triples(sorted(all_rules | set(written))) > 0
+        previous_mode = spin_queries.SPIN_PEER_MODE
+
+        results = execute_query(ENDPOINT_URL, get_players_page_query(options["players"], options["offset"]))
+        sample = [row["player_id"]["value"].split("/")[-1] for row in results["results"]["bindings"]]
+        pairs = list(zip(sample, sample[1:]))
+
+        rows, answers = [], {}
+        try:
+            for mode in MODES:
+                spin_queries.SPIN_PEER_MODE = mode
+                clear_spin_inferences()
+
+                rules = spin_queries.get_peer_rule_definitions()
+                start = time.perf_counter()
+                run_rule_graph(rules, execute_spin_rule)
+                rule_seconds = time.perf_counter() - start
+                triples = count_predicate_triples([predicate for rule in rules for predicate in rule["writes"]])
+
+                latencies = {"teammates": [], "compatriots": [], "connections": []}
+                answers[mode] = {}
+                for _ in range(options["repeat"]):
+                    for player_id in sample:
+                        teammates, elapsed = timed(spin_queries.get_teammates_query(player_id))
+                        latencies["teammates"].append(elapsed)
+                        compatriots, elapsed = timed(spin_queries.get_compatriots_query(player_id))
+                        latencies["compatriots"].append(elapsed)
+                        answers[mode][player_id] = (ids(teammates, "teammate_id"), ids(compatriots, "compatriot_id"))
+                    for player1_id, player2_id in pairs:
+                        connections, elapsed = timed(get_player_connections_query(player1_id, player2_id, True))
+                        latencies["connections"].append(elapsed)
+                        answers[mode][(player1_id, player2_id)] = connections["results"]["bindings"]
+
+                rows.append((mode, triples, rule_seconds, latencies))
+        finally:
+            spin_queries.SPIN_PEER_MODE = previous_mode
+            clear_spin_inferences()
+            if had_inferences:
+                execute_spin_rules()
+
+        self.stdout.write(f"{len(sample)} players, {len(pairs)} pairs, {options['repeat']} runs each\n")
+        self.stdout.write(f"{'mode':<8} {'triples':>9} {'rules (s)':>10} "
+                          f"{'teammates ms (median/p95)':>27} {'compatriots ms':>16} {'connections ms':>16}")
+        for mode, triples, rule_seconds, latencies in rows:
+            columns = [self.summary(latencies[key]) for key in ("teammates", "compatriots", "connections")]
+            self.stdout.write(f"{mode:<8} {triples:>9} {rule_seconds:>10.2f} {columns[0]:>27} {columns[1]:>16} {columns[2]:>16}")
+
+        if answers["edges"] == answers["groups"]:
+            self.stdout.write(self.style.SUCCESS("Both modes return the same teammates, compatriots and connections"))
+        else:
+            differing = [key for key in answers["edges"] if answers["edges"][key] != answers["groups"].get(key)]
+            self.stdout.write(self.style.ERROR(f"The modes disagree for: {differing[:10]}"))
+
+    @staticmethod
+    def rule_definitions(mode):
+        previous_mode = spin_queries.SPIN_PEER_MODE
+        spin_queries.SPIN_PEER_MODE = mode
+        try:
+            return spin_queries.get_peer_rule_definitions()
+        finally:
+            spin_queries.SPIN_PEER_MODE = previous_mode
+
+    @staticmethod
+    def summary(values):
+        if not values:
+            return "-"
+        ordered = sorted(values)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return f"{statistics.median(ordered):.1f}/{p95:.1f}"
@@ -0,0 +1,217 @@
+"""
+Tests of the app that do not need GraphDB.
+
+    python manage.py test app
+"""
+
+import json
+
+from django.test import SimpleTestCase
+from rdflib import Graph
+
+from app.management.commands.spin_parity import normalize
+from app.utils.spin_engine import RuleFacts, RULE_EVALUATORS, ENT
+from app.utils.sparql_queries import term
+from app.utils.spin_queries import (
+    get_spin_rule_definitions, get_peer_groups_rule, get_inferred_triples_query, PEER_RELATIONS
+)
+
+# Small graph covering the threshold of every SPIN rule from both sides
+SPIN_FIXTURE = """
+@prefix ent: <http://football.org/ent/> .
+@prefix fut-rel: <http://football.org/rel/> .
+@prefix ont: <http://football.org/ontology#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+ont:Goalkeeper rdfs:subClassOf ont:Player .
+
+ent:porto fut-rel:league ent:ppl ; fut-rel:city "Porto" ; a ont:Club ; ont:gls 70 ; ont:mp 34 .
+ent:boavista fut-rel:league ent:ppl ; fut-rel:city "Porto" ; a ont:Club .
+ent:benfica fut-rel:league ent:ppl ; fut-rel:city "Lisboa" ; a ont:Club .
+ent:sporting fut-rel:league ent:ppl ; fut-rel:city "Lisboa" ; a ont:Club .
+ent:braga fut-rel:league ent:ppl ; fut-rel:city "Braga" ; a ont:Club .
+
+# Veteran at exactly 35, efficiency 1.0, striker at exactly 0.4 goals per match
+ent:veteran a ont:Player ; fut-rel:born 1990 ; fut-rel:position "FW" ;
+    fut-rel:club ent:porto ; fut-rel:past_club ent:braga ; fut-rel:nation ent:POR ;
+    ont:gls 4 ; ont:ast 1 ; ont:min 450 ; ont:mp 10 .
+
+# 34 years old, not a striker (0.4 goals per match but a midfielder)
+ent:almost_veteran a ont:Player ; fut-rel:born 1991 ; fut-rel:position "MF" ;
+    fut-rel:club ent:porto ; fut-rel:nation ent:POR ;
+    ont:gls 4 ; ont:mp 10 .
+
+# Young prospect at 22, efficiency rounding half up (37.5 -> 0.38), goal threat at exactly 0.5
+ent:prospect a ont:Player ; fut-rel:born 2003 ; fut-rel:position "FW,MF" ;
+    fut-rel:club ent:benfica ; fut-rel:past_club ent:braga ; fut-rel:nation ent:ESP ;
+    ont:gls 1 ; ont:ast 0 ; ont:min 240 ; ont:mp 2 .
+
+# 23 years old, efficiency with a repeating decimal, goal threat just below 0.5
+ent:not_prospect a ont:Player ; fut-rel:born 2002 ; fut-rel:position "DF" ;
+    fut-rel:club ent:benfica ; fut-rel:nation ent:ESP ;
+    ont:gls 4 ; ont:ast 0 ; ont:min 270 ; ont:mp 9 .
+
+# Penalty specialist at exactly 0.9, playmaker at exactly 0.3 assists and 1.5 key passes per match,
+# disciplinary risk at exactly 0.3, key player at exactly 70 minutes per match
+ent:specialist a ont:Player ; fut-rel:born 1998 ; fut-rel:position "MF" ;
+    fut-rel:club ent:sporting ; fut-rel:nation ent:BRA ;
+    ont:pk 9 ; ont:pkatt 10 ; ont:ast 3 ; ont:kp 15 ; ont:mp 10 ; ont:min 700 ;
+    ont:crdy 1 ; ont:crdr 1 .
+
+# Just below every threshold of the player above
+ent:almost_specialist a ont:Player ; fut-rel:born 1998 ; fut-rel:position "MF" ;
+    fut-rel:club ent:sporting ; fut-rel:nation ent:BRA ;
+    ont:pk 8 ; ont:pkatt 9 ; ont:ast 3 ; ont:kp 14 ; ont:mp 10 ; ont:min 699 ;
+    ont:crdy 2 ; ont:crdr 0 .
+
+# Defensive midfielder at exactly 3.0 tackles + interceptions per match, versatile at the thresholds
+ent:midfielder a ont:Player ; fut-rel:born 1995 ; fut-rel:position "DF,MF" ;
+    fut-rel:club ent:braga ; fut-rel:nation ent:POR ;
+    ont:gls 1 ; ont:ast 1 ; ont:tkl 20 ; ont:int 10 ; ont:mp 10 ; ont:min 900 .
+
+# Goalkeeper (subclass of Player): only teammate/compatriot of the players of the same class,
+# no penalties attempted and no matches played must not divide by zero.
+# (Double stats are left to spin_parity: rdflib divisions always give a decimal, GraphDB a double.)
+ent:keeper a ont:Goalkeeper ; fut-rel:born 1988 ; fut-rel:position "GK" ;
+    fut-rel:club ent:braga ; fut-rel:nation ent:BRA ;
+    ont:gls 1 ; ont:ast 1 ; ont:min 180 ; ont:pk 0 ; ont:pkatt 0 ; ont:mp 0 .
+
+ent:second_keeper a ont:Goalkeeper ; fut-rel:born 1999 ; fut-rel:position "GK" ;
+    fut-rel:club ent:braga ; fut-rel:nation ent:POR .
+
+# No minutes: no efficiency
+ent:unused a ont:Player ; fut-rel:born 2006 ; fut-rel:position "FW" ;
+    fut-rel:club ent:porto ; fut-rel:nation ent:ESP ;
+    ont:gls 0 ; ont:ast 0 ; ont:min 0 ; ont:mp 0 .
+
+# Past season record (see data_converter_csv_to_nt.py): not a Player, nothing is inferred for it
+ent:veteran__2023_2024 a ont:PlayerSeason ; fut-rel:player ent:veteran ; fut-rel:club ent:benfica ;
+    ont:gls 30 ; ont:ast 10 ; ont:min 900 ; ont:mp 10 .
+"""
+
+
+def load_fixture():
+    graph = Graph()
+    graph.parse(data=SPIN_FIXTURE, format="turtle")
+    return graph
+
+
+def fetch(graph):
+    def run(query):
+        return json.loads(graph.query(query).serialize(format="json"))
+    return run
+
+
+def inferred_by_sparql(query, predicates):
+    """Triples of the predicates inserted by a rule's SPARQL INSERT on a fresh fixture graph."""
+    graph = load_fixture()
+    graph.update(query)
+    results = fetch(graph)(get_inferred_triples_query(predicates))
+    return {
+        (normalize(term(row["s"])), row["p"]["value"], normalize(term(row["o"])))
+        for row in results["results"]["bindings"]
+    }
+
+
+def inferred_natively(name):
+    facts = RuleFacts.load(fetch(load_fixture()))
+    return {(normalize(subject), predicate, normalize(value)) for subject, predicate, value in RULE_EVALUATORS[name](facts)}
+
+
+def subjects(triples):
+    return {subject[1].rsplit("/", 1)[-1] for subject, _, _ in triples}
+
+
+class SpinParityTests(SimpleTestCase):
+    """The native SPIN evaluator infers exactly the triples of the SPARQL rules."""
+
+    def assertParity(self, name, query, predicates):
+        expected = inferred_by_sparql(query, predicates)
+        self.assertEqual(inferred_natively(name), expected)
+        return expected
+
+    def test_every_rule_matches_sparql(self):
+        for rule in get_spin_rule_definitions():
+            with self.subTest(rule=rule["name"]):
+                self.assertParity(rule["name"], rule["query"], rule["writes"])
+
+    def test_peer_group_rules_match_sparql(self):
+        for relation, (_, group, _) in PEER_RELATIONS.items():
+            with self.subTest(relation=relation):
+                self.assertParity(f"{relation}_groups", get_peer_groups_rule(relation), [group])
+
+    def test_thresholds_are_inclusive(self):
+        rules = {rule["name"]: rule for rule in get_spin_rule_definitions()}
+        cases = {
+            "veterans": {"veteran", "keeper"},
+            "young_prospects": {"prospect", "unused"},
+            "penalty_specialists": {"specialist"},
+            "playmakers": {"specialist"},
+            "goal_threats": {"prospect"},
+            "disciplinary_risks": {"specialist"},
+            "key_players": {"specialist", "midfielder", "prospect"},
+            "strikers": {"veteran", "prospect"},
+            "defensive_midfielders": {"midfielder"},
+            "versatile_players": {"midfielder"},
+        }
+        for name, expected in cases.items():
+            with self.subTest(rule=name):
+                rule = rules[name]
+                self.assertEqual(subjects(self.assertParity(name, rule["query"], rule["writes"])), expected)
+
+    def test_efficiency_values(self):
+        rule = next(rule for rule in get_spin_rule_definitions() if rule["name"] == "efficiency")
+        triples = self.assertParity("efficiency", rule["query"], rule["writes"])
+        values = {subject[1].rsplit("/", 1)[-1]: value for subject, _, value in triples}
+
+        self.assertNotIn("unused", values)
+        self.assertNotIn("almost_veteran", values)
+        self.assertEqual(values["veteran"][1:], ("decimal", 1))
+        self.assertEqual(str(values["prospect"][2]), "0.38")
+        self.assertEqual(str(values["not_prospect"][2]), "1.33")
+        self.assertEqual(values["keeper"][1:], ("decimal", 1))
+
+    def test_city_rivals(self):
+        rule = next(rule for rule in get_spin_rule_definitions() if rule["name"] == "league_rivals")
+        triples = self.assertParity("league_rivals", rule["query"], rule["writes"])
+        pairs = {(subject[1].rsplit("/", 1)[-1], value[1].rsplit("/", 1)[-1]) for subject, _, value in triples}
+        self.assertEqual(pairs, {
+            ("porto", "boavista"), ("boavista", "porto"),
+            ("benfica", "sporting"), ("sporting", "benfica"),
+        })
+
+    def test_teammates_share_a_class(self):
+        rule = next(rule for rule in get_spin_rule_definitions() if rule["name"] == "teammates")
+        triples = self.assertParity("teammates", rule["query"], rule["writes"])
+        pairs = {(subject[1].rsplit("/", 1)[-1], value[1].rsplit("/", 1)[-1]) for subject, _, value in triples}
+        self.assertIn(("keeper", "second_keeper"), pairs)
+        self.assertNotIn(("keeper", "midfielder"), pairs)
+        self.assertIn(("veteran", "almost_veteran"), pairs)
+
+    def test_peer_groups_match_edges(self):
+        # Players sharing a group in groups mode are exactly the pairs of the edge rules
+        edge_rules = {"teammate": "teammates", "compatriot": "compatriots", "pastTeammate": "past_teammates"}
+        rules = {rule["name"]: rule for rule in get_spin_rule_definitions()}
+        for relation, (edge, group, _) in PEER_RELATIONS.items():
+            with self.subTest(relation=relation):
+                rule = rules[edge_rules[relation]]
+                edges = {(subject, value) for subject, _, value in inferred_by_sparql(rule["query"], rule["writes"])}
+
+                members = {}
+                for subject, _, value in inferred_by_sparql(get_peer_groups_rule(relation), [group]):
+                    members.setdefault(value, set()).add(subject)
+                shared = {(a, b) for players in members.values() for a in players for b in players if a != b}
+                self.assertEqual(shared, edges)
+
+        members = inferred_natively("teammate_groups")
+        groups = {subject[1].rsplit("/", 1)[-1]: value[1] for subject, _, value in members}
+        self.assertEqual(groups["keeper"], groups["second_keeper"])
+        self.assertEqual(groups["keeper"], "http://football.org/group/teammate/Goalkeeper/braga")
+        self.assertEqual(groups["midfielder"], "http://football.org/group/teammate/Player/braga")
+
+    def test_season_records_are_not_players(self):
+        for rule in get_spin_rule_definitions():
+            with self.subTest(rule=rule["name"]):
+                triples = self.assertParity(rule["name"], rule["query"], rule["writes"])
+                self.assertNotIn("veteran__2023_2024", subjects(triples))
+                self.assertNotIn(ENT + "veteran__2023_2024", {value[1] for _, _, value in triples})
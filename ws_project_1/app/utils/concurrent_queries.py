@@ -0,0 +1,53 @@
+"""
+Run independent SPARQL queries concurrently on a bounded thread pool.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Upper bound on queries in flight at once (keep it <= GRAPHDB_POOL_SIZE)
+MAX_CONCURRENT_QUERIES = int(os.environ.get("SPARQL_MAX_CONCURRENCY", "8"))
+
+# Seconds a page waits for a single query before falling back to its default
+QUERY_TIMEOUT = float(os.environ.get("SPARQL_QUERY_TIMEOUT", "10"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES, thread_name_prefix="sparql-query")
+
+
+def run_concurrently(calls, timeout=QUERY_TIMEOUT, default=None):
+    """
+    Execute several query functions concurrently and collect their results.
+
+    Args:
+        calls: dict mapping a key to a (function, args) tuple. Each function is
+            also called with timeout=<timeout>, which it must pass on to its
+            HTTP request so a slow query frees its worker instead of holding it
+            for the pool's read timeout
+        timeout: Seconds to wait for each query; the ones still running after
+            that are abandoned and get the default value
+        default: Value used for queries that time out, fail or return None.
+            If callable, it is called with the key to build the value.
+
+    Returns:
+        dict: The result of each call, under the same key
+    """
+    futures = {key: _executor.submit(func, *args, timeout=timeout) for key, (func, args) in calls.items()}
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for key, future in futures.items():
+        result = None
+        if future.done():
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Concurrent query {key} failed: {e}")
+        else:
+            future.cancel()
+            print(f"Concurrent query {key} timed out after {timeout}s")
+
+        if result is None:
+            result = default(key) if callable(default) else default
+        results[key] = result
+
+    return results
@@ -0,0 +1,125 @@
+"""
+Server-side cache for read-only SPARQL query results.
+
+Results are stored in the Django cache configured under the "sparql" alias
+(TTL and LRU eviction come from its TIMEOUT / MAX_ENTRIES settings), keyed on
+the normalized query text. Every successful write to the store bumps a
+generation counter that is part of the key, so all cached results are dropped
+at once without having to track which queries a write affects.
+
+The generation counter is kept in the same cache, so it is only seen by other
+worker processes when that cache is shared (SPARQL_CACHE_BACKEND, e.g. Redis);
+with the default in-memory cache each process has its own results and counter.
+"""
+
+import re
+import time
+import hashlib
+import threading
+
+from django.conf import settings
+
+CACHE_ALIAS = "sparql"
+GENERATION_KEY = "sparql:generation"
+
+_stats = {}
+_invalidations = 0
+_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the Django cache used for query results, or None outside Django."""
+    if not settings.configured or CACHE_ALIAS not in getattr(settings, "CACHES", {}):
+        return None
+
+    from django.core.cache import caches
+    return caches[CACHE_ALIAS]
+
+
+def normalize_query(query):
+    """Collapse whitespace so formatting differences map to the same key."""
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def new_generation():
+    # Time based, so a generation key lost to eviction never restarts at a
+    # value whose cached entries may still be around
+    return int(time.time() * 1000)
+
+
+def get_generation(cache):
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, new_generation(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def get_cache_key(cache, query):
+    digest = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+    return f"sparql:{get_generation(cache)}:{digest}"
+
+
+def cached_query(query, execute, family="raw"):
+    """
+    Return the results of a query from the cache, executing it on a miss.
+
+    Args:
+        query: The SPARQL query string
+        execute: Function called with the query to fetch the results on a miss
+        family: Name the hit/miss counters are grouped under
+
+    Returns:
+        dict: SPARQL JSON results
+    """
+    cache = get_cache()
+    if cache is None:
+        return execute(query)
+
+    key = get_cache_key(cache, query)
+    results = cache.get(key)
+    if results is not None:
+        _count(family, "hits")
+        return results
+
+    _count(family, "misses")
+    results = execute(query)
+    cache.set(key, results)
+    return results
+
+
+def invalidate_query_cache():
+    """Drop every cached result; called after each successful write."""
+    global _invalidations
+
+    cache = get_cache()
+    if cache is None:
+        return
+
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Generation key missing (never set or evicted): start a new one
+        cache.set(GENERATION_KEY, new_generation(), timeout=None)
+
+    with _lock:
+        _invalidations += 1
+
+
+def _count(family, counter):
+    with _lock:
+        counters = _stats.setdefault(family, {"hits": 0, "misses": 0})
+        counters[counter] += 1
+
+
+def get_cache_stats():
+    """Returns the hit/miss counters of each query family and the invalidation count."""
+    with _lock:
+        families = {}
+        for family, counters in _stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            families[family] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0,
+            }
+        return {"families": families, "invalidations": _invalidations}
@@ -0,0 +1,665 @@
+"""
+In-process read model: a compact memory snapshot of the football graph.
+
+When enabled (READ_MODEL=graphdb or READ_MODEL=file), players, clubs and stats
+are loaded once into slotted records with interned ids and one float array per
+stat, and the most frequent read queries are answered from memory instead of
+GraphDB. The snapshot methods return results in the SPARQL JSON format of the
+queries they replace, so the existing result processors are reused unchanged.
+
+Stat columns are also exposed as NumPy matrices (see stat_matrix.py), which
+serve the leaderboards, per-90 values and per-position percentile ranks.
+
+The first snapshot is loaded in the background on first use, so no request
+waits for it. After a write the snapshot is dropped (reads fall back to SPARQL)
+and a new one is built from GraphDB in the background, then swapped in with a
+single assignment.
+
+Writes also bump a version kept in the "sparql" cache. Every process compares
+it with the version of its snapshot at most every READ_MODEL_VERSION_TTL
+seconds and rebuilds when another worker wrote, so this only reaches other
+workers when that cache is shared (SPARQL_CACHE_BACKEND, e.g. Redis).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import threading
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+from .sparql_transport import execute_query
+from .query_cache import get_cache, new_generation
+from .stat_matrix import StatMatrix, NOT_PER_90
+from .sparql_queries import (
+    get_read_model_players_query, get_read_model_clubs_query,
+    get_read_model_stat_types_query, get_read_model_stat_values_query
+)
+
+# Configure your SPARQL endpoint
+ENDPOINT_URL = os.environ.get("GRAPHDB_ENDPOINT", "http://graphdb:7200") + "/repositories/football"
+
+# "" (disabled), "graphdb" or "file"
+READ_MODEL_SOURCE = os.environ.get("READ_MODEL", "").strip().lower()
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data" / "import"
+# The partitions written by data_converter_csv_to_nt.py, as listed in its manifest
+READ_MODEL_PARTITIONS_DIR = Path(os.environ.get("READ_MODEL_PARTITIONS_DIR", str(DATA_DIR / "partitions")))
+# A single N3 file read instead of the partitions (e.g. the one written with --n3)
+READ_MODEL_FILE = os.environ.get("READ_MODEL_FILE", "")
+READ_MODEL_ONTOLOGY_FILE = os.environ.get("READ_MODEL_ONTOLOGY_FILE", str(DATA_DIR / "ontology" / "football_ontology.n3"))
+
+# Seconds to wait before retrying a failed load
+RETRY_AFTER = 60
+
+# Seconds a process trusts its last read of the shared version
+READ_MODEL_VERSION_TTL = float(os.environ.get("READ_MODEL_VERSION_TTL", "5"))
+VERSION_KEY = "read-model:version"
+
+ENT = "http://football.org/ent/"
+ONT = "http://football.org/ontology#"
+
+MISSING = float("nan")
+
+_snapshot = None
+_source = READ_MODEL_SOURCE
+# Shared version the current snapshot (or the load in progress) was started for
+_version = None
+_rebuilding = False
+_failed_at = None
+_checked = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+class PlayerRecord:
+    __slots__ = ("id", "name", "born", "photo_url", "positions", "nation", "flag", "club", "row")
+
+    def __init__(self, id, name, born, photo_url, positions, nation, flag, club, row):
+        self.id = id
+        self.name = name
+        self.born = born
+        self.photo_url = photo_url
+        self.positions = positions
+        self.nation = nation
+        self.flag = flag
+        self.club = club
+        self.row = row
+
+
+class ClubRecord:
+    __slots__ = ("id", "name", "logo", "color", "alternate_color", "league", "flag", "row")
+
+    def __init__(self, id, name, logo, color, alternate_color, league, flag, row):
+        self.id = id
+        self.name = name
+        self.logo = logo
+        self.color = color
+        self.alternate_color = alternate_color
+        self.league = league
+        self.flag = flag
+        self.row = row
+
+
+class StatType:
+    __slots__ = ("id", "name", "category")
+
+    def __init__(self, id, name, category):
+        self.id = id
+        self.name = name
+        self.category = category
+
+
+class StatColumns:
+    """One float array per stat id, indexed by entity row (NaN when missing)."""
+
+    __slots__ = ("size", "columns", "integer")
+
+    def __init__(self, size):
+        self.size = size
+        self.columns = {}
+        # Stat ids whose values are all integers (rendered without decimals)
+        self.integer = set()
+
+    def set(self, row, stat_id, value):
+        column = self.columns.get(stat_id)
+        if column is None:
+            column = self.columns[stat_id] = array("d", [MISSING]) * self.size
+            self.integer.add(stat_id)
+        column[row] = value
+
+    def get(self, row, stat_id):
+        column = self.columns.get(stat_id)
+        return MISSING if column is None else column[row]
+
+    def format(self, stat_id, value):
+        return str(int(value)) if stat_id in self.integer else repr(float(value))
+
+
+def literal(value):
+    return {"type": "literal", "value": value}
+
+
+def uri(value):
+    return {"type": "uri", "value": value}
+
+
+class ReadModel:
+    """Immutable snapshot of players, clubs and stats."""
+
+    __slots__ = ("players", "players_by_id", "player_rows", "clubs", "clubs_by_id", "players_by_club",
+                 "stat_types", "player_stats", "club_stats", "player_matrix", "club_matrix",
+                 "player_top_mask", "club_top_mask", "position_masks", "source", "loaded_at")
+
+    def __init__(self, source):
+        self.source = source
+        self.loaded_at = time.time()
+        self.players = []
+        self.players_by_id = {}
+        self.clubs = []
+        self.clubs_by_id = {}
+        self.players_by_club = {}
+        self.stat_types = {}
+        self.player_stats = None
+        self.club_stats = None
+        self.player_rows = []
+        self.player_matrix = None
+        self.club_matrix = None
+        self.player_top_mask = None
+        self.club_top_mask = None
+        self.position_masks = {}
+
+    # Loading
+
+    @classmethod
+    def build(cls, source, fetch):
+        """
+        Build a snapshot from the results of the read model queries.
+
+        Args:
+            source: Where the data came from ("graphdb" or "file")
+            fetch: Function executing a SPARQL query and returning its JSON results
+        """
+        model = cls(source)
+        model.load_players(fetch(get_read_model_players_query()))
+        model.load_clubs(fetch(get_read_model_clubs_query()))
+        model.load_stat_types(fetch(get_read_model_stat_types_query()))
+        model.load_stat_values(fetch(get_read_model_stat_values_query()))
+        model.build_matrices()
+        return model
+
+    def load_players(self, results):
+        for binding in results["results"]["bindings"]:
+            player_id = sys.intern(binding["player_id"]["value"].split("/")[-1])
+            if player_id in self.players_by_id:
+                continue
+
+            positions_str = binding.get("positions", {}).get("value", "")
+            club = binding.get("club", {}).get("value")
+            player = PlayerRecord(
+                id=player_id,
+                name=binding["name"]["value"],
+                born=binding["born"]["value"] if "born" in binding else None,
+                photo_url=binding.get("photo_url", {}).get("value"),
+                positions=tuple(sys.intern(pos.strip()) for pos in positions_str.split(",") if pos.strip()),
+                nation=sys.intern(binding["nation"]["value"]) if "nation" in binding else None,
+                flag=sys.intern(binding["flag"]["value"]) if "flag" in binding else None,
+                club=sys.intern(club.split("/")[-1]) if club else None,
+                row=len(self.players),
+            )
+            self.players.append(player)
+            self.players_by_id[player_id] = player
+            if player.club:
+                self.players_by_club.setdefault(player.club, []).append(player)
+
+        self.players.sort(key=lambda player: player.name)
+        for players in self.players_by_club.values():
+            players.sort(key=lambda player: player.name)
+
+    def load_clubs(self, results):
+        for binding in results["results"]["bindings"]:
+            club_id = sys.intern(binding["club_id"]["value"].split("/")[-1])
+            if club_id in self.clubs_by_id:
+                continue
+
+            club = ClubRecord(
+                id=club_id,
+                name=binding["name"]["value"],
+                logo=binding.get("logo", {}).get("value"),
+                color=binding.get("color", {}).get("value"),
+                alternate_color=binding.get("alternateColor", {}).get("value"),
+                league=binding.get("league_name", {}).get("value"),
+                flag=binding.get("flag", {}).get("value"),
+                row=len(self.clubs),
+            )
+            self.clubs.append(club)
+            self.clubs_by_id[club_id] = club
+
+    def load_stat_types(self, results):
+        for binding in results["results"]["bindings"]:
+            stat_id = sys.intern(binding["stat"]["value"].split("#")[-1])
+            self.stat_types[stat_id] = StatType(stat_id, binding["stat_name"]["value"], binding["stat_category"]["value"])
+
+    def load_stat_values(self, results):
+        self.player_stats = StatColumns(len(self.players))
+        self.club_stats = StatColumns(len(self.clubs))
+
+        for binding in results["results"]["bindings"]:
+            entity_id = binding["entity"]["value"].split("/")[-1]
+            if entity_id in self.players_by_id:
+                columns, row = self.player_stats, self.players_by_id[entity_id].row
+            elif entity_id in self.clubs_by_id:
+                columns, row = self.club_stats, self.clubs_by_id[entity_id].row
+            else:
+                continue
+
+            for pair in binding.get("stats", {}).get("value", "").split():
+                stat_id, _, value = pair.partition("=")
+                stat_id = sys.intern(stat_id)
+                try:
+                    number = float(value)
+                except ValueError:
+                    continue
+                columns.set(row, stat_id, number)
+                if not value.lstrip("+-").isdigit():
+                    columns.integer.discard(stat_id)
+
+    def build_matrices(self):
+        """Build the stat matrices and the row masks used by leaderboards and percentiles."""
+        self.player_rows = [None] * len(self.players)
+        for player in self.players:
+            self.player_rows[player.row] = player
+
+        self.player_matrix = StatMatrix([player.id for player in self.player_rows], self.player_stats.columns)
+        self.club_matrix = StatMatrix([club.id for club in self.clubs], self.club_stats.columns)
+
+        # Rows with everything a leaderboard row shows (the required patterns of the SPARQL leaderboards)
+        self.player_top_mask = np.array([
+            player.flag is not None and self.is_complete_club(self.clubs_by_id.get(player.club))
+            for player in self.player_rows
+        ], dtype=bool)
+        self.club_top_mask = np.array([
+            self.is_complete_club(club) and None not in (club.flag, club.league)
+            for club in self.clubs
+        ], dtype=bool)
+
+        for player in self.player_rows:
+            for position in player.positions:
+                if position not in self.position_masks:
+                    self.position_masks[position] = np.zeros(len(self.player_rows), dtype=bool)
+                self.position_masks[position][player.row] = True
+
+    @staticmethod
+    def is_complete_club(club):
+        return club is not None and None not in (club.logo, club.color, club.alternate_color)
+
+    def format_value(self, columns, stat_id, value, per90=False):
+        if per90 and stat_id not in NOT_PER_90:
+            return repr(round(float(value), 2))
+        return columns.format(stat_id, value)
+
+    def stat_label(self, stat_id, per90=False):
+        name = self.stat_types[stat_id].name
+        return f"{name} per 90" if per90 and stat_id not in NOT_PER_90 else name
+
+    # Queries (results in the SPARQL JSON format of the query they replace)
+
+    def all_players_results(self):
+        """Same rows as get_all_players_query."""
+        bindings = []
+        for player in self.players:
+            if player.born is None or not player.positions or player.nation is None:
+                continue
+
+            binding = {
+                "player_id": uri(ENT + player.id),
+                "name": literal(player.name),
+                "positions": literal(", ".join(player.positions)),
+                "nation": literal(player.nation),
+                "flag": literal(player.flag),
+                "born": literal(player.born),
+            }
+            club = self.clubs_by_id.get(player.club)
+            if club is not None:
+                binding["currentClubName"] = literal(club.name)
+                if club.logo:
+                    binding["currentClubLogo"] = literal(club.logo)
+            bindings.append(binding)
+
+        return {"results": {"bindings": bindings}}
+
+    def club_players_results(self, club_id):
+        """Same rows as get_club_players_query."""
+        bindings = []
+        for player in self.players_by_club.get(club_id, []):
+            if None in (player.born, player.photo_url, player.nation) or not player.positions:
+                continue
+
+            bindings.append({
+                "player_id": uri(ENT + player.id),
+                "name": literal(player.name),
+                "born": literal(player.born),
+                "photo_url": literal(player.photo_url),
+                "positions": literal(", ".join(player.positions)),
+                "nation": literal(player.nation),
+                "flag": literal(player.flag),
+            })
+
+        return {"results": {"bindings": bindings}}
+
+    def player_stats_results(self, player_id):
+        """Same rows as get_player_stats_query."""
+        bindings = []
+        player = self.players_by_id.get(player_id)
+        if player is not None:
+            for stat_id, stat_type in self.stat_types.items():
+                value = self.player_stats.get(player.row, stat_id)
+                if math.isnan(value):
+                    continue
+
+                bindings.append({
+                    "stat_category": literal(stat_type.category),
+                    "stat_name": literal(stat_type.name),
+                    "stat_value": literal(self.player_stats.format(stat_id, value)),
+                })
+
+        return {"results": {"bindings": bindings}}
+
+    def top_players_results(self, stat_ids, limit=10, per90=False):
+        """Same rows as get_top_players_by_stats_query (optionally ranked per 90 minutes)."""
+        bindings = []
+        minutes = self.player_matrix.minutes
+        for stat_id in stat_ids:
+            if stat_id not in self.stat_types:
+                continue
+
+            values = self.player_matrix.column(stat_id, per90) if stat_id in self.player_matrix.stat_index else None
+            rows = self.player_matrix.top(stat_id, limit, mask=self.player_top_mask, per90=per90, minutes_tiebreak=True)
+            for row in rows:
+                player = self.player_rows[row]
+                club = self.clubs_by_id[player.club]
+                binding = {
+                    "stat": uri(ONT + stat_id),
+                    "player_id": uri(ENT + player.id),
+                    "name": literal(player.name),
+                    "stat_name": literal(self.stat_label(stat_id, per90)),
+                    "stat_value": literal(self.format_value(self.player_stats, stat_id, values[row], per90)),
+                    "min": literal(self.player_stats.format("min", minutes[row])),
+                    "club_name": literal(club.name),
+                    "club_logo": literal(club.logo),
+                    "color": literal(club.color),
+                    "alternateColor": literal(club.alternate_color),
+                    "flag": literal(player.flag),
+                }
+                if player.photo_url:
+                    binding["photo_url"] = literal(player.photo_url)
+                bindings.append(binding)
+
+        return {"results": {"bindings": bindings}}
+
+    def top_clubs_results(self, stat_ids, limit=10):
+        """Same rows as get_top_clubs_by_stats_query."""
+        bindings = []
+        for stat_id in stat_ids:
+            if stat_id not in self.stat_types:
+                continue
+
+            rows = self.club_matrix.top(stat_id, limit, mask=self.club_top_mask)
+            for row in rows:
+                club = self.clubs[row]
+                bindings.append({
+                    "stat": uri(ONT + stat_id),
+                    "club_id": uri(ENT + club.id),
+                    "name": literal(club.name),
+                    "stat_name": literal(self.stat_types[stat_id].name),
+                    "stat_value": literal(self.club_stats.format(stat_id, self.club_matrix.values[row, self.club_matrix.stat_index[stat_id]])),
+                    "logo": literal(club.logo),
+                    "flag": literal(club.flag),
+                    "league_name": literal(club.league),
+                    "color": literal(club.color),
+                    "alternateColor": literal(club.alternate_color),
+                })
+
+        return {"results": {"bindings": bindings}}
+
+    def player_percentiles(self, player_id, per90=False):
+        """
+        Percentile rank of each stat of a player among the players of each of their positions.
+
+        Returns:
+            dict: position -> list of {"id", "name", "category", "value", "percentile"},
+            or None if the player is unknown
+        """
+        player = self.players_by_id.get(player_id)
+        if player is None:
+            return None
+
+        percentiles = {}
+        for position in player.positions:
+            ranks = self.player_matrix.percentiles(player.row, self.position_masks[position], per90)
+            percentiles[position] = [
+                {
+                    "id": stat_id,
+                    "name": self.stat_label(stat_id, per90),
+                    "category": self.stat_types[stat_id].category,
+                    "value": round(value, 2),
+                    "percentile": percentile,
+                }
+                for stat_id, (value, percentile) in ranks.items()
+                if stat_id in self.stat_types
+            ]
+
+        return percentiles
+
+
+def fetch_from_graphdb(query):
+    return execute_query(ENDPOINT_URL, query)
+
+
+def get_data_files():
+    """
+    The RDF files of the file source, as (path, format) pairs.
+
+    READ_MODEL_FILE if it is set, otherwise the partitions listed in the manifest
+    of READ_MODEL_PARTITIONS_DIR (the current output of the converter).
+    """
+    if READ_MODEL_FILE:
+        return [(READ_MODEL_FILE, "n3")]
+
+    manifest = READ_MODEL_PARTITIONS_DIR / "manifest.txt"
+    if not manifest.exists():
+        raise FileNotFoundError(f"{manifest} not found: run data_converter_csv_to_nt.py or set READ_MODEL_FILE")
+
+    # Lines of "file graph hash"; the graphs are merged, like the default graph of GraphDB
+    with open(manifest, encoding="utf-8") as file:
+        return [(str(READ_MODEL_PARTITIONS_DIR / line.split()[0]), "nt") for line in file if line.strip()]
+
+
+def file_fetcher():
+    """Returns a fetch function running the read model queries over the local RDF files with rdflib."""
+    from rdflib import Graph
+
+    graph = Graph()
+    for path, format in get_data_files():
+        graph.parse(path, format=format)
+    if os.path.exists(READ_MODEL_ONTOLOGY_FILE):
+        graph.parse(READ_MODEL_ONTOLOGY_FILE, format="n3")
+
+    def fetch(query):
+        return json.loads(graph.query(query).serialize(format="json"))
+
+    return fetch
+
+
+def load_read_model(source):
+    """
+    Build a new snapshot.
+
+    Args:
+        source: "graphdb" to load it from the SPARQL endpoint, "file" from the converter's
+            partitions (or READ_MODEL_FILE, see get_data_files)
+
+    Returns:
+        ReadModel: The loaded snapshot
+    """
+    start = time.perf_counter()
+    fetch = file_fetcher() if source == "file" else fetch_from_graphdb
+    model = ReadModel.build(source, fetch)
+    print(f"Read model loaded from {source} in {time.perf_counter() - start:.2f}s: "
+          f"{len(model.players)} players, {len(model.clubs)} clubs, {len(model.stat_types)} stats")
+    return model
+
+
+def read_shared_version():
+    """The version in the shared cache: 0 until the first write (the local one outside Django)."""
+    cache = get_cache()
+    if cache is None:
+        return _version or 0
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 0, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_shared_version():
+    """Move the shared version on after a write and return it."""
+    cache = get_cache()
+    if cache is None:
+        return (_version or 0) + 1
+
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # Never set or evicted: a time based value cannot match a version some process still holds
+        version = new_generation()
+        cache.set(VERSION_KEY, version, timeout=None)
+        return version
+
+
+def get_shared_version():
+    """The shared version, read again at most every READ_MODEL_VERSION_TTL seconds."""
+    global _checked, _checked_at
+
+    if _checked is not None and time.monotonic() - _checked_at < READ_MODEL_VERSION_TTL:
+        return _checked
+
+    try:
+        version = read_shared_version()
+    except Exception as e:
+        print(f"Error reading read model version: {e}")
+        return _checked if _checked is not None else _version
+
+    _checked, _checked_at = version, time.monotonic()
+    return version
+
+
+def get_read_model(required=False):
+    """
+    Returns the current snapshot, starting to load it in the background on first use.
+
+    Returns None when the read model is disabled, still being loaded or rebuilt,
+    or failed to load; callers then query GraphDB as usual.
+
+    Args:
+        required: Load a snapshot (from GraphDB) even if READ_MODEL is not set,
+            for features that only exist on top of it (e.g. percentiles)
+    """
+    global _snapshot, _source, _version, _rebuilding, _failed_at
+
+    if not READ_MODEL_SOURCE and not required:
+        return None
+    version = get_shared_version()
+    if _snapshot is not None and version == _version:
+        return _snapshot
+
+    with _lock:
+        if version != _version:
+            # First use, or another worker wrote since this snapshot was loaded
+            _snapshot = None
+            _rebuilding = False
+            _failed_at = None
+            _version = version
+            if version:
+                # Written through the app, so GraphDB is the only up to date source
+                _source = "graphdb"
+        if _snapshot is not None or _rebuilding:
+            return _snapshot
+        if _failed_at is not None and time.time() - _failed_at < RETRY_AFTER:
+            return None
+
+        _rebuilding = True
+        start_load(_source or "graphdb", _version)
+
+    return None
+
+
+def refresh_read_model():
+    """
+    Drop the current snapshot and rebuild it from GraphDB in the background.
+
+    Called after every successful write. Until the new snapshot is swapped in,
+    reads go to GraphDB, so they never see data older than the write. The other
+    workers see the new shared version within READ_MODEL_VERSION_TTL seconds.
+    """
+    global _snapshot, _source, _version, _rebuilding, _checked, _checked_at
+
+    try:
+        version = bump_shared_version()
+    except Exception as e:
+        print(f"Error updating read model version: {e}")
+        version = (_version or 0) + 1
+
+    with _lock:
+        _checked, _checked_at = version, time.monotonic()
+        if not READ_MODEL_SOURCE and _snapshot is None and not _rebuilding:
+            # No snapshot in this process: the next get_read_model loads one for this version
+            return
+
+        _version = version
+        _snapshot = None
+        _rebuilding = True
+        # Writes go to GraphDB, so it is the only up to date source from now on
+        _source = "graphdb"
+        start_load("graphdb", _version)
+
+
+def start_load(source, version):
+    """Load a snapshot on a background thread and swap it in unless a newer write started another load."""
+
+    def load():
+        global _snapshot, _rebuilding, _failed_at
+        try:
+            model = load_read_model(source)
+        except Exception as e:
+            print(f"Error loading read model: {e}")
+            model = None
+
+        with _lock:
+            # A newer write (here or in another worker) started another rebuild: leave the swap to that one
+            if version != _version:
+                return
+            _snapshot = model
+            _rebuilding = False
+            _failed_at = None if model is not None else time.time()
+
+    threading.Thread(target=load, name="read-model-load", daemon=True).start()
+
+
+def get_read_model_stats():
+    """Returns a summary of the current snapshot."""
+    snapshot = _snapshot
+    return {
+        "enabled": bool(READ_MODEL_SOURCE),
+        "loaded": snapshot is not None,
+        "source": snapshot.source if snapshot else None,
+        "loaded_at": snapshot.loaded_at if snapshot else None,
+        "players": len(snapshot.players) if snapshot else 0,
+        "clubs": len(snapshot.clubs) if snapshot else 0,
+        "stats": len(snapshot.stat_types) if snapshot else 0,
+    }
@@ -1,39 +1,41 @@
 import os
-from SPARQLWrapper import SPARQLWrapper, JSON, POST, GET
 from datetime import datetime
 
 from .sparql_queries import (
-    get_player_details_query, get_club_details_query, get_club_players_query,
-    get_all_players_query, get_all_clubs_query, get_player_stats_query,
+    get_player_profile_query, get_club_details_query, get_club_players_query,
+    get_all_players_query, get_players_page_query, get_players_count_query, get_all_clubs_query, get_player_stats_query,
     get_club_stats_query, get_graph_data_query, get_top_players_by_stat_query,
-    get_top_clubs_by_stat_query, get_player_club_query, get_update_player_club_query,
+    get_top_clubs_by_stat_query, get_top_players_by_stats_query, get_top_clubs_by_stats_query,
+    get_player_club_query, get_update_player_club_query,
     get_all_nations_query, get_create_player_query, get_add_player_position_query,
-    get_player_connection_query, get_delete_player_query
+    get_delete_player_query, get_club_enrichment_query, get_stadium_enrichment_query, get_league_enrichment_query,
+    WIKIDATA_FIELDS
+)
+from .sparql_transport import execute_query, execute_update
+from .query_cache import cached_query, invalidate_query_cache
+from .read_model import get_read_model, refresh_read_model
+from .wikidata_client import process_club_details, process_stadium_details, process_league_details, process_league_winners
+from .spin_client import (
+    process_enhanced_player_results, process_teammates_results, process_compatriots_results,
+    process_enhanced_all_players_results, query_player_connections
 )
 
 # Configure your SPARQL endpoint
 ENDPOINT_URL = os.environ.get("GRAPHDB_ENDPOINT", "http://graphdb:7200") + "/repositories/football"
+UPDATE_ENDPOINT_URL = ENDPOINT_URL + "/statements"
 
-def get_sparql_client():
-    """Returns a configured SPARQLWrapper instance."""
-    sparql = SPARQLWrapper(ENDPOINT_URL)
-    sparql.setReturnFormat(JSON)
-    return sparql
-
-def process_query(query, process_func=None, additional_process_params=None, error_message=None, success_message=None):
+def process_query(query, process_func=None, additional_process_params=None, error_message=None, success_message=None, timeout=None):
     """
     Execute a SPARQL query and return the results.
     
     Args:
         query: The SPARQL query string to execute
-        method: HTTP method to use (GET or POST)
+        timeout: Optional timeout (seconds) for the HTTP request
     """
 
-    sparql = get_sparql_client()
-    sparql.setQuery(query)
-    
     try:
-        results = sparql.query().convert()
+        family = process_func.__name__.removeprefix("process_").removesuffix("_results") if process_func else "raw"
+        results = cached_query(query, lambda q: execute_query(ENDPOINT_URL, q, timeout=timeout), family=family)
         if process_func:
             if additional_process_params:
                 return process_func(results, **additional_process_params)
@@ -48,6 +50,11 @@ def process_query(query, process_func=None, additional_process_params=None, erro
             print(f"SPARQL query error: {e}")
         return None
 
+def store_updated():
+    """Drop cached query results and the read model snapshot after a successful write."""
+    invalidate_query_cache()
+    refresh_read_model()
+
 def query_player_details(player_id):
     """
     Query and process player details from the SPARQL endpoint.
@@ -59,15 +66,90 @@ def query_player_details(player_id):
         dict: Processed player data ready for template rendering
     """
     
-    return process_query(get_player_details_query(player_id), process_func=process_player_results, additional_process_params={"player_id": player_id}
-                         , error_message="Error querying player details", success_message="Player details queried successfully")
+    return query_player_profile(player_id)
 
-def process_player_results(results, player_id):
-    """Process the SPARQL query results into the format needed for templates."""
-    if not results["results"]["bindings"]:
-        return get_default_player_data()
+def query_player_profile(player_id, include_spin=False, include_peers=True, timeout=None):
+    """
+    Query and process the full player profile (details, clubs, stats and,
+    optionally, SPIN inferences, teammates and compatriots) in a single request.
     
-    result = results["results"]["bindings"][0]
+    Args:
+        player_id: The ID of the player to query
+        include_spin: Whether to include SPIN rule inferences
+        include_peers: Whether to include the teammates and compatriots (with include_spin)
+        timeout: Optional timeout (seconds) for the SPARQL request
+        
+    Returns:
+        dict: Processed player data ready for template rendering
+    """
+    
+    return process_query(get_player_profile_query(player_id, include_spin, include_peers), process_func=process_player_profile_results,
+                         additional_process_params={"player_id": player_id, "include_spin": include_spin, "include_peers": include_peers},
+                         error_message="Error querying player profile", success_message="Player profile queried successfully",
+                         timeout=timeout)
+
+def process_player_profile_results(results, player_id, include_spin=False, include_peers=True):
+    """
+    Process the combined player profile query results into the format needed for templates.
+    Rows are split by their ?section binding and handed to the existing result processors.
+    """
+    sections = {"details": [], "stat": [], "teammate": [], "compatriot": []}
+    for binding in results["results"]["bindings"]:
+        # Aggregates over an empty match may still yield a row without bindings
+        if "section" in binding:
+            sections[binding["section"]["value"]].append(binding)
+
+    if not sections["details"]:
+        return get_default_player_data()
+
+    player_data = process_player_results(sections["details"][0])
+    player_data["stats"] = process_player_stats_results(as_results(sections["stat"]))
+
+    if include_spin:
+        enhanced_data = process_enhanced_player_results(as_results(sections["details"]), player_id)
+        player_data["spin_inferences"] = enhanced_data["spin_inferences"]
+        if "efficiency" in player_data["spin_inferences"]:
+            add_efficiency_stat(player_data, player_data["spin_inferences"]["efficiency"])
+
+    if include_spin and include_peers:
+        player_data["teammates"] = process_teammates_results(as_results(sections["teammate"]))
+        player_data["compatriots"] = process_compatriots_results(as_results(sections["compatriot"]))
+
+    return player_data
+
+def as_results(bindings):
+    """Wrap a list of bindings in the SPARQL JSON results structure expected by the processors."""
+    return {"results": {"bindings": bindings}}
+
+def add_efficiency_stat(player_data, efficiency_value):
+    """Add (or flag) the SPIN efficiency stat in the player's Attacking category."""
+    # Find the Attacking category
+    attacking_category = None
+    for category in player_data["stats"]:
+        if category["name"] == "Attacking":
+            attacking_category = category
+            break
+
+    if not attacking_category:
+        return
+
+    # Check if efficiency stat already exists
+    efficiency_stat_exists = any(stat["name"] == "Efficiency" for stat in attacking_category["stats"])
+    if not efficiency_stat_exists:
+        # Add efficiency stat to the Attacking category with SPIN badge flag
+        attacking_category["stats"].append({
+            "name": "Efficiency",
+            "value": efficiency_value,
+            "is_spin_stat": True  # Flag to show SPIN badge
+        })
+    else:
+        # Update existing efficiency stat with spin stat
+        for stat in attacking_category["stats"]:
+            if stat["name"] == "Efficiency":
+                stat["is_spin_stat"] = True
+
+def process_player_results(result):
+    """Process a player details binding into the format needed for templates (without stats)."""
     
     # Position mapping dictionary
     position_mapping = {
@@ -80,7 +162,6 @@ def process_player_results(results, player_id):
     # Extract positions from comma-separated string
     positions_str = result.get("positions", {}).get("value", "")
     raw_positions = [pos.strip() for pos in positions_str.split(",")] if positions_str else []
-    print(raw_positions) 
     # Convert abbreviated positions to full names
     positions = []
     for pos in raw_positions:
@@ -133,7 +214,7 @@ def process_player_results(results, player_id):
         "clubs": teams,
         "color": result["currentClubColor"]["value"],
         "alternate_color": result["currentClubAltColor"]["value"],
-        "stats": query_player_stats(player_id),
+        "stats": [],
         "raw_positions": raw_positions
     }
 
@@ -223,6 +304,10 @@ def query_club_players(club_id):
         list: List of processed player data ready for template rendering
     """
     
+    read_model = get_read_model()
+    if read_model is not None:
+        return process_club_players_results(read_model.club_players_results(club_id))
+
     return process_query(get_club_players_query(club_id), process_func=process_club_players_results,
                          error_message="Error querying club players", success_message="Club players queried successfully")
 
@@ -263,6 +348,10 @@ def query_all_players():
         list: List of processed player data ready for template rendering
     """
     
+    read_model = get_read_model()
+    if read_model is not None:
+        return process_all_players_results(read_model.all_players_results())
+
     return process_query(get_all_players_query(), process_func=process_all_players_results,
                          error_message="Error querying all players", success_message="All players queried successfully")
 
@@ -310,6 +399,46 @@ def process_all_players_results(results):
     
     return players
 
+def query_players_page(limit, offset, filters=None, include_spin=False):
+    """
+    Query and process one page of the players list, filtered and ordered by the endpoint.
+    
+    Args:
+        limit: Number of players in the page
+        offset: Number of matching players to skip
+        filters: Optional dict with lowercase "name", "position", "club" and "nation" filters
+        include_spin: Whether to include the SPIN rule inferences of each player
+        
+    Returns:
+        list: Processed player data of the page, in the same format as query_all_players
+        (or query_enhanced_all_players when include_spin is set)
+    """
+    
+    return process_query(get_players_page_query(limit, offset, include_spin=include_spin, **(filters or {})),
+                         process_func=process_enhanced_all_players_results if include_spin else process_all_players_results,
+                         error_message="Error querying players page", success_message="Players page queried successfully")
+
+def query_players_count(filters=None):
+    """
+    Count the players matching the players list filters.
+    
+    Args:
+        filters: Optional dict with lowercase "name", "position", "club" and "nation" filters
+        
+    Returns:
+        int: Number of matching players (0 if the query fails)
+    """
+    
+    return process_query(get_players_count_query(**(filters or {})), process_func=process_count_results,
+                         error_message="Error counting players", success_message="Players counted successfully") or 0
+
+def process_count_results(results):
+    """Process the SPARQL query results of a COUNT query into an int."""
+    if not results["results"]["bindings"]:
+        return 0
+    
+    return int(results["results"]["bindings"][0]["total"]["value"])
+
 def query_all_clubs():
     """
     Query and process a list of all clubs from the SPARQL endpoint.
@@ -359,6 +488,10 @@ def query_player_stats(player_id):
         list: List of processed stats categories ready for template rendering
     """
     
+    read_model = get_read_model()
+    if read_model is not None:
+        return process_player_stats_results(read_model.player_stats_results(player_id))
+
     return process_query(get_player_stats_query(player_id), process_func=process_player_stats_results,
                          error_message="Error querying player stats", success_message="Player stats queried successfully")
 
@@ -561,23 +694,64 @@ def sort_stats_categories(categories):
 
     return sorted_categories
 
-def query_top_players_by_stat(stat_id, limit=10):
+def query_top_players_by_stat(stat_id, limit=10, per90=False):
     """
     Query and process top players for a specific stat from the SPARQL endpoint.
     
     Args:
         stat_id: The ID of the stat to query (e.g., "min" for minutes played)
         limit: Maximum number of players to return (default: 10)
+        per90: Rank by the value per 90 minutes played (served by the read model only)
         
     Returns:
         list: List of players with the specified stat, ordered by stat value
     """
 
+    read_model = get_read_model(required=per90)
+    if read_model is not None:
+        return process_top_players_results(read_model.top_players_results([stat_id], limit, per90=per90))
+    if per90:
+        return []
+
     return process_query(get_top_players_by_stat_query(stat_id, limit), process_func=process_top_players_results,
                          error_message="Error querying top players by stat", success_message="Top players by stat queried successfully")
 
-def process_top_players_results(results):
-    """Process the SPARQL query results for top players into the format needed for templates."""
+def query_top_players_by_stats(stat_ids, limit=10, timeout=None):
+    """
+    Query and process the top players of several stats in a single request.
+    
+    Args:
+        stat_ids: The IDs of the stats to query (e.g., ["mp", "gls"])
+        limit: Maximum number of players per stat (default: 10)
+        timeout: Optional timeout (seconds) for the SPARQL request
+        
+    Returns:
+        dict: Leaderboard of each stat, keyed by stat ID (stats without data are left out)
+    """
+
+    read_model = get_read_model()
+    if read_model is not None:
+        return process_top_players_results(read_model.top_players_results(stat_ids, limit), split_by_stat=True)
+
+    return process_query(get_top_players_by_stats_query(stat_ids, limit), process_func=process_top_players_results,
+                         additional_process_params={"split_by_stat": True},
+                         error_message="Error querying top players by stats", success_message="Top players by stats queried successfully",
+                         timeout=timeout)
+
+def process_top_players_results(results, split_by_stat=False):
+    """
+    Process the SPARQL query results for top players into the format needed for templates.
+
+    With split_by_stat, the results hold several leaderboards (one per ?stat)
+    and a dict of stat ID -> leaderboard is returned instead.
+    """
+    if split_by_stat:
+        groups = split_results_by_stat(
+            results,
+            sort_key=lambda row: (-to_float(row["stat_value"]["value"]), -to_float(row["min"]["value"]), row["player_id"]["value"]),
+        )
+        return {stat_id: process_top_players_results(group) for stat_id, group in groups.items()}
+
     if not results["results"]["bindings"]:
         return []
     
@@ -638,11 +812,49 @@ def query_top_clubs_by_stat(stat_id, limit=10):
         list: List of clubs with the specified stat, ordered by stat value
     """
 
+    read_model = get_read_model()
+    if read_model is not None:
+        return process_top_clubs_results(read_model.top_clubs_results([stat_id], limit))
+
     return process_query(get_top_clubs_by_stat_query(stat_id, limit), process_func=process_top_clubs_results,
                          error_message="Error querying top clubs by stat", success_message="Top clubs by stat queried successfully")
 
-def process_top_clubs_results(results):
-    """Process the SPARQL query results for top clubs into the format needed for templates."""
+def query_top_clubs_by_stats(stat_ids, limit=10, timeout=None):
+    """
+    Query and process the top clubs of several stats in a single request.
+    
+    Args:
+        stat_ids: The IDs of the stats to query (e.g., ["gls", "crdr"])
+        limit: Maximum number of clubs per stat (default: 10)
+        timeout: Optional timeout (seconds) for the SPARQL request
+        
+    Returns:
+        dict: Leaderboard of each stat, keyed by stat ID (stats without data are left out)
+    """
+
+    read_model = get_read_model()
+    if read_model is not None:
+        return process_top_clubs_results(read_model.top_clubs_results(stat_ids, limit), split_by_stat=True)
+
+    return process_query(get_top_clubs_by_stats_query(stat_ids, limit), process_func=process_top_clubs_results,
+                         additional_process_params={"split_by_stat": True},
+                         error_message="Error querying top clubs by stats", success_message="Top clubs by stats queried successfully",
+                         timeout=timeout)
+
+def process_top_clubs_results(results, split_by_stat=False):
+    """
+    Process the SPARQL query results for top clubs into the format needed for templates.
+
+    With split_by_stat, the results hold several leaderboards (one per ?stat)
+    and a dict of stat ID -> leaderboard is returned instead.
+    """
+    if split_by_stat:
+        groups = split_results_by_stat(
+            results,
+            sort_key=lambda row: (-to_float(row["stat_value"]["value"]), row["club_id"]["value"]),
+        )
+        return {stat_id: process_top_clubs_results(group) for stat_id, group in groups.items()}
+
     if not results["results"]["bindings"]:
         return []
     
@@ -692,6 +904,39 @@ def process_top_clubs_results(results):
         "entities": clubs
     }
 
+def split_results_by_stat(results, sort_key):
+    """
+    Split a multi-stat leaderboard result into one result set per stat.
+
+    UNION branches carry no guaranteed order, so each group is re-ranked
+    with sort_key (the same ordering the SPARQL sub-select used).
+    """
+    groups = {}
+    for binding in results["results"]["bindings"]:
+        stat_id = binding["stat"]["value"].split("#")[-1]
+        groups.setdefault(stat_id, []).append(binding)
+
+    return {stat_id: as_results(sorted(bindings, key=sort_key)) for stat_id, bindings in groups.items()}
+
+def to_float(value):
+    """Convert a literal to float for ranking, treating non-numeric values as 0."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def get_default_stat_ranking_data(stat_name):
+    """Return an empty leaderboard card for when a stat ranking could not be loaded."""
+    return {
+        "name": stat_name,
+        "colors": {
+            "main": "6c757d",
+            "alternate": "ffffff",
+            "border": "6c757d",
+        },
+        "entities": []
+    }
+
 def query_player_club(player_id):
         
         current_club = None
@@ -715,16 +960,12 @@ def update_player_club(player_id, current_club, club_id):
     Returns:
         bool: True if update was successful, False otherwise
     """
-    sparql = SPARQLWrapper(ENDPOINT_URL+"/statements")
-    sparql.setReturnFormat(JSON)
-    sparql.setMethod(POST)
-    
     # Get the SPARQL update query from the query generator
     query = get_update_player_club_query(player_id, current_club, club_id)
     
     try:
-        sparql.setQuery(query)
-        sparql.query()
+        execute_update(UPDATE_ENDPOINT_URL, query)
+        store_updated()
         print(f"Player club updated successfully.")
         return True
     except Exception as e:
@@ -775,10 +1016,6 @@ def create_player(id, name, born, positions, photo_url, nation, club):
     Returns:
         bool: True if creation was successful, False otherwise
     """
-    sparql = SPARQLWrapper(ENDPOINT_URL+"/statements")
-    sparql.setReturnFormat(JSON)
-    sparql.setMethod(POST)
-    
     # Construct the URIs
     player_uri = f"http://football.org/ent/{id}"
     club_uri = f"http://football.org/ent/{club}"
@@ -862,8 +1099,8 @@ def create_player(id, name, born, positions, photo_url, nation, club):
     )
     
     try:
-        sparql.setQuery(query)
-        sparql.query()
+        execute_update(UPDATE_ENDPOINT_URL, query)
+        store_updated()
         print(f"Player {name} created successfully.")
         return True
     except Exception as e:
@@ -871,48 +1108,47 @@ def create_player(id, name, born, positions, photo_url, nation, club):
         return False
 
 def add_new_player_position(player_id, position):
-    sparql = SPARQLWrapper(ENDPOINT_URL+"/statements")
-    sparql.setReturnFormat(JSON)
-    sparql.setMethod(POST)
-
-    sparql.setQuery(get_add_player_position_query(player_id, position))
-
     try:
-        sparql.query()
+        execute_update(UPDATE_ENDPOINT_URL, get_add_player_position_query(player_id, position))
+        store_updated()
         print(f"New position created successfully.")
     except Exception as e:
         print(f"Error creating updating position: {e}")
         return False
     return True
 
-def check_player_connection(player1_id, player2_id):
+def check_player_connection(player1_id, player2_id, connection_flags=None):
     """
-    Check if two players have a connection using SPARQL ASK queries.
+    Check if two players have a connection.
     
     Args:
         player1_id: ID of the first player
         player2_id: ID of the second player
+        connection_flags: Result of query_player_connections, if already fetched
         
     Returns:
         dict: Connection details with type and existence status
     """
+    if connection_flags is None:
+        connection_flags = query_player_connections(player1_id, player2_id) or {}
+
     connections = {}
     
     # Check if they played for the same club (current or past)
     connections["same_club"] = {
-        "exists": check_same_club_connection(player1_id, player2_id),
+        "exists": connection_flags.get("same_club", False),
         "description": "Played for the same club"
     }
     
     # Check if they are from the same country
     connections["same_country"] = {
-        "exists": check_same_country_connection(player1_id, player2_id),
+        "exists": connection_flags.get("same_country", False),
         "description": "Come from the same country"
     }
     
     # Check if they play the same position
     connections["same_position"] = {
-        "exists": check_same_position_connection(player1_id, player2_id),
+        "exists": connection_flags.get("same_position", False),
         "description": "Play the same position"
     }
     
@@ -926,43 +1162,6 @@ def check_player_connection(player1_id, player2_id):
         "connections": connections
     }
 
-def check_same_club_connection(player1_id, player2_id):
-    """Check if two players have played for the same club (current or past)."""
-    sparql = get_sparql_client()
-    
-    sparql.setQuery(get_player_connection_query("same_club", player1_id, player2_id))
-
-    try:
-        return sparql.query().convert()["boolean"]
-    except Exception as e:
-        print(f"SPARQL query error: {e}")
-        return False
-
-def check_same_country_connection(player1_id, player2_id):
-    """Check if two players are from the same country."""
-    sparql = get_sparql_client()
-    
-    
-    sparql.setQuery(get_player_connection_query("same_country", player1_id, player2_id))
-
-    try:
-        return sparql.query().convert()["boolean"]
-    except Exception as e:
-        print(f"SPARQL query error: {e}")
-        return False
-
-def check_same_position_connection(player1_id, player2_id):
-    """Check if two players play the same position."""
-    sparql = get_sparql_client()
-
-    sparql.setQuery(get_player_connection_query("same_position", player1_id, player2_id))
-
-    try:
-        return sparql.query().convert()["boolean"]
-    except Exception as e:
-        print(f"SPARQL query error: {e}")
-        return False
-
 def delete_player(player_id):
     """
     Delete a player and all their connections from the RDF graph.
@@ -973,16 +1172,97 @@ def delete_player(player_id):
     Returns:
         bool: True if deletion was successful, False otherwise
     """
-    sparql = SPARQLWrapper(ENDPOINT_URL+"/statements")
-    sparql.setReturnFormat(JSON)
-    sparql.setMethod(POST)
-    
-    sparql.setQuery(get_delete_player_query(player_id))
-
     try:
-        sparql.query()
+        execute_update(UPDATE_ENDPOINT_URL, get_delete_player_query(player_id))
+        store_updated()
         print(f"Player {player_id} deleted successfully.")
         return True
     except Exception as e:
         print(f"Error deleting player: {e}")
         return False
+
+def query_player_percentiles(player_id, per90=False):
+    """
+    Percentile rank of each stat of a player among the players of the same position.
+
+    Computed on the read model, which is loaded on demand if it is not enabled.
+
+    Args:
+        player_id: The ID of the player
+        per90: Rank values per 90 minutes played instead of totals
+
+    Returns:
+        dict: Position -> list of stats with value and percentile, or None if
+        the player is unknown or the read model is not loaded (yet)
+    """
+
+    read_model = get_read_model(required=True)
+    if read_model is None:
+        return None
+
+    return read_model.player_percentiles(player_id, per90=per90)
+
+def query_club_enrichment(club_id):
+    """
+    Query a club name and its Wikidata details materialized in GraphDB (see wikidata_graph.py).
+
+    Args:
+        club_id: The ID of the club
+
+    Returns:
+        dict: Club name and processed Wikidata details (as query_club_details_extra
+        returns them), or None if the club was not materialized
+    """
+
+    return process_query(get_club_enrichment_query(club_id), process_func=process_club_enrichment_results,
+                         error_message="Error querying club enrichment", success_message="Club enrichment queried successfully")
+
+def is_materialized(results, kind):
+    """True if the first row holds at least one of the Wikidata fields of the given kind."""
+    bindings = results["results"]["bindings"]
+    return bool(bindings) and any(field in bindings[0] for field in WIKIDATA_FIELDS[kind])
+
+def process_club_enrichment_results(results):
+    """Process the local club enrichment rows with the same function as the Wikidata rows."""
+    if not is_materialized(results, "Club"):
+        return None
+    return {"name": results["results"]["bindings"][0]["name"]["value"], "details": process_club_details(results)}
+
+def query_stadium_enrichment(stadium_id):
+    """
+    Query the Wikidata details of a stadium materialized in GraphDB.
+
+    Returns:
+        dict: Processed stadium data (as query_stadium_details returns it), or None if not materialized
+    """
+
+    return process_query(get_stadium_enrichment_query(stadium_id), process_func=process_stadium_enrichment_results,
+                         error_message="Error querying stadium enrichment", success_message="Stadium enrichment queried successfully")
+
+def process_stadium_enrichment_results(results):
+    if not is_materialized(results, "Stadium"):
+        return None
+    return process_stadium_details(results)
+
+def query_league_enrichment(league_name):
+    """
+    Query the Wikidata details and season winners of a league materialized in GraphDB.
+
+    Returns:
+        dict: Processed league data (as query_league_details returns it), with
+        the winners under "winners", or None if not materialized
+    """
+
+    return process_query(get_league_enrichment_query(league_name), process_func=process_league_enrichment_results,
+                         error_message="Error querying league enrichment", success_message="League enrichment queried successfully")
+
+def process_league_enrichment_results(results):
+    if not is_materialized(results, "League"):
+        return None
+
+    league_id = results["results"]["bindings"][0]["wikidata"]["value"]
+    league = process_league_details(results, league_id=league_id)
+    winners = [row for row in results["results"]["bindings"] if "seasonLabel" in row]
+    if winners:
+        league["winners"] = process_league_winners({"results": {"bindings": winners}})
+    return league
@@ -1,52 +1,151 @@
-def get_player_details_query(player_id):
-    """Returns SPARQL query for fetching player details."""
+import textwrap
+
+from .spin_queries import get_peer_pattern
+
+def get_player_profile_query(player_id, include_spin=False, include_peers=True):
+    """
+    Returns a single SPARQL query for the whole player profile.
+
+    Player details, current/past clubs and stats (and, when include_spin is set,
+    SPIN inferences and, unless include_peers is False, teammates and compatriots)
+    are fetched as a UNION of sub-selects; each row carries a ?section binding
+    telling which part it is.
+    """
+    spin_selects = ""
+    spin_optionals = ""
+    spin_group_by = ""
+    spin_sections = ""
+    if include_spin:
+        spin_vars = [
+            "currentAge", "efficiency", "veteranStatus", "youngProspect", "penaltySpecialist",
+            "playmaker", "goalThreat", "disciplinaryRisk", "keyPlayer", "playerType", "versatilePlayer"
+        ]
+        spin_selects = "\n".join(f"                ?{var}" for var in spin_vars)
+        spin_optionals = "\n".join(f"                OPTIONAL {{ ?player_id ont:{var} ?{var} . }}" for var in spin_vars)
+        spin_group_by = " " + " ".join(f"?{var}" for var in spin_vars)
+    if include_spin and include_peers:
+        spin_sections = f"""
+        UNION
+        {{
+            SELECT
+                ?section
+                ?teammate_id
+                ?name
+                ?photo_url
+                (GROUP_CONCAT(DISTINCT ?position; separator=", ") AS ?positions)
+                ?nation
+                ?flag
+            WHERE {{
+                VALUES ?player_id {{ <http://football.org/ent/{player_id}> }}
+                BIND("teammate" AS ?section)
+
+                {get_peer_pattern("teammate", "?player_id", "?teammate_id")}
+                ?teammate_id fut-rel:name ?name ;
+                        fut-rel:position ?position ;
+                        fut-rel:nation [ fut-rel:name ?nation ; fut-rel:flag ?flag ] ;
+                        fut-rel:photo_url ?photo_url .
+            }}
+            GROUP BY ?section ?teammate_id ?name ?photo_url ?nation ?flag
+            ORDER BY ?name
+        }}
+        UNION
+        {{
+            SELECT
+                ?section
+                ?compatriot_id
+                ?name
+                ?photo_url
+                (GROUP_CONCAT(DISTINCT ?position; separator=", ") AS ?positions)
+                ?currentClubName
+                ?currentClubLogo
+            WHERE {{
+                VALUES ?player_id {{ <http://football.org/ent/{player_id}> }}
+                BIND("compatriot" AS ?section)
+
+                {get_peer_pattern("compatriot", "?player_id", "?compatriot_id")}
+                ?compatriot_id fut-rel:name ?name ;
+                        fut-rel:position ?position ;
+                        fut-rel:photo_url ?photo_url .
+
+                OPTIONAL {{
+                    ?compatriot_id fut-rel:club ?currentClub .
+                    ?currentClub fut-rel:name ?currentClubName ;
+                                fut-rel:logo ?currentClubLogo .
+                }}
+            }}
+            GROUP BY ?section ?compatriot_id ?name ?photo_url ?currentClubName ?currentClubLogo
+            ORDER BY ?name
+        }}"""
+
     return f"""
     PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
     PREFIX fut-rel: <http://football.org/rel/>
     PREFIX ont: <http://football.org/ontology#>
 
-    SELECT
-        ?player_id
-        ?name
-        (GROUP_CONCAT(DISTINCT ?position; separator=", ") AS ?positions)
-        ?nation
-        ?flag
-        ?photo_url
-        ?currentClub
-        ?currentClubName
-        ?currentClubLogo
-        ?currentClubColor
-        ?currentClubAltColor
-        (GROUP_CONCAT(DISTINCT ?pastClub; separator=", ") AS ?pastClubs)
-        (GROUP_CONCAT(DISTINCT ?pastClubName; separator=", ") AS ?pastClubNames)
-        (GROUP_CONCAT(DISTINCT ?pastClubLogo; separator=", ") AS ?pastClubLogos)
-        ?born
+    SELECT *
     WHERE {{
-        # Filter for a specific player by ID
-        VALUES ?player_id {{ <http://football.org/ent/{player_id}> }} 
-        
-        ?player_id rdf:type ?class ;
-                fut-rel:name ?name ;
-                fut-rel:position ?position ;
-                fut-rel:nation [ fut-rel:name ?nation ; fut-rel:flag ?flag ] ;
-                fut-rel:born ?born ;
-                fut-rel:photo_url ?photo_url ;
-                fut-rel:club ?currentClub .
-        ?class rdfs:subClassOf* ont:Player .
+        {{
+            SELECT
+                ?section
+                ?player_id
+                ?name
+                (GROUP_CONCAT(DISTINCT ?position; separator=", ") AS ?positions)
+                ?nation
+                ?flag
+                ?photo_url
+                ?currentClub
+                ?currentClubName
+                ?currentClubLogo
+                ?currentClubColor
+                ?currentClubAltColor
+                (GROUP_CONCAT(DISTINCT ?pastClub; separator=", ") AS ?pastClubs)
+                (GROUP_CONCAT(DISTINCT ?pastClubName; separator=", ") AS ?pastClubNames)
+                (GROUP_CONCAT(DISTINCT ?pastClubLogo; separator=", ") AS ?pastClubLogos)
+                ?born
+{spin_selects}
+            WHERE {{
+                # Filter for a specific player by ID
+                VALUES ?player_id {{ <http://football.org/ent/{player_id}> }}
+                BIND("details" AS ?section)
 
-        ?currentClub fut-rel:name ?currentClubName ;
-                    fut-rel:logo ?currentClubLogo ;
-                    fut-rel:color ?currentClubColor ;
-                    fut-rel:alternateColor ?currentClubAltColor .
+                ?player_id rdf:type ?class ;
+                        fut-rel:name ?name ;
+                        fut-rel:position ?position ;
+                        fut-rel:nation [ fut-rel:name ?nation ; fut-rel:flag ?flag ] ;
+                        fut-rel:born ?born ;
+                        fut-rel:photo_url ?photo_url ;
+                        fut-rel:club ?currentClub .
+                ?class rdfs:subClassOf* ont:Player .
 
-        # Get past clubs
-        OPTIONAL {{
-            ?player_id fut-rel:past_club ?pastClub .
-            ?pastClub fut-rel:name ?pastClubName ;
-                    fut-rel:logo ?pastClubLogo .
+                ?currentClub fut-rel:name ?currentClubName ;
+                            fut-rel:logo ?currentClubLogo ;
+                            fut-rel:color ?currentClubColor ;
+                            fut-rel:alternateColor ?currentClubAltColor .
+
+                # Get past clubs
+                OPTIONAL {{
+                    ?player_id fut-rel:past_club ?pastClub .
+                    ?pastClub fut-rel:name ?pastClubName ;
+                            fut-rel:logo ?pastClubLogo .
+                }}
+{spin_optionals}
+            }}
+            GROUP BY ?section ?player_id ?name ?nation ?flag ?photo_url ?currentClub ?currentClubName ?currentClubLogo ?currentClubColor ?currentClubAltColor ?born{spin_group_by}
         }}
+        UNION
+        {{
+            SELECT ?section ?stat_category ?stat_name ?stat_value
+            WHERE {{
+                VALUES ?player_id {{ <http://football.org/ent/{player_id}> }}
+                BIND("stat" AS ?section)
+
+                ?player_id ?stat ?stat_value .
+                ?stat ont:statType/rdfs:label ?stat_category ;
+                    rdfs:label ?stat_name .
+            }}
+        }}{spin_sections}
     }}
-    GROUP BY ?player_id ?name ?nation ?flag ?photo_url ?currentClub ?currentClubName ?currentClubLogo ?currentClubColor ?currentClubAltColor ?born
     """
 
 def get_club_details_query(club_id):
@@ -155,6 +254,146 @@ def get_all_players_query():
     ORDER BY ?name
     """
 
+def escape_literal(value):
+    """Escape a user supplied value for use inside a double-quoted SPARQL literal."""
+    return (value.replace("\\", "\\\\").replace('"', '\\"')
+                 .replace("\n", "\\n").replace("\r", "\\r"))
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+def term(binding):
+    """RDF term of a SPARQL JSON binding, as a hashable (type, value, datatype, lang) tuple."""
+    kind = "literal" if binding["type"] in ("literal", "typed-literal") else binding["type"]
+    return (kind, binding["value"], binding.get("datatype"), binding.get("xml:lang"))
+
+def serialize(value):
+    """SPARQL / N-Triples form of a term (as returned by term)."""
+    kind, lexical, datatype, lang = value
+    if kind == "uri":
+        return f"<{lexical}>"
+    if kind == "bnode":
+        return f"_:{lexical}"
+    literal = f'"{escape_literal(lexical)}"'
+    if lang:
+        return f"{literal}@{lang}"
+    if datatype and datatype != XSD + "string":
+        return f"{literal}^^<{datatype}>"
+    return literal
+
+def get_players_filter_pattern(name=None, position=None, club=None, nation=None):
+    """
+    Returns the graph pattern matching the players listed on /players, restricted
+    by the given (lowercase) filters.
+
+    name, club and nation match as substrings; position must equal one of the
+    player's positions.
+    """
+    filters = ""
+    if name:
+        filters += f"""
+        FILTER(CONTAINS(LCASE(?name), "{escape_literal(name)}"))"""
+    if position:
+        filters += f"""
+        FILTER EXISTS {{
+            ?player_id fut-rel:position ?filterPosition .
+            FILTER(LCASE(STR(?filterPosition)) = "{escape_literal(position)}")
+        }}"""
+    if club:
+        filters += f"""
+        ?player_id fut-rel:club/fut-rel:name ?filterClubName .
+        FILTER(CONTAINS(LCASE(?filterClubName), "{escape_literal(club)}"))"""
+    if nation:
+        filters += f"""
+        FILTER(CONTAINS(LCASE(?filterNation), "{escape_literal(nation)}"))"""
+
+    return f"""
+        ?player_id rdf:type ?class ;
+                fut-rel:name ?name ;
+                fut-rel:position [] ;
+                fut-rel:nation [ fut-rel:name ?filterNation ; fut-rel:flag [] ] ;
+                fut-rel:born [] .
+        ?class rdfs:subClassOf* ont:Player .{filters}"""
+
+def get_players_count_query(name=None, position=None, club=None, nation=None):
+    """Returns SPARQL query for counting the players matching the /players filters."""
+    return f"""
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT (COUNT(DISTINCT ?player_id) AS ?total)
+    WHERE {{{get_players_filter_pattern(name, position, club, nation)}
+    }}
+    """
+
+def get_players_page_query(limit, offset, name=None, position=None, club=None, nation=None, include_spin=False):
+    """
+    Returns SPARQL query for fetching one page of the /players list.
+
+    The filters, ordering and LIMIT/OFFSET are applied in a sub-select on the
+    player ids, so only the players of the page are grouped and returned.
+    The columns are the same as get_all_players_query (plus the SPIN
+    inferences of get_enhanced_all_players_query when include_spin is set).
+    """
+    spin_vars = """
+        ?currentAge
+        ?efficiency
+        ?playerType
+        ?veteranStatus
+        ?youngProspect
+        ?keyPlayer""" if include_spin else ""
+    spin_group_vars = " ?currentAge ?efficiency ?playerType ?veteranStatus ?youngProspect ?keyPlayer" if include_spin else ""
+
+    spin_patterns = """
+
+        # SPIN rule inferences
+        OPTIONAL { ?player_id ont:currentAge ?currentAge . }
+        OPTIONAL { ?player_id ont:efficiency ?efficiency . }
+        OPTIONAL { ?player_id ont:playerType ?playerType . }
+        OPTIONAL { ?player_id ont:veteranStatus ?veteranStatus . }
+        OPTIONAL { ?player_id ont:youngProspect ?youngProspect . }
+        OPTIONAL { ?player_id ont:keyPlayer ?keyPlayer . }""" if include_spin else ""
+
+    return f"""
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT
+        ?player_id
+        ?name
+        (GROUP_CONCAT(DISTINCT ?position; separator=", ") AS ?positions)
+        ?nation
+        ?flag
+        ?currentClubName
+        ?currentClubLogo
+        ?born{spin_vars}
+    WHERE {{
+        {{
+            SELECT DISTINCT ?player_id ?name
+            WHERE {{{textwrap.indent(get_players_filter_pattern(name, position, club, nation), "    ")}
+            }}
+            ORDER BY ?name ?player_id
+            LIMIT {int(limit)}
+            OFFSET {int(offset)}
+        }}
+
+        ?player_id fut-rel:position ?position ;
+                fut-rel:nation [ fut-rel:name ?nation ; fut-rel:flag ?flag ] ;
+                fut-rel:born ?born .
+
+        OPTIONAL {{
+            ?player_id fut-rel:club ?currentClub .
+            OPTIONAL {{ ?currentClub fut-rel:name ?currentClubName . }}
+            OPTIONAL {{ ?currentClub fut-rel:logo ?currentClubLogo . }}
+        }}{spin_patterns}
+    }}
+    GROUP BY ?player_id ?name ?nation ?flag ?born ?currentClubName ?currentClubLogo{spin_group_vars}
+    ORDER BY ?name ?player_id
+    """
+
 def get_all_clubs_query():
     """Returns SPARQL query for fetching all clubs."""
     return """
@@ -380,6 +619,123 @@ def get_top_clubs_by_stat_query(stat_id, limit=10):
     LIMIT {limit}
     """
 
+def get_top_players_by_stats_query(stat_ids, limit=10):
+    """
+    Returns a single SPARQL query for fetching the top players of several statistics.
+
+    Each stat gets its own ranked, limited sub-select and the sub-selects are
+    joined with UNION, so every leaderboard comes back in one request.
+    Rows carry ?stat so the results can be split back per stat.
+    """
+    subqueries = []
+    for stat_id in stat_ids:
+        subqueries.append(f"""
+        {{
+            SELECT
+                ?stat
+                ?player_id
+                ?name
+                ?photo_url
+                ?stat_name
+                ?stat_value
+                ?min
+                ?club_name
+                ?club_logo
+                ?color
+                ?alternateColor
+                ?flag
+            WHERE {{
+                VALUES ?stat {{ <http://football.org/ontology#{stat_id}> }}
+
+                ?player_id rdf:type ?class ;
+                        fut-rel:name ?name ;
+                        ?stat ?stat_value ;
+                        fut-rel:club ?club ;
+                        fut-rel:nation/fut-rel:flag ?flag ;
+                        ont:min ?min .
+                ?class rdfs:subClassOf* ont:Player .
+
+                ?club fut-rel:name ?club_name ;
+                      fut-rel:logo ?club_logo ;
+                      fut-rel:color ?color ;
+                      fut-rel:alternateColor ?alternateColor .
+
+                ?stat rdfs:label ?stat_name .
+
+                OPTIONAL {{ ?player_id fut-rel:photo_url ?photo_url . }}
+            }}
+            ORDER BY DESC(xsd:float(?stat_value)) DESC(xsd:float(?min)) ?player_id
+            LIMIT {limit}
+        }}""")
+
+    union_block = "\n        UNION".join(subqueries)
+
+    return f"""
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT *
+    WHERE {{{union_block}
+    }}
+    """
+
+def get_top_clubs_by_stats_query(stat_ids, limit=10):
+    """
+    Returns a single SPARQL query for fetching the top clubs of several statistics.
+
+    Same UNION-of-ranked-sub-selects layout as get_top_players_by_stats_query.
+    """
+    subqueries = []
+    for stat_id in stat_ids:
+        subqueries.append(f"""
+        {{
+            SELECT
+                ?stat
+                ?club_id
+                ?name
+                ?stat_name
+                ?stat_value
+                ?logo
+                ?flag
+                ?league_name
+                ?color
+                ?alternateColor
+            WHERE {{
+                VALUES ?stat {{ <http://football.org/ontology#{stat_id}> }}
+
+                ?club_id rdf:type ?class ;
+                        fut-rel:name ?name ;
+                        ?stat ?stat_value ;
+                        fut-rel:logo ?logo ;
+                        fut-rel:color ?color ;
+                        fut-rel:alternateColor ?alternateColor ;
+                        fut-rel:country/fut-rel:flag ?flag ;
+                        fut-rel:league/fut-rel:name ?league_name .
+                ?class rdfs:subClassOf* ont:Club .
+
+                ?stat rdfs:label ?stat_name .
+            }}
+            ORDER BY DESC(xsd:float(?stat_value)) ?club_id
+            LIMIT {limit}
+        }}""")
+
+    union_block = "\n        UNION".join(subqueries)
+
+    return f"""
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT *
+    WHERE {{{union_block}
+    }}
+    """
+
 def get_player_club_query(player_id):
     """Returns SPARQL query for fetching a player's current club."""
     return f"""
@@ -466,54 +822,58 @@ def get_add_player_position_query(player_id, position):
     }}
     """
 
-def get_player_connection_query(connection_type, player1_id, player2_id):
-    """Returns SPARQL ASK query for checking connections between players."""
-    if connection_type == "same_club":
-        return f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX fut-rel: <http://football.org/rel/>
-        
-        ASK {{
-            {{
-                # Both at same current club
-                <http://football.org/ent/{player1_id}> fut-rel:club ?club .
-                <http://football.org/ent/{player2_id}> fut-rel:club ?club .
-            }} UNION {{
-                # Player 1 current, Player 2 past
-                <http://football.org/ent/{player1_id}> fut-rel:club ?club .
-                <http://football.org/ent/{player2_id}> fut-rel:past_club ?club .
-            }} UNION {{
-                # Player 1 past, Player 2 current
-                <http://football.org/ent/{player1_id}> fut-rel:past_club ?club .
-                <http://football.org/ent/{player2_id}> fut-rel:club ?club .
-            }} UNION {{
-                # Both at same past club
-                <http://football.org/ent/{player1_id}> fut-rel:past_club ?club .
-                <http://football.org/ent/{player2_id}> fut-rel:past_club ?club .
-            }}
-        }}
-        """
-    elif connection_type == "same_country":
-        return f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX fut-rel: <http://football.org/rel/>
-        
-        ASK {{
-            <http://football.org/ent/{player1_id}> fut-rel:nation ?country .
-            <http://football.org/ent/{player2_id}> fut-rel:nation ?country .
-        }}
-        """
-    elif connection_type == "same_position":
-        return f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX fut-rel: <http://football.org/rel/>
-        
-        ASK {{
-            <http://football.org/ent/{player1_id}> fut-rel:position ?position .
-            <http://football.org/ent/{player2_id}> fut-rel:position ?position .
-        }}
-        """
-    return None
+def get_player_connections_query(player1_id, player2_id, include_spin=False):
+    """
+    Returns a single SPARQL query evaluating every connection type between two players.
+
+    The result has one row with a boolean column per connection type
+    (same club, country and position and, when include_spin is set, the
+    teammate, compatriot, player type and past teammate SPIN inferences).
+    """
+    player1 = f"<http://football.org/ent/{player1_id}>"
+    player2 = f"<http://football.org/ent/{player2_id}>"
+
+    spin_vars = """
+        ?teammate
+        ?compatriot
+        ?same_player_type
+        ?past_teammate""" if include_spin else ""
+
+    spin_binds = f"""
+
+        BIND(EXISTS {{ {get_peer_pattern("teammate", player1, player2)} }} AS ?teammate)
+        BIND(EXISTS {{ {get_peer_pattern("compatriot", player1, player2)} }} AS ?compatriot)
+        BIND(EXISTS {{
+            {player1} ont:playerType ?type .
+            {player2} ont:playerType ?type .
+        }} AS ?same_player_type)
+        BIND(EXISTS {{ {get_peer_pattern("pastTeammate", player1, player2)} }} AS ?past_teammate)""" if include_spin else ""
+
+    return f"""
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT
+        ?same_club
+        ?same_country
+        ?same_position{spin_vars}
+    WHERE {{
+        # Current or past club of one player is a current or past club of the other
+        BIND(EXISTS {{
+            {player1} fut-rel:club|fut-rel:past_club ?club .
+            {player2} fut-rel:club|fut-rel:past_club ?club .
+        }} AS ?same_club)
+        BIND(EXISTS {{
+            {player1} fut-rel:nation ?country .
+            {player2} fut-rel:nation ?country .
+        }} AS ?same_country)
+        BIND(EXISTS {{
+            {player1} fut-rel:position ?position .
+            {player2} fut-rel:position ?position .
+        }} AS ?same_position){spin_binds}
+    }}
+    """
 
 def get_delete_player_query(player_id):
     """Returns SPARQL query for deleting a player and all their connections."""
@@ -537,3 +897,260 @@ def get_delete_player_query(player_id):
         OPTIONAL {{ ?s ?p2 <http://football.org/ent/{player_id}> . }}
     }}
     """
+
+def get_read_model_players_query():
+    """Returns SPARQL query for loading every player into the in-process read model."""
+    return """
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT
+        ?player_id
+        ?name
+        ?born
+        ?photo_url
+        (GROUP_CONCAT(DISTINCT ?position; separator=", ") AS ?positions)
+        ?nation
+        ?flag
+        ?club
+    WHERE {
+        ?player_id rdf:type ?class ;
+                fut-rel:name ?name .
+        ?class rdfs:subClassOf* ont:Player .
+
+        OPTIONAL { ?player_id fut-rel:born ?born . }
+        OPTIONAL { ?player_id fut-rel:photo_url ?photo_url . }
+        OPTIONAL { ?player_id fut-rel:position ?position . }
+        OPTIONAL { ?player_id fut-rel:nation [ fut-rel:name ?nation ; fut-rel:flag ?flag ] . }
+        OPTIONAL { ?player_id fut-rel:club ?club . }
+    }
+    GROUP BY ?player_id ?name ?born ?photo_url ?nation ?flag ?club
+    """
+
+def get_read_model_clubs_query():
+    """Returns SPARQL query for loading every club into the in-process read model."""
+    return """
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT
+        ?club_id
+        ?name
+        ?logo
+        ?color
+        ?alternateColor
+        ?league_name
+        ?flag
+    WHERE {
+        ?club_id rdf:type ?class ;
+                fut-rel:name ?name .
+        ?class rdfs:subClassOf* ont:Club .
+
+        OPTIONAL { ?club_id fut-rel:logo ?logo . }
+        OPTIONAL { ?club_id fut-rel:color ?color . }
+        OPTIONAL { ?club_id fut-rel:alternateColor ?alternateColor . }
+        OPTIONAL { ?club_id fut-rel:league/fut-rel:name ?league_name . }
+        OPTIONAL { ?club_id fut-rel:country/fut-rel:flag ?flag . }
+    }
+    """
+
+def get_read_model_stat_types_query():
+    """Returns SPARQL query for loading the label and category of every statistic."""
+    return """
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX ont: <http://football.org/ontology#>
+
+    SELECT ?stat ?stat_name ?stat_category
+    WHERE {
+        ?stat ont:statType/rdfs:label ?stat_category ;
+            rdfs:label ?stat_name .
+    }
+    """
+
+def get_read_model_stat_values_query():
+    """
+    Returns SPARQL query for loading every stat value of every entity.
+
+    Values are packed per entity as "stat_id=value" pairs so the result has
+    one row per entity instead of one per triple.
+    """
+    return """
+    SELECT ?entity (GROUP_CONCAT(?pair; separator=" ") AS ?stats)
+    WHERE {
+        ?entity ?stat ?value .
+        FILTER(STRSTARTS(STR(?stat), "http://football.org/stat/"))
+        BIND(CONCAT(STRAFTER(STR(?stat), "http://football.org/stat/"), "=", STR(?value)) AS ?pair)
+    }
+    GROUP BY ?entity
+    """
+
+# Wikidata enrichment materialized in GraphDB (see wikidata_graph.py)
+WIKIDATA_GRAPH = "http://football.org/graph/wikidata"
+WIKIDATA_NAMESPACE = "http://football.org/wikidata/"
+
+# Variables of the Wikidata details queries stored for each kind of entity, under
+# the same names, so the local rows are processed like the Wikidata ones
+WIKIDATA_FIELDS = {
+    "Club": ["sponsors", "kitInfo", "officialName", "nicknames", "audio", "inception",
+             "presidentInfo", "coachInfo", "stadiumInfo", "mediaFollowers"],
+    "Stadium": ["label", "name", "opening", "image", "location", "capacity", "categoryName", "events"],
+    "League": ["name", "logo", "numTeams", "website"],
+    "Season": ["seasonLabel", "winnerLabel", "team1", "team1Label"],
+}
+
+def get_enrichment_optionals(kind, subject):
+    return "\n".join(
+        f"OPTIONAL {{ {subject} fut-wd:{field} ?{field} . }}" for field in WIKIDATA_FIELDS[kind]
+    )
+
+def get_club_enrichment_query(club_id):
+    """Returns SPARQL query for fetching a club name and its materialized Wikidata details."""
+    return f"""
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX fut-wd: <{WIKIDATA_NAMESPACE}>
+
+    SELECT ?name ?wikidata ?fetchedAt {" ".join("?" + field for field in WIKIDATA_FIELDS["Club"])}
+    WHERE {{
+        <http://football.org/ent/{club_id}> fut-rel:name ?name .
+        GRAPH <{WIKIDATA_GRAPH}> {{
+            <http://football.org/ent/{club_id}> fut-wd:wikidata ?wikidata .
+            ?wikidata fut-wd:fetchedAt ?fetchedAt .
+            {get_enrichment_optionals("Club", "?wikidata")}
+        }}
+    }}
+    LIMIT 1
+    """
+
+def get_stadium_enrichment_query(stadium_id):
+    """Returns SPARQL query for fetching the materialized Wikidata details of a stadium."""
+    return f"""
+    PREFIX fut-wd: <{WIKIDATA_NAMESPACE}>
+
+    SELECT ?fetchedAt {" ".join("?" + field for field in WIKIDATA_FIELDS["Stadium"])}
+    WHERE {{
+        GRAPH <{WIKIDATA_GRAPH}> {{
+            <http://www.wikidata.org/entity/{stadium_id}> fut-wd:fetchedAt ?fetchedAt .
+            {get_enrichment_optionals("Stadium", f"<http://www.wikidata.org/entity/{stadium_id}>")}
+        }}
+    }}
+    LIMIT 1
+    """
+
+def get_league_enrichment_query(league_name):
+    """
+    Returns SPARQL query for fetching the materialized Wikidata details of a
+    league (by name), one row per season winner, most recent first.
+    """
+    return f"""
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX fut-wd: <{WIKIDATA_NAMESPACE}>
+
+    SELECT ?wikidata ?fetchedAt {" ".join("?" + field for field in WIKIDATA_FIELDS["League"] + WIKIDATA_FIELDS["Season"])}
+    WHERE {{
+        ?league fut-rel:name "{escape_literal(league_name)}" .
+        GRAPH <{WIKIDATA_GRAPH}> {{
+            ?league fut-wd:wikidata ?wikidata .
+            ?wikidata fut-wd:fetchedAt ?fetchedAt .
+            {get_enrichment_optionals("League", "?wikidata")}
+            OPTIONAL {{
+                ?wikidata fut-wd:season ?season .
+                ?season fut-wd:rank ?rank .
+                {get_enrichment_optionals("Season", "?season")}
+            }}
+        }}
+    }}
+    ORDER BY ?rank
+    """
+
+def get_enrichment_ages_query():
+    """Returns SPARQL query for fetching when each materialized Wikidata entity was fetched."""
+    return f"""
+    PREFIX fut-wd: <{WIKIDATA_NAMESPACE}>
+
+    SELECT ?entity ?kind ?fetchedAt
+    WHERE {{
+        GRAPH <{WIKIDATA_GRAPH}> {{
+            ?entity a ?kind ;
+                    fut-wd:fetchedAt ?fetchedAt .
+        }}
+    }}
+    """
+
+def get_enrichment_stadiums_query():
+    """Returns SPARQL query for fetching the stadium of every materialized club."""
+    return f"""
+    PREFIX fut-wd: <{WIKIDATA_NAMESPACE}>
+
+    SELECT DISTINCT ?stadiumInfo
+    WHERE {{
+        GRAPH <{WIKIDATA_GRAPH}> {{
+            ?club a fut-wd:Club ;
+                  fut-wd:stadiumInfo ?stadiumInfo .
+        }}
+    }}
+    """
+
+def get_leagues_query():
+    """Returns SPARQL query for fetching every league and its name."""
+    return """
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX ont: <http://football.org/ontology#>
+    PREFIX fut-rel: <http://football.org/rel/>
+
+    SELECT ?league ?name
+    WHERE {
+        ?league rdf:type ont:League ;
+                fut-rel:name ?name .
+    }
+    """
+
+def get_replace_enrichment_query(entities, linked, statements):
+    """
+    Returns SPARQL update replacing the materialized Wikidata details of some
+    entities (their triples, season nodes and the links to them) with new triples.
+
+    Args:
+        entities: Wikidata entity IRIs being refreshed
+        linked: IRIs of our clubs/leagues whose link to Wikidata is rewritten
+        statements: Serialized triples ("<s> <p> <o> .") to insert into the named graph
+    """
+    values = " ".join(f"<{entity}>" for entity in entities)
+    statements = "\n            ".join(statements)
+
+    # Links of our clubs/leagues, which may point to another entity than before
+    unlink = ""
+    if linked:
+        linked_values = " ".join(f"<{iri}>" for iri in linked)
+        unlink = f"""
+    PREFIX fut-wd: <{WIKIDATA_NAMESPACE}>
+
+    DELETE {{ GRAPH <{WIKIDATA_GRAPH}> {{ ?s fut-wd:wikidata ?o }} }}
+    WHERE {{
+        VALUES ?s {{ {linked_values} }}
+        GRAPH <{WIKIDATA_GRAPH}> {{ ?s fut-wd:wikidata ?o . }}
+    }} ;
+    """
+
+    return f"""
+    PREFIX fut-wd: <{WIKIDATA_NAMESPACE}>
+
+    DELETE {{ GRAPH <{WIKIDATA_GRAPH}> {{ ?s ?p ?o }} }}
+    WHERE {{
+        VALUES ?entity {{ {values} }}
+        GRAPH <{WIKIDATA_GRAPH}> {{
+            {{ ?entity ?p ?o . BIND(?entity AS ?s) }}
+            UNION {{ ?entity fut-wd:season ?s . ?s ?p ?o . }}
+            UNION {{ ?s fut-wd:wikidata ?entity . BIND(fut-wd:wikidata AS ?p) BIND(?entity AS ?o) }}
+        }}
+    }} ;
+    {unlink}
+    INSERT DATA {{
+        GRAPH <{WIKIDATA_GRAPH}> {{
+            {statements}
+        }}
+    }}
+    """
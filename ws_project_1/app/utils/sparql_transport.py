@@ -0,0 +1,182 @@
+"""
+Shared HTTP transport for every SPARQL endpoint the app talks to.
+
+All clients (GraphDB queries/updates, SPIN rules and Wikidata) go through a
+single urllib3 connection pool per endpoint, so consecutive requests reuse
+kept-alive TCP connections instead of opening a new one per query.
+"""
+
+import os
+import json
+import time
+import threading
+from urllib.parse import urlsplit
+
+import urllib3
+
+USER_AGENT = "ws-project-football/1.0 (https://github.com/GuiAmorim03/WS-Project-2) urllib3"
+
+SPARQL_RESULTS_JSON = "application/sparql-results+json"
+
+# Per-endpoint pool configuration (overridable through environment variables)
+ENDPOINT_CONFIG = {
+    "graphdb": {
+        "pool_size": int(os.environ.get("GRAPHDB_POOL_SIZE", "10")),
+        "connect_timeout": float(os.environ.get("GRAPHDB_CONNECT_TIMEOUT", "5")),
+        "read_timeout": float(os.environ.get("GRAPHDB_READ_TIMEOUT", "120")),
+    },
+    "wikidata": {
+        "pool_size": int(os.environ.get("WIKIDATA_POOL_SIZE", "4")),
+        "connect_timeout": float(os.environ.get("WIKIDATA_CONNECT_TIMEOUT", "5")),
+        "read_timeout": float(os.environ.get("WIKIDATA_READ_TIMEOUT", "30")),
+    },
+}
+
+DEFAULT_CONFIG = {
+    "pool_size": 4,
+    "connect_timeout": 5.0,
+    "read_timeout": 60.0,
+}
+
+_pools = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+class SPARQLTransportError(Exception):
+    """Raised when an endpoint answers with an HTTP error status."""
+
+
+def get_endpoint_config(endpoint):
+    """Returns the pool configuration for the given endpoint name."""
+    return {**DEFAULT_CONFIG, **ENDPOINT_CONFIG.get(endpoint, {})}
+
+
+def get_pool(endpoint, url):
+    """
+    Returns the shared connection pool for an endpoint, creating it on first use.
+
+    Args:
+        endpoint: Logical endpoint name (e.g. "graphdb", "wikidata")
+        url: Any URL on the endpoint host, used to build the pool
+
+    Returns:
+        urllib3.HTTPConnectionPool: Keep-alive pool for the endpoint host
+    """
+    with _lock:
+        pool = _pools.get(endpoint)
+        if pool is None:
+            config = get_endpoint_config(endpoint)
+            pool = urllib3.connection_from_url(
+                url,
+                maxsize=config["pool_size"],
+                block=False,
+                timeout=urllib3.Timeout(connect=config["connect_timeout"], read=config["read_timeout"]),
+                retries=urllib3.Retry(total=2, connect=2, read=0, redirect=3, status=0),
+                headers={"User-Agent": USER_AGENT},
+            )
+            _pools[endpoint] = pool
+            _stats[endpoint] = {"requests": 0, "errors": 0, "total_time": 0.0}
+        return pool
+
+
+def _send(endpoint, url, fields, accept, timeout=None):
+    """Send a form-encoded SPARQL protocol POST request through the endpoint pool."""
+    pool = get_pool(endpoint, url)
+    path = urlsplit(url).path or "/"
+    start = time.perf_counter()
+    try:
+        response = pool.request(
+            "POST",
+            path,
+            fields=fields,
+            encode_multipart=False,
+            headers={"Accept": accept, "User-Agent": USER_AGENT},
+            # A per-call timeout bounds the whole request, not each socket read
+            timeout=urllib3.Timeout(total=timeout) if timeout is not None else pool.timeout,
+        )
+    except Exception:
+        _record(endpoint, start, error=True)
+        raise
+
+    if response.status >= 400:
+        _record(endpoint, start, error=True)
+        raise SPARQLTransportError(
+            f"{endpoint} returned HTTP {response.status}: {response.data[:300].decode('utf-8', 'replace')}"
+        )
+
+    _record(endpoint, start)
+    return response
+
+
+def _record(endpoint, start, error=False):
+    with _lock:
+        stats = _stats[endpoint]
+        stats["requests"] += 1
+        stats["total_time"] += time.perf_counter() - start
+        if error:
+            stats["errors"] += 1
+
+
+def execute_query(url, query, endpoint="graphdb", timeout=None):
+    """
+    Execute a SPARQL query (SELECT/ASK) and return the decoded JSON results.
+
+    Args:
+        url: The SPARQL query endpoint URL
+        query: The SPARQL query string
+        endpoint: Logical endpoint name used to pick the pool
+        timeout: Optional per-call timeout (seconds) for the whole request,
+            overriding the pool default
+
+    Returns:
+        dict: SPARQL JSON results, as returned by SPARQLWrapper's convert()
+    """
+    response = _send(endpoint, url, {"query": query}, SPARQL_RESULTS_JSON, timeout)
+    return json.loads(response.data.decode("utf-8"))
+
+
+def execute_update(url, update, endpoint="graphdb", timeout=None):
+    """
+    Execute a SPARQL UPDATE against a statements endpoint.
+
+    Args:
+        url: The SPARQL update endpoint URL (e.g. .../repositories/football/statements)
+        update: The SPARQL update string
+        endpoint: Logical endpoint name used to pick the pool
+        timeout: Optional per-call timeout (seconds) overriding the pool default
+
+    Returns:
+        bool: True once the endpoint acknowledged the update
+    """
+    _send(endpoint, url, {"update": update}, "*/*", timeout)
+    return True
+
+
+def get_pool_stats():
+    """
+    Returns connection pool statistics for every endpoint used so far.
+
+    `connections_opened` counts new TCP connections; `connections_reused`
+    is the number of requests served over an already open connection.
+    """
+    stats = {}
+    with _lock:
+        for endpoint, pool in _pools.items():
+            counters = _stats[endpoint]
+            config = get_endpoint_config(endpoint)
+            requests = pool.num_requests
+            opened = pool.num_connections
+            stats[endpoint] = {
+                "host": pool.host,
+                "pool_size": config["pool_size"],
+                "connect_timeout": config["connect_timeout"],
+                "read_timeout": config["read_timeout"],
+                "requests": counters["requests"],
+                "errors": counters["errors"],
+                "avg_time_ms": round(counters["total_time"] * 1000 / counters["requests"], 2) if counters["requests"] else 0,
+                "connections_opened": opened,
+                "connections_reused": max(requests - opened, 0),
+                "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0,
+            }
+    return stats
@@ -1,64 +1,111 @@
 import os
+import time
 """
 SPIN rules client for executing and managing SPIN rule inferences.
 """
 
-from SPARQLWrapper import SPARQLWrapper, JSON, POST, GET
+from .sparql_transport import execute_query, execute_update
+from .query_cache import invalidate_query_cache
+from .spin_scheduler import run_rule_graph
+from .spin_engine import run_native_spin_rules
+from .sparql_queries import get_player_connections_query
 from .spin_queries import (
-    get_all_spin_rules, get_clear_spin_inferences_query,
+    get_all_spin_rules, get_spin_rule_definitions, get_clear_spin_inferences_query,
+    get_predicates_count_query,
+    get_player_spin_rules, get_clear_player_inferences_query,
     get_enhanced_player_details_query, get_enhanced_all_players_query,
     get_teammates_query, get_compatriots_query, get_players_by_classification_query,
-    get_club_rivals_query, get_enhanced_player_connection_query,
+    get_club_rivals_query, get_clubs_rivals_query,
     get_efficiency_leaders_query
 )
 
 # Configure your SPARQL endpoint
 ENDPOINT_URL = os.environ.get("GRAPHDB_ENDPOINT", "http://graphdb:7200") + "/repositories/football"
+UPDATE_ENDPOINT_URL = ENDPOINT_URL + "/statements"
 
-def get_sparql_update_client():
-    """Returns a configured SPARQLWrapper instance for updates."""
-    sparql = SPARQLWrapper(ENDPOINT_URL + "/statements")
-    sparql.setReturnFormat(JSON)
-    sparql.setMethod(POST)
-    return sparql
+# How full runs evaluate the rules: "sparql" (one UPDATE per rule) or "native" (spin_engine.py)
+SPIN_ENGINE = os.environ.get("SPIN_ENGINE", "sparql").strip().lower()
 
-def get_sparql_query_client():
-    """Returns a configured SPARQLWrapper instance for queries."""
-    sparql = SPARQLWrapper(ENDPOINT_URL)
-    sparql.setReturnFormat(JSON)
-    return sparql
+# Report of the last full run of the rules (see get_last_spin_run)
+_last_spin_run = None
 
-def execute_spin_rules():
+def count_predicate_triples(predicates):
+    """Number of triples in the store with one of the given predicates."""
+    results = execute_query(ENDPOINT_URL, get_predicates_count_query(predicates))
+    bindings = results["results"]["bindings"]
+    return int(bindings[0]["count"]["value"]) if bindings else 0
+
+def execute_spin_rule(rule):
+    """
+    Execute one SPIN rule definition.
+    
+    Returns:
+        int: Number of triples the rule inserted
+    """
+    before = count_predicate_triples(rule["writes"])
+    execute_update(UPDATE_ENDPOINT_URL, rule["query"])
+    return count_predicate_triples(rule["writes"]) - before
+
+def execute_spin_rules(engine=None, progress=None):
     """
     Execute all SPIN rules to infer new knowledge.
     
+    With the SPARQL engine, rules that do not depend on each other run
+    concurrently; with the native engine they are evaluated in Python and
+    written with bulk INSERT DATA. The timing and inserted triple count of
+    each rule is kept in get_last_spin_run().
+    
+    Args:
+        engine: "sparql" or "native" (defaults to the SPIN_ENGINE setting)
+        progress: Optional function called as each rule starts and finishes
+            (see spin_scheduler.run_rule_graph)
+    
     Returns:
         bool: True if all rules executed successfully, False otherwise
     """
-    sparql = get_sparql_update_client()
-    
+    global _last_spin_run
+
     try:
+        start = time.perf_counter()
+
         # Clear existing inferences first
         print("Clearing existing SPIN inferences...")
-        sparql.setQuery(get_clear_spin_inferences_query())
-        sparql.query()
+        execute_update(UPDATE_ENDPOINT_URL, get_clear_spin_inferences_query())
         
         # Execute all SPIN rules
-        rules = get_all_spin_rules()
-        print(f"Executing {len(rules)} SPIN rules...")
-        
-        for i, rule in enumerate(rules, 1):
-            print(f"Executing rule {i}/{len(rules)}...")
-            sparql.setQuery(rule)
-            sparql.query()
+        engine = engine or SPIN_ENGINE
+        rules = get_spin_rule_definitions()
+        print(f"Executing {len(rules)} SPIN rules ({engine})...")
+        if engine == "native":
+            reports = run_native_spin_rules(progress=progress)
+        else:
+            reports = run_rule_graph(rules, execute_spin_rule, progress=progress)
+        for report in reports:
+            print(f"Rule {report['name']}: {report['inserted']} triples in {report['seconds']}s")
             
-        print("All SPIN rules executed successfully.")
+        _last_spin_run = {
+            "engine": engine,
+            "seconds": round(time.perf_counter() - start, 3),
+            "inserted": sum(report["inserted"] for report in reports),
+            "rules": reports,
+        }
+        invalidate_query_cache()
+        print(f"All SPIN rules executed successfully in {_last_spin_run['seconds']}s.")
         return True
         
     except Exception as e:
+        # Inferences may already have been cleared or partially inserted
+        invalidate_query_cache()
         print(f"Error executing SPIN rules: {e}")
         return False
 
+def get_last_spin_run():
+    """
+    Returns the report of the last successful full run of the SPIN rules
+    (total time, inserted triples, and per rule timing and counts), or None.
+    """
+    return _last_spin_run
+
 def clear_spin_inferences():
     """
     Clear all SPIN rule inferences from the knowledge base.
@@ -66,12 +113,10 @@ def clear_spin_inferences():
     Returns:
         bool: True if clearing was successful, False otherwise
     """
-    sparql = get_sparql_update_client()
-    
     try:
         print("Clearing SPIN rule inferences...")
-        sparql.setQuery(get_clear_spin_inferences_query())
-        sparql.query()
+        execute_update(UPDATE_ENDPOINT_URL, get_clear_spin_inferences_query())
+        invalidate_query_cache()
         print("SPIN rule inferences cleared successfully.")
         return True
         
@@ -79,6 +124,35 @@ def clear_spin_inferences():
         print(f"Error clearing SPIN inferences: {e}")
         return False
 
+def update_player_spin_inferences(player_ids):
+    """
+    Re-evaluate the SPIN rules only for the players a write touched.
+    
+    Their inferences (and the teammate/compatriot/past teammate edges pointing
+    to them) are cleared and re-inferred in a single update request, so a club
+    change also updates the rosters of the old and the new club.
+    
+    Args:
+        player_ids: IDs of the players whose data changed
+        
+    Returns:
+        bool: True if the inferences were updated successfully, False otherwise
+    """
+    player_ids = list(dict.fromkeys(player_ids))
+    if not player_ids:
+        return True
+
+    update = " ;\n".join([get_clear_player_inferences_query(player_ids)] + get_player_spin_rules(player_ids))
+    try:
+        execute_update(UPDATE_ENDPOINT_URL, update)
+        invalidate_query_cache()
+        print(f"SPIN inferences updated for {', '.join(player_ids)}.")
+        return True
+    except Exception as e:
+        invalidate_query_cache()
+        print(f"Error updating SPIN inferences: {e}")
+        return False
+
 def get_spin_rule_count():
     """
     Get the number of available SPIN rules.
@@ -98,14 +172,13 @@ def execute_specific_spin_rule(rule_index):
     Returns:
         bool: True if rule executed successfully, False otherwise
     """
-    sparql = get_sparql_update_client()
     rules = get_all_spin_rules()
     
     if 0 <= rule_index < len(rules):
         try:
             print(f"Executing SPIN rule {rule_index + 1}...")
-            sparql.setQuery(rules[rule_index])
-            sparql.query()
+            execute_update(UPDATE_ENDPOINT_URL, rules[rule_index])
+            invalidate_query_cache()
             print(f"SPIN rule {rule_index + 1} executed successfully.")
             return True
         except Exception as e:
@@ -125,11 +198,8 @@ def query_enhanced_player_details(player_id):
     Returns:
         dict: Enhanced player data with SPIN inferences
     """
-    sparql = get_sparql_query_client()
-    sparql.setQuery(get_enhanced_player_details_query(player_id))
-    
     try:
-        results = sparql.query().convert()
+        results = execute_query(ENDPOINT_URL, get_enhanced_player_details_query(player_id))
         return process_enhanced_player_results(results, player_id)
     except Exception as e:
         print(f"Error querying enhanced player details: {e}")
@@ -190,11 +260,8 @@ def query_enhanced_all_players():
     Returns:
         list: List of enhanced player data
     """
-    sparql = get_sparql_query_client()
-    sparql.setQuery(get_enhanced_all_players_query())
-    
     try:
-        results = sparql.query().convert()
+        results = execute_query(ENDPOINT_URL, get_enhanced_all_players_query())
         return process_enhanced_all_players_results(results)
     except Exception as e:
         print(f"Error querying enhanced all players: {e}")
@@ -244,11 +311,8 @@ def process_enhanced_all_players_results(results):
 
 def query_player_teammates(player_id):
     """Query a player's teammates using SPIN inferences."""
-    sparql = get_sparql_query_client()
-    sparql.setQuery(get_teammates_query(player_id))
-    
     try:
-        results = sparql.query().convert()
+        results = execute_query(ENDPOINT_URL, get_teammates_query(player_id))
         return process_teammates_results(results)
     except Exception as e:
         print(f"Error querying player teammates: {e}")
@@ -294,11 +358,8 @@ def process_teammates_results(results):
 
 def query_player_compatriots(player_id):
     """Query a player's compatriots using SPIN inferences."""
-    sparql = get_sparql_query_client()
-    sparql.setQuery(get_compatriots_query(player_id))
-    
     try:
-        results = sparql.query().convert()
+        results = execute_query(ENDPOINT_URL, get_compatriots_query(player_id))
         return process_compatriots_results(results)
     except Exception as e:
         print(f"Error querying player compatriots: {e}")
@@ -332,11 +393,8 @@ def query_players_by_classification(classification):
     Returns:
         list: List of players with the specified classification
     """
-    sparql = get_sparql_query_client()
-    sparql.setQuery(get_players_by_classification_query(classification))
-    
     try:
-        results = sparql.query().convert()
+        results = execute_query(ENDPOINT_URL, get_players_by_classification_query(classification))
         return process_classification_results(results)
     except Exception as e:
         print(f"Error querying players by classification: {e}")
@@ -369,11 +427,8 @@ def process_classification_results(results):
 
 def query_club_rivals(club_id):
     """Query club rivals using SPIN inferences."""
-    sparql = get_sparql_query_client()
-    sparql.setQuery(get_club_rivals_query(club_id))
-    
     try:
-        results = sparql.query().convert()
+        results = execute_query(ENDPOINT_URL, get_club_rivals_query(club_id))
         return process_rivals_results(results)
     except Exception as e:
         print(f"Error querying club rivals: {e}")
@@ -398,13 +453,40 @@ def process_rivals_results(results):
     
     return rivals
 
-def query_efficiency_leaders(limit=10):
-    """Query top players by efficiency using SPIN inferences."""
-    sparql = get_sparql_query_client()
-    sparql.setQuery(get_efficiency_leaders_query(limit))
+def query_clubs_rivals(club_ids):
+    """
+    Query the rivals of several clubs in a single request using SPIN inferences.
     
+    Args:
+        club_ids: IDs of the clubs whose rivals are needed
+        
+    Returns:
+        dict: Rivals of each club (same format as query_club_rivals), keyed by club ID
+    """
+    rivals_by_club = {club_id: [] for club_id in club_ids}
+    if not club_ids:
+        return rivals_by_club
+
     try:
-        results = sparql.query().convert()
+        results = execute_query(ENDPOINT_URL, get_clubs_rivals_query(club_ids))
+    except Exception as e:
+        print(f"Error querying clubs rivals: {e}")
+        return rivals_by_club
+
+    bindings_by_club = {}
+    for rival in results["results"]["bindings"]:
+        club_id = rival["club_id"]["value"].split("/")[-1]
+        bindings_by_club.setdefault(club_id, []).append(rival)
+
+    for club_id, bindings in bindings_by_club.items():
+        rivals_by_club[club_id] = process_rivals_results({"results": {"bindings": bindings}})
+
+    return rivals_by_club
+
+def query_efficiency_leaders(limit=10, timeout=None):
+    """Query top players by efficiency using SPIN inferences."""
+    try:
+        results = execute_query(ENDPOINT_URL, get_efficiency_leaders_query(limit), timeout=timeout)
         return process_efficiency_leaders_results(results)
     except Exception as e:
         print(f"Error querying efficiency leaders: {e}")
@@ -449,36 +531,62 @@ def process_efficiency_leaders_results(results):
         "entities": players
     }
 
-def check_enhanced_player_connection(player1_id, player2_id):
+def query_player_connections(player1_id, player2_id, include_spin=False, timeout=None):
+    """
+    Evaluate every connection type between two players in a single query.
+    Backs both check_player_connection and check_enhanced_player_connection.
+    
+    Args:
+        player1_id: ID of the first player
+        player2_id: ID of the second player
+        include_spin: Whether to also check the SPIN rule connections
+        timeout: Optional timeout (seconds) for the SPARQL request
+        
+    Returns:
+        dict: Whether each connection type exists, keyed by type (None if the query fails)
+    """
+    try:
+        results = execute_query(ENDPOINT_URL, get_player_connections_query(player1_id, player2_id, include_spin), timeout=timeout)
+    except Exception as e:
+        print(f"Error checking player connections: {e}")
+        return None
+
+    bindings = results["results"]["bindings"]
+    if not bindings:
+        return {}
+
+    return {
+        connection_type: value["value"] == "true"
+        for connection_type, value in bindings[0].items()
+    }
+
+def check_enhanced_player_connection(player1_id, player2_id, connection_flags=None):
     """
     Check enhanced player connections using SPIN inferences.
     
     Args:
         player1_id: ID of the first player
         player2_id: ID of the second player
+        connection_flags: Result of query_player_connections (with include_spin), if already fetched
         
     Returns:
         dict: Enhanced connection details including SPIN inferences
     """
-    sparql = get_sparql_query_client()
-    
+    if connection_flags is None:
+        connection_flags = query_player_connections(player1_id, player2_id, include_spin=True)
+
     connections = {}
     
     # Check SPIN rule connections
     spin_connections = ["teammate", "compatriot", "same_player_type", "past_teammate"]
     
     for connection_type in spin_connections:
-        query = get_enhanced_player_connection_query(connection_type, player1_id, player2_id)
-        sparql.setQuery(query)
-        
-        try:
-            result = sparql.query().convert()
+        if connection_flags is not None:
             connections[connection_type] = {
-                "exists": result["boolean"],
+                "exists": connection_flags.get(connection_type, False),
                 "description": f"Connected via SPIN rule: {connection_type.replace('_', ' ').title()}"
             }
-        except Exception as e:
-            print(f"Error checking {connection_type} connection: {e}")
+        else:
             connections[connection_type] = {
                 "exists": False,
                 "description": f"Error checking {connection_type.replace('_', ' ').title()}"
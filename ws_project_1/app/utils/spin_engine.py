@@ -0,0 +1,371 @@
+"""
+Native evaluator of the SPIN rules.
+
+Instead of running each rule as a SPARQL UPDATE over the whole graph, the
+facts the rules read are fetched once (one query for players, one for clubs)
+and every rule is evaluated in Python: the per-player thresholds vectorized
+with NumPy, the pairwise rules (teammates, compatriots, rivals) by grouping.
+
+The result is the set of triples each rule infers, with the same values and
+datatypes SPARQL produces. It can be served directly or written back with
+bulk INSERT DATA requests (see run_native_spin_rules). The `spin_parity`
+management command checks it against the SPARQL rules.
+"""
+
+import os
+import re
+import time
+from itertools import product
+from decimal import Decimal, ROUND_FLOOR, localcontext
+
+import numpy as np
+
+from .sparql_transport import execute_query, execute_update
+from .sparql_queries import XSD, term, serialize
+from .spin_queries import (
+    get_spin_rule_definitions, get_rule_facts_query, get_insert_data_query,
+    PEER_RELATIONS, SAME_CLASS_RELATIONS, GROUP_NAMESPACE
+)
+
+ENDPOINT_URL = os.environ.get("GRAPHDB_ENDPOINT", "http://graphdb:7200") + "/repositories/football"
+UPDATE_ENDPOINT_URL = ENDPOINT_URL + "/statements"
+
+# Triples per INSERT DATA request (the pairwise rules infer far too many for one request)
+INSERT_DATA_BATCH = int(os.environ.get("SPIN_INSERT_BATCH", "20000"))
+
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+ENT = "http://football.org/ent/"
+PREFIXES = {
+    "ont:": "http://football.org/ontology#",
+    "fut-rel:": "http://football.org/rel/",
+}
+
+DECIMAL_TYPES = {XSD + name for name in (
+    "decimal", "integer", "int", "long", "short", "byte", "nonNegativeInteger", "positiveInteger",
+    "nonPositiveInteger", "negativeInteger", "unsignedLong", "unsignedInt", "unsignedShort", "unsignedByte",
+)}
+FLOAT_TYPES = {XSD + "double", XSD + "float"}
+
+TRUE = ("literal", "true", XSD + "boolean", None)
+
+PLAYER_PREDICATES = [
+    "fut-rel:born", "fut-rel:position", "fut-rel:club", "fut-rel:past_club", "fut-rel:nation",
+    "ont:gls", "ont:ast", "ont:min", "ont:mp", "ont:pk", "ont:pkatt", "ont:kp",
+    "ont:crdy", "ont:crdr", "ont:tkl", "ont:int",
+]
+CLUB_PREDICATES = ["fut-rel:league", "fut-rel:city"]
+
+
+def expand(predicate):
+    """Full IRI of a prefixed predicate name (e.g. "ont:gls")."""
+    for prefix, namespace in PREFIXES.items():
+        if predicate.startswith(prefix):
+            return namespace + predicate[len(prefix):]
+    return predicate
+
+
+def number(value):
+    """Numeric value of a term as a float, NaN when it is not a number (comparisons then fail, like in SPARQL)."""
+    kind, lexical, datatype, _ = value
+    if kind != "literal" or (datatype not in DECIMAL_TYPES and datatype not in FLOAT_TYPES):
+        return np.nan
+    try:
+        return float(lexical)
+    except ValueError:
+        return np.nan
+
+
+def numbers(values):
+    return np.array([number(value) for value in values], dtype=np.float64)
+
+
+class RuleFacts:
+    """The facts the rules read, as predicate -> subject -> list of object terms, per class."""
+
+    __slots__ = ("players", "clubs")
+
+    def __init__(self, players, clubs):
+        self.players = players
+        self.clubs = clubs
+
+    @classmethod
+    def load(cls, fetch):
+        return cls(cls.group(fetch(get_rule_facts_query("Player", PLAYER_PREDICATES))),
+                   cls.group(fetch(get_rule_facts_query("Club", CLUB_PREDICATES))))
+
+    @staticmethod
+    def group(results):
+        facts = {}
+        for row in results["results"]["bindings"]:
+            subject = term(row["s"])
+            facts.setdefault(row["p"]["value"], {}).setdefault(subject, []).append(term(row["o"]))
+        return facts
+
+    @staticmethod
+    def solutions(facts, *predicates):
+        """
+        Join the values of several predicates per subject, like a basic graph pattern.
+
+        Returns:
+            tuple: (subjects, one list of values per predicate), one entry per solution
+        """
+        columns = [facts.get(expand(predicate), {}) for predicate in predicates]
+        subjects = []
+        values = [[] for _ in predicates]
+        for subject in columns[0]:
+            if not all(subject in column for column in columns[1:]):
+                continue
+            for combination in product(*(column[subject] for column in columns)):
+                subjects.append(subject)
+                for index, value in enumerate(combination):
+                    values[index].append(value)
+        return subjects, values
+
+
+def flagged(subjects, mask, predicate, value=TRUE):
+    """Triples (subject, predicate, value) for the solutions selected by a boolean mask."""
+    return {(subjects[index], expand(predicate), value) for index in np.flatnonzero(mask)}
+
+
+def ratio(numerator, denominator):
+    """numerator * 1.0 / denominator, NaN where the denominator is not positive."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def pairs(groups, predicate):
+    """Symmetric edges between the distinct members of each group."""
+    triples = set()
+    predicate = expand(predicate)
+    for members in groups.values():
+        for first in members:
+            for second in members:
+                if first != second:
+                    triples.add((first, predicate, second))
+    return triples
+
+
+def group_by(facts, *predicates):
+    """Subjects grouped by their combination of values of the predicates."""
+    subjects, values = RuleFacts.solutions(facts, *predicates)
+    groups = {}
+    for subject, key in zip(subjects, zip(*values)):
+        groups.setdefault(key, set()).add(subject)
+    return groups
+
+
+def efficiency_value(goals, assists, minutes):
+    """
+    ROUND((?goals + ?assists) * 90.0 / ?minutes * 100) / 100 with SPARQL numeric
+    type promotion: a decimal unless one of the operands is a float/double.
+    """
+    if any(value[2] in FLOAT_TYPES for value in (goals, assists, minutes)):
+        result = np.floor((number(goals) + number(assists)) * 90.0 / number(minutes) * 100 + 0.5) / 100
+        return ("literal", repr(float(result)), XSD + "double", None)
+
+    with localcontext() as context:
+        context.prec = 40
+        scaled = (Decimal(goals[1]) + Decimal(assists[1])) * Decimal("90.0") / Decimal(minutes[1]) * 100
+        # SPARQL ROUND: halves are rounded towards positive infinity
+        result = (scaled + Decimal("0.5")).to_integral_value(rounding=ROUND_FLOOR) / 100
+    lexical = format(result.normalize(), "f")
+    if "." not in lexical:
+        lexical += ".0"
+    return ("literal", lexical, XSD + "decimal", None)
+
+
+def efficiency(facts):
+    subjects, (goals, assists, minutes) = RuleFacts.solutions(facts.players, "ont:gls", "ont:ast", "ont:min")
+    mask = (numbers(minutes) > 0) & ~np.isnan(numbers(goals)) & ~np.isnan(numbers(assists))
+    return {
+        (subjects[index], expand("ont:efficiency"), efficiency_value(goals[index], assists[index], minutes[index]))
+        for index in np.flatnonzero(mask)
+    }
+
+
+def veterans(facts):
+    subjects, (born,) = RuleFacts.solutions(facts.players, "fut-rel:born")
+    return flagged(subjects, 2025 - numbers(born) >= 35, "ont:veteranStatus")
+
+
+def young_prospects(facts):
+    subjects, (born,) = RuleFacts.solutions(facts.players, "fut-rel:born")
+    return flagged(subjects, 2025 - numbers(born) < 23, "ont:youngProspect")
+
+
+def penalty_specialists(facts):
+    subjects, (scored, attempted) = RuleFacts.solutions(facts.players, "ont:pk", "ont:pkatt")
+    return flagged(subjects, ratio(numbers(scored), numbers(attempted)) >= 0.9, "ont:penaltySpecialist")
+
+
+def playmakers(facts):
+    subjects, (assists, key_passes, matches) = RuleFacts.solutions(facts.players, "ont:ast", "ont:kp", "ont:mp")
+    matches = numbers(matches)
+    mask = (ratio(numbers(assists), matches) >= 0.3) & (ratio(numbers(key_passes), matches) >= 1.5)
+    return flagged(subjects, mask, "ont:playmaker")
+
+
+def goal_threats(facts):
+    subjects, (goals, matches) = RuleFacts.solutions(facts.players, "ont:gls", "ont:mp")
+    return flagged(subjects, ratio(numbers(goals), numbers(matches)) >= 0.5, "ont:goalThreat")
+
+
+def disciplinary_risks(facts):
+    subjects, (yellow, red, matches) = RuleFacts.solutions(facts.players, "ont:crdy", "ont:crdr", "ont:mp")
+    mask = ratio(numbers(yellow) + numbers(red) * 2, numbers(matches)) >= 0.3
+    return flagged(subjects, mask, "ont:disciplinaryRisk")
+
+
+def key_players(facts):
+    subjects, (minutes, matches) = RuleFacts.solutions(facts.players, "ont:min", "ont:mp")
+    return flagged(subjects, ratio(numbers(minutes), numbers(matches)) >= 70, "ont:keyPlayer")
+
+
+def position_contains(positions, *needles):
+    return np.array([
+        kind == "literal" and any(needle in lexical.lower() for needle in needles)
+        for kind, lexical, _, _ in positions
+    ], dtype=bool)
+
+
+def strikers(facts):
+    subjects, (goals, matches, positions) = RuleFacts.solutions(facts.players, "ont:gls", "ont:mp", "fut-rel:position")
+    mask = (ratio(numbers(goals), numbers(matches)) >= 0.4) & position_contains(positions, "fw", "forward")
+    return flagged(subjects, mask, "ont:playerType", ("literal", "Striker", None, None))
+
+
+def defensive_midfielders(facts):
+    subjects, (tackles, interceptions, matches, positions) = RuleFacts.solutions(
+        facts.players, "ont:tkl", "ont:int", "ont:mp", "fut-rel:position")
+    mask = (ratio(numbers(tackles) + numbers(interceptions), numbers(matches)) >= 3.0) & position_contains(positions, "mf")
+    return flagged(subjects, mask, "ont:playerType", ("literal", "Defensive Midfielder", None, None))
+
+
+def versatile_players(facts):
+    subjects, (goals, assists, tackles, matches) = RuleFacts.solutions(
+        facts.players, "ont:gls", "ont:ast", "ont:tkl", "ont:mp")
+    matches = numbers(matches)
+    mask = ((ratio(numbers(goals), matches) >= 0.1) & (ratio(numbers(assists), matches) >= 0.1)
+            & (ratio(numbers(tackles), matches) >= 1.0))
+    return flagged(subjects, mask, "ont:versatilePlayer")
+
+
+def league_rivals(facts):
+    subjects, (leagues, cities) = RuleFacts.solutions(facts.clubs, "fut-rel:league", "fut-rel:city")
+    groups = {}
+    for club, league, city in zip(subjects, leagues, cities):
+        groups.setdefault((league, city), set()).add(club)
+    return pairs(groups, "ont:cityRival")
+
+
+def past_teammates(facts):
+    return pairs(group_by(facts.players, "fut-rel:past_club"), "ont:pastTeammate")
+
+
+# The teammates and compatriots rules bind both players to the same ?class
+def teammates(facts):
+    return pairs(group_by(facts.players, "fut-rel:club", RDF_TYPE), "ont:teammate")
+
+
+def compatriots(facts):
+    return pairs(group_by(facts.players, "fut-rel:nation", RDF_TYPE), "ont:compatriot")
+
+
+def peer_groups(relation):
+    """Evaluator of the group membership rule of a pairwise relation (SPIN_PEER_MODE=groups)."""
+    _, group, key = PEER_RELATIONS[relation]
+
+    def evaluate(facts):
+        subjects, (keys, classes) = RuleFacts.solutions(facts.players, key, RDF_TYPE)
+        triples = set()
+        for subject, value, player_class in zip(subjects, keys, classes):
+            if not value[1].startswith(ENT):
+                continue
+            # The local name of the class, like REPLACE(STR(?pClass), "^.*[/#]", "")
+            class_part = re.sub(r"^.*[/#]", "", player_class[1]) + "/" if relation in SAME_CLASS_RELATIONS else ""
+            triples.add((subject, expand(group), ("uri", f"{GROUP_NAMESPACE}{relation}/{class_part}{value[1][len(ENT):]}", None, None)))
+        return triples
+
+    return evaluate
+
+
+# Native implementation of each rule in get_spin_rule_definitions, by name
+RULE_EVALUATORS = {
+    "efficiency": efficiency,
+    "veterans": veterans,
+    "young_prospects": young_prospects,
+    "penalty_specialists": penalty_specialists,
+    "playmakers": playmakers,
+    "goal_threats": goal_threats,
+    "disciplinary_risks": disciplinary_risks,
+    "key_players": key_players,
+    "strikers": strikers,
+    "defensive_midfielders": defensive_midfielders,
+    "versatile_players": versatile_players,
+    "league_rivals": league_rivals,
+    "past_teammates": past_teammates,
+    "teammates": teammates,
+    "compatriots": compatriots,
+    **{f"{relation}_groups": peer_groups(relation) for relation in PEER_RELATIONS},
+}
+
+
+def fetch_from_graphdb(query):
+    return execute_query(ENDPOINT_URL, query)
+
+
+def evaluate_spin_rules(facts=None):
+    """
+    Evaluate every SPIN rule without touching the store.
+
+    Args:
+        facts: RuleFacts to evaluate on (fetched from GraphDB if not given)
+
+    Returns:
+        dict: Rule name -> set of inferred (subject, predicate IRI, object) triples,
+        with subjects and objects as term tuples
+    """
+    if facts is None:
+        facts = RuleFacts.load(fetch_from_graphdb)
+    return {rule["name"]: RULE_EVALUATORS[rule["name"]](facts) for rule in get_spin_rule_definitions()}
+
+
+def write_inferences(triples):
+    """Insert triples with as few INSERT DATA requests as INSERT_DATA_BATCH allows."""
+    statements = [f"{serialize(subject)} <{predicate}> {serialize(value)} ." for subject, predicate, value in triples]
+    for start in range(0, len(statements), INSERT_DATA_BATCH):
+        execute_update(UPDATE_ENDPOINT_URL, get_insert_data_query(statements[start:start + INSERT_DATA_BATCH]))
+
+
+def run_native_spin_rules(progress=None):
+    """
+    Evaluate every SPIN rule natively and insert the inferences (the store must
+    have been cleared of previous inferences first).
+
+    Args:
+        progress: Optional callback, as in spin_scheduler.run_rule_graph
+
+    Returns:
+        list: One report per rule with its evaluation and insertion time and
+        inserted triple count, in the format of spin_scheduler.run_rule_graph
+    """
+    start = time.perf_counter()
+    facts = RuleFacts.load(fetch_from_graphdb)
+
+    reports = []
+    for rule in get_spin_rule_definitions():
+        if progress:
+            progress("started", rule["name"])
+        started = time.perf_counter()
+        triples = RULE_EVALUATORS[rule["name"]](facts)
+        write_inferences(triples)
+        reports.append({
+            "name": rule["name"],
+            "after": [],
+            "started": round(started - start, 3),
+            "seconds": round(time.perf_counter() - started, 3),
+            "inserted": len(triples),
+        })
+        if progress:
+            progress("finished", reports[-1])
+    return reports
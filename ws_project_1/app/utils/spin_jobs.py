@@ -0,0 +1,141 @@
+"""
+Background jobs that activate or deactivate the SPIN rules.
+
+Running the rules takes far longer than a request should, so the toggle view
+only starts a job and returns its id. The job runs on a single background
+thread (one toggle at a time) and keeps a record of its progress (each rule's
+status, timing and inserted triples, elapsed time and final result) in the
+"spin_jobs" Django cache, where the status endpoint reads it. With several
+worker processes that cache must be shared (SPIN_JOBS_CACHE_BACKEND, e.g.
+Memcached or Redis): then any worker can report on a job and only one job runs
+at a time across all of them.
+"""
+
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import caches
+
+from .spin_client import execute_spin_rules, clear_spin_inferences, get_last_spin_run
+from .spin_queries import get_spin_rule_definitions
+from .spin_state import get_spin_state, set_spin_state
+
+# Seconds a job record is kept (and the longest a crashed job can block new ones)
+SPIN_JOB_TTL = int(os.environ.get("SPIN_JOB_TTL", "3600"))
+
+CACHE_ALIAS = "spin_jobs"
+CURRENT_JOB_KEY = "spin-job:current"
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spin-job")
+
+
+def get_job_key(job_id):
+    return f"spin-job:{job_id}"
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def save_job(job):
+    caches[CACHE_ALIAS].set(get_job_key(job["id"]), job, timeout=SPIN_JOB_TTL)
+
+
+def get_spin_job(job_id):
+    """
+    Returns the record of a job, or None if it is unknown or expired.
+
+    The record holds the action ("activate"/"deactivate"), its status
+    ("queued", "running", "succeeded", "failed"), the status, time and
+    inserted triples of each rule, the elapsed time and the final result.
+    """
+    job = caches[CACHE_ALIAS].get(get_job_key(job_id))
+    if job is not None and job["status"] in ("queued", "running") and job["started"]:
+        job["elapsed"] = round(time.time() - job["started"], 3)
+    return job
+
+
+def start_spin_toggle():
+    """
+    Start a job toggling the SPIN rules, unless one is already running.
+
+    Returns:
+        tuple: (job record, created) - the new job, or the running one with created=False
+    """
+    cache = caches[CACHE_ALIAS]
+    job_id = uuid.uuid4().hex
+    if not cache.add(CURRENT_JOB_KEY, job_id, timeout=SPIN_JOB_TTL):
+        running = get_spin_job(cache.get(CURRENT_JOB_KEY))
+        if running is not None:
+            return running, False
+        # The running job's record expired: take over
+        cache.set(CURRENT_JOB_KEY, job_id, timeout=SPIN_JOB_TTL)
+
+    activate = not get_spin_state()["active"]
+    rules = get_spin_rule_definitions() if activate else []
+    job = {
+        "id": job_id,
+        "action": "activate" if activate else "deactivate",
+        "status": "queued",
+        "created_at": now(),
+        "finished_at": None,
+        "started": None,
+        "elapsed": 0,
+        "completed": 0,
+        "total": len(rules),
+        "rules": [{"name": rule["name"], "status": "pending", "seconds": None, "inserted": None} for rule in rules],
+        "result": None,
+    }
+    save_job(job)
+    _executor.submit(run_spin_toggle, job)
+    return job, True
+
+
+def run_spin_toggle(job):
+    """Body of a toggle job: run or clear the rules, then record the new shared state."""
+    rules = {rule["name"]: rule for rule in job["rules"]}
+
+    def progress(event, value):
+        if event == "started":
+            rules[value]["status"] = "running"
+        else:
+            rules[value["name"]].update(status="done", seconds=value["seconds"], inserted=value["inserted"])
+            job["completed"] += 1
+        job["elapsed"] = round(time.time() - job["started"], 3)
+        save_job(job)
+
+    job["status"] = "running"
+    job["started"] = time.time()
+    save_job(job)
+
+    try:
+        if job["action"] == "activate":
+            success = execute_spin_rules(progress=progress)
+            message = "SPIN rules activated and executed successfully" if success else "Failed to execute SPIN rules"
+        else:
+            success = clear_spin_inferences()
+            message = "SPIN rules deactivated and inferences cleared" if success else "Failed to clear SPIN rule inferences"
+
+        # The previous state is kept if the rules could not be run or cleared
+        state = set_spin_state(job["action"] == "activate") if success else get_spin_state()
+        run = get_last_spin_run() if success and job["action"] == "activate" else None
+        job["result"] = {
+            "success": success,
+            "spin_rules_active": state["active"],
+            "spin_state_version": state["version"],
+            "message": message,
+            "seconds": run["seconds"] if run else None,
+            "inserted": run["inserted"] if run else None,
+        }
+        job["status"] = "succeeded" if success else "failed"
+    except Exception as e:
+        job["result"] = {"success": False, "message": f"Error toggling SPIN rules: {e}"}
+        job["status"] = "failed"
+    finally:
+        job["elapsed"] = round(time.time() - job["started"], 3)
+        job["finished_at"] = now()
+        save_job(job)
+        caches[CACHE_ALIAS].delete(CURRENT_JOB_KEY)
@@ -2,6 +2,40 @@
 SPIN rules queries for football ontology inference.
 """
 
+import os
+
+# How the pairwise relations (teammates, compatriots, past teammates) are stored:
+# "edges" inserts one triple per pair of players (O(n²) per club or nation),
+# "groups" one membership triple per player, pointing to a group node per club/nation
+SPIN_PEER_MODE = os.environ.get("SPIN_PEER_MODE", "edges").strip().lower()
+
+GROUP_NAMESPACE = "http://football.org/group/"
+
+# Resource holding the shared SPIN state (see spin_state.py)
+SPIN_STATE_IRI = "http://football.org/meta/spinState"
+
+# Pairwise relation -> (edge predicate, group membership predicate, predicate the group is keyed on)
+PEER_RELATIONS = {
+    "teammate": ("ont:teammate", "ont:teammateGroup", "fut-rel:club"),
+    "compatriot": ("ont:compatriot", "ont:compatriotGroup", "fut-rel:nation"),
+    "pastTeammate": ("ont:pastTeammate", "ont:pastTeammateGroup", "fut-rel:past_club"),
+}
+
+# Relations whose edge rules also require both players to have the same class
+# (e.g. two goalkeepers): their groups are keyed on the class too
+SAME_CLASS_RELATIONS = {"teammate", "compatriot"}
+
+def get_peer_pattern(relation, subject, peer):
+    """
+    Graph pattern binding `peer` to the players related to `subject` by a pairwise
+    relation ("teammate", "compatriot" or "pastTeammate"), in the current SPIN_PEER_MODE.
+    """
+    edge, group, _ = PEER_RELATIONS[relation]
+    if SPIN_PEER_MODE == "groups":
+        group_var = f"?{relation}_group"
+        return f"{subject} {group} {group_var} . {peer} {group} {group_var} . FILTER({peer} != {subject})"
+    return f"{subject} {edge} {peer} ."
+
 def get_teammates_rule():
     """Identify Teammates"""
     return """
@@ -320,6 +354,31 @@ def get_past_teammates_rule():
     }
     """
 
+def get_peer_groups_rule(relation):
+    """
+    Add players to the group node of their club/nation/past club (SPIN_PEER_MODE=groups):
+    group/<relation>/<key>, or group/<relation>/<class>/<key> for SAME_CLASS_RELATIONS
+    """
+    _, group, key = PEER_RELATIONS[relation]
+    class_part = 'REPLACE(STR(?pClass), "^.*[/#]", ""), "/", ' if relation in SAME_CLASS_RELATIONS else ""
+    return f"""
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX ont: <http://football.org/ontology#>
+    
+    INSERT {{
+        ?player {group} ?group .
+    }}
+    WHERE {{
+        ?player rdf:type ?pClass .
+        ?pClass rdfs:subClassOf* ont:Player .
+        ?player {key} ?key .
+        FILTER(STRSTARTS(STR(?key), "http://football.org/ent/"))
+        BIND(IRI(CONCAT("{GROUP_NAMESPACE}{relation}/", {class_part}STRAFTER(STR(?key), "http://football.org/ent/"))) AS ?group)
+    }}
+    """
+
 def get_clear_spin_inferences_query():
     """Clear all SPIN rule inferences"""
     return """
@@ -337,14 +396,54 @@ def get_clear_spin_inferences_query():
             ont:currentAge, ont:veteranStatus, ont:youngProspect,
             ont:penaltySpecialist, ont:playmaker, ont:goalThreat,
             ont:disciplinaryRisk, ont:keyPlayer, ont:playerType,
-            ont:versatilePlayer, ont:cityRival, ont:pastTeammate
+            ont:versatilePlayer, ont:cityRival, ont:pastTeammate,
+            ont:teammateGroup, ont:compatriotGroup, ont:pastTeammateGroup
         ))
     }
     """
 
-def get_all_spin_rules():
-    """Get all SPIN rules in order"""
-    return [
+def get_clear_player_inferences_query(player_ids):
+    """Clear the SPIN inferences about some players (including edges from other players to them)"""
+    values = " ".join(f"<http://football.org/ent/{player_id}>" for player_id in player_ids)
+    return f"""
+    PREFIX ont: <http://football.org/ontology#>
+    
+    DELETE {{
+        ?player ?p ?o .
+    }}
+    WHERE {{
+        VALUES ?player {{ {values} }}
+        ?player ?p ?o .
+        FILTER(?p IN (
+            ont:efficiency, ont:teammate, ont:compatriot, 
+            ont:currentAge, ont:veteranStatus, ont:youngProspect,
+            ont:penaltySpecialist, ont:playmaker, ont:goalThreat,
+            ont:disciplinaryRisk, ont:keyPlayer, ont:playerType,
+            ont:versatilePlayer, ont:pastTeammate,
+            ont:teammateGroup, ont:compatriotGroup, ont:pastTeammateGroup
+        ))
+    }} ;
+    
+    PREFIX ont: <http://football.org/ontology#>
+    
+    DELETE {{
+        ?s ?p ?player .
+    }}
+    WHERE {{
+        VALUES ?player {{ {values} }}
+        ?s ?p ?player .
+        FILTER(?p IN (ont:teammate, ont:compatriot, ont:pastTeammate))
+    }}
+    """
+
+def get_scoped_rule(rule, variable, entity_ids):
+    """Restrict a rule to the given entities by binding one of its variables with VALUES"""
+    values = " ".join(f"<http://football.org/ent/{entity_id}>" for entity_id in entity_ids)
+    return rule.replace("WHERE {", f"WHERE {{\n        VALUES ?{variable} {{ {values} }}", 1)
+
+def get_player_spin_rules(player_ids):
+    """Get the SPIN rules scoped to some players, for re-evaluating only what a write touched"""
+    player_rules = [
         get_player_efficiency_rule(),
         get_veterans_rule(),
         get_young_prospects_rule(),
@@ -355,13 +454,185 @@ def get_all_spin_rules():
         get_key_players_rule(),
         get_striker_classification_rule(),
         get_defensive_midfielder_classification_rule(),
-        get_versatile_players_rule(),
-        get_league_rivals_rule(),
+        get_versatile_players_rule()
+    ]
+    if SPIN_PEER_MODE == "groups":
+        # Group memberships only involve the player itself
+        player_rules += [get_peer_groups_rule(relation) for relation in PEER_RELATIONS]
+        return [get_scoped_rule(rule, "player", player_ids) for rule in player_rules]
+
+    # Edges between two players: re-infer both the edges from and the edges to the players
+    pair_rules = [
         get_past_teammates_rule(),
         get_teammates_rule(),
         get_compatriots_rule()
     ]
 
+    rules = [get_scoped_rule(rule, "player", player_ids) for rule in player_rules]
+    for rule in pair_rules:
+        rules.append(get_scoped_rule(rule, "player1", player_ids))
+        rules.append(get_scoped_rule(rule, "player2", player_ids))
+    return rules
+
+# Predicates every rule over players/clubs reads to find their class
+CLASS_READS = ["rdf:type", "rdfs:subClassOf"]
+
+def get_spin_rule_definitions():
+    """
+    Get all SPIN rules in order, with the predicates each one reads and writes.
+
+    The read/write sets let rules that do not depend on each other run
+    concurrently (see spin_scheduler.py).
+    """
+    return [
+        {"name": "efficiency", "query": get_player_efficiency_rule(),
+         "reads": CLASS_READS + ["ont:gls", "ont:ast", "ont:min"], "writes": ["ont:efficiency"]},
+        {"name": "veterans", "query": get_veterans_rule(),
+         "reads": CLASS_READS + ["fut-rel:born"], "writes": ["ont:veteranStatus"]},
+        {"name": "young_prospects", "query": get_young_prospects_rule(),
+         "reads": CLASS_READS + ["fut-rel:born"], "writes": ["ont:youngProspect"]},
+        {"name": "penalty_specialists", "query": get_penalty_specialists_rule(),
+         "reads": CLASS_READS + ["ont:pk", "ont:pkatt"], "writes": ["ont:penaltySpecialist"]},
+        {"name": "playmakers", "query": get_playmakers_rule(),
+         "reads": CLASS_READS + ["ont:ast", "ont:kp", "ont:mp"], "writes": ["ont:playmaker"]},
+        {"name": "goal_threats", "query": get_goal_threats_rule(),
+         "reads": CLASS_READS + ["ont:gls", "ont:mp"], "writes": ["ont:goalThreat"]},
+        {"name": "disciplinary_risks", "query": get_disciplinary_risks_rule(),
+         "reads": CLASS_READS + ["ont:crdy", "ont:crdr", "ont:mp"], "writes": ["ont:disciplinaryRisk"]},
+        {"name": "key_players", "query": get_key_players_rule(),
+         "reads": CLASS_READS + ["ont:min", "ont:mp"], "writes": ["ont:keyPlayer"]},
+        {"name": "strikers", "query": get_striker_classification_rule(),
+         "reads": CLASS_READS + ["ont:gls", "ont:mp", "fut-rel:position"], "writes": ["ont:playerType"]},
+        {"name": "defensive_midfielders", "query": get_defensive_midfielder_classification_rule(),
+         "reads": CLASS_READS + ["ont:tkl", "ont:int", "ont:mp", "fut-rel:position"], "writes": ["ont:playerType"]},
+        {"name": "versatile_players", "query": get_versatile_players_rule(),
+         "reads": CLASS_READS + ["ont:gls", "ont:ast", "ont:tkl", "ont:mp"], "writes": ["ont:versatilePlayer"]},
+        {"name": "league_rivals", "query": get_league_rivals_rule(),
+         "reads": CLASS_READS + ["fut-rel:league", "fut-rel:city"], "writes": ["ont:cityRival"]},
+    ] + get_peer_rule_definitions()
+
+def get_peer_rule_definitions():
+    """The rules of the pairwise relations, as edges or group memberships depending on SPIN_PEER_MODE"""
+    if SPIN_PEER_MODE == "groups":
+        return [
+            {"name": f"{relation}_groups", "query": get_peer_groups_rule(relation),
+             "reads": CLASS_READS + [key], "writes": [group]}
+            for relation, (_, group, key) in PEER_RELATIONS.items()
+        ]
+
+    return [
+        {"name": "past_teammates", "query": get_past_teammates_rule(),
+         "reads": CLASS_READS + ["fut-rel:past_club"], "writes": ["ont:pastTeammate"]},
+        {"name": "teammates", "query": get_teammates_rule(),
+         "reads": CLASS_READS + ["fut-rel:club"], "writes": ["ont:teammate"]},
+        {"name": "compatriots", "query": get_compatriots_rule(),
+         "reads": CLASS_READS + ["fut-rel:nation"], "writes": ["ont:compatriot"]},
+    ]
+
+def get_all_spin_rules():
+    """Get all SPIN rules in order"""
+    return [rule["query"] for rule in get_spin_rule_definitions()]
+
+def get_predicates_count_query(predicates):
+    """Count the triples of some predicates (e.g. the ones a rule writes)"""
+    return f"""
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX ont: <http://football.org/ontology#>
+    
+    SELECT (COUNT(*) AS ?count)
+    WHERE {{
+        VALUES ?p {{ {" ".join(predicates)} }}
+        ?s ?p ?o .
+    }}
+    """
+
+def get_rule_facts_query(class_name, predicates):
+    """
+    Fetch the facts the SPIN rules read about every instance of a class (for the native evaluator),
+    and the rdf:type of each instance that is the class or one of its subclasses
+    """
+    return f"""
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX fut-rel: <http://football.org/rel/>
+    PREFIX ont: <http://football.org/ontology#>
+    
+    SELECT DISTINCT ?s ?p ?o
+    WHERE {{
+        {{
+            VALUES ?p {{ {" ".join(predicates)} }}
+            ?s ?p ?o .
+            ?s rdf:type ?class .
+            ?class rdfs:subClassOf* ont:{class_name} .
+        }}
+        UNION
+        {{
+            ?s rdf:type ?o .
+            ?o rdfs:subClassOf* ont:{class_name} .
+            BIND(rdf:type AS ?p)
+        }}
+    }}
+    """
+
+def get_inferred_triples_query(predicates):
+    """Fetch the stored triples of some inferred predicates"""
+    return f"""
+    PREFIX ont: <http://football.org/ontology#>
+    
+    SELECT ?s ?p ?o
+    WHERE {{
+        VALUES ?p {{ {" ".join(predicates)} }}
+        ?s ?p ?o .
+    }}
+    """
+
+def get_insert_data_query(triples):
+    """Insert already serialized triples (one "<s> <p> <o> ." statement each)"""
+    statements = "\n        ".join(triples)
+    return f"""
+    INSERT DATA {{
+        {statements}
+    }}
+    """
+
+def get_spin_state_query():
+    """Read the shared SPIN state marker (whether the inferences are active, and its version)"""
+    return f"""
+    PREFIX ont: <http://football.org/ontology#>
+    
+    SELECT ?active ?version ?changedAt
+    WHERE {{
+        <{SPIN_STATE_IRI}> ont:spinActive ?active ;
+                ont:spinVersion ?version .
+        OPTIONAL {{ <{SPIN_STATE_IRI}> ont:spinChangedAt ?changedAt . }}
+    }}
+    """
+
+def get_set_spin_state_query(active):
+    """Set the shared SPIN state marker, bumping its version"""
+    return f"""
+    PREFIX ont: <http://football.org/ontology#>
+    PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+    
+    DELETE {{
+        <{SPIN_STATE_IRI}> ont:spinActive ?active ;
+                ont:spinVersion ?version ;
+                ont:spinChangedAt ?changedAt .
+    }}
+    INSERT {{
+        <{SPIN_STATE_IRI}> ont:spinActive {"true" if active else "false"} ;
+                ont:spinVersion ?nextVersion ;
+                ont:spinChangedAt ?now .
+    }}
+    WHERE {{
+        OPTIONAL {{ <{SPIN_STATE_IRI}> ont:spinActive ?active . }}
+        OPTIONAL {{ <{SPIN_STATE_IRI}> ont:spinVersion ?version . }}
+        OPTIONAL {{ <{SPIN_STATE_IRI}> ont:spinChangedAt ?changedAt . }}
+        BIND(COALESCE(xsd:integer(?version), 0) + 1 AS ?nextVersion)
+        BIND(NOW() AS ?now)
+    }}
+    """
+
 def get_enhanced_player_details_query(player_id):
     """Returns enhanced SPARQL query for fetching player details with SPIN inferences."""
     return f"""
@@ -501,7 +772,7 @@ def get_teammates_query(player_id):
         ?nation
         ?flag
     WHERE {{
-        <http://football.org/ent/{player_id}> ont:teammate ?teammate_id .
+        {get_peer_pattern("teammate", f"<http://football.org/ent/{player_id}>", "?teammate_id")}
         
         ?teammate_id fut-rel:name ?name ;
                 fut-rel:position ?position ;
@@ -527,7 +798,7 @@ def get_compatriots_query(player_id):
         ?currentClubName
         ?currentClubLogo
     WHERE {{
-        <http://football.org/ent/{player_id}> ont:compatriot ?compatriot_id .
+        {get_peer_pattern("compatriot", f"<http://football.org/ent/{player_id}>", "?compatriot_id")}
         
         ?compatriot_id fut-rel:name ?name ;
                 fut-rel:position ?position ;
@@ -608,39 +879,38 @@ def get_club_rivals_query(club_id):
     ORDER BY ?name
     """
 
-def get_enhanced_player_connection_query(connection_type, player1_id, player2_id):
-    """Returns enhanced SPARQL ASK query for checking connections including SPIN inferences."""
-    base_query = f"""
+def get_clubs_rivals_query(club_ids):
+    """Returns SPARQL query for fetching the rivals of several clubs at once using SPIN inferences."""
+    club_values = " ".join(f"<http://football.org/ent/{club_id}>" for club_id in club_ids)
+
+    return f"""
     PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
     PREFIX fut-rel: <http://football.org/rel/>
     PREFIX ont: <http://football.org/ontology#>
-    
-    ASK {{
-    """
-    
-    if connection_type == "teammate":
-        base_query += f"""
-        <http://football.org/ent/{player1_id}> ont:teammate <http://football.org/ent/{player2_id}> .
-        """
-    elif connection_type == "compatriot":
-        base_query += f"""
-        <http://football.org/ent/{player1_id}> ont:compatriot <http://football.org/ent/{player2_id}> .
-        """
-    elif connection_type == "same_player_type":
-        base_query += f"""
-        <http://football.org/ent/{player1_id}> ont:playerType ?type .
-        <http://football.org/ent/{player2_id}> ont:playerType ?type .
-        """
-    elif connection_type == "past_teammate":
-        base_query += f"""
-        <http://football.org/ent/{player1_id}> ont:past_teammate <http://football.org/ent/{player2_id}> .
-        """
-    
-    base_query += """
+
+    SELECT
+        ?club_id
+        ?rival_id
+        ?name
+        ?logo
+        ?abbreviation
+        ?stadium
+        ?city
+        ?league_name
+    WHERE {{
+        VALUES ?club_id {{ {club_values} }}
+
+        ?club_id ont:cityRival ?rival_id .
+        
+        ?rival_id fut-rel:name ?name ;
+                fut-rel:logo ?logo ;
+                fut-rel:abrv ?abbreviation ;
+                fut-rel:stadium ?stadium ;
+                fut-rel:city ?city ;
+                fut-rel:league/fut-rel:name ?league_name .
     }}
+    ORDER BY ?club_id ?name
     """
-    
-    return base_query
 
 def get_efficiency_leaders_query(limit=10):
     """Returns SPARQL query for fetching players with highest efficiency using SPIN inferences."""
@@ -0,0 +1,96 @@
+"""
+Whether the SPIN inferences are active, shared by every worker process.
+
+The state is stored in GraphDB, next to the inferred triples it describes, as
+a marker resource with an active flag and a version bumped on every change.
+Each process reads it through a local memo that expires after SPIN_STATE_TTL
+seconds, so pages cost at most one small query per TTL, and all workers agree
+on the state within that time.
+"""
+
+import os
+import time
+import threading
+
+from .sparql_transport import execute_query, execute_update
+from .query_cache import invalidate_query_cache
+from .spin_queries import get_spin_state_query, get_set_spin_state_query
+
+ENDPOINT_URL = os.environ.get("GRAPHDB_ENDPOINT", "http://graphdb:7200") + "/repositories/football"
+UPDATE_ENDPOINT_URL = ENDPOINT_URL + "/statements"
+
+# Seconds a process trusts its last read of the state
+SPIN_STATE_TTL = float(os.environ.get("SPIN_STATE_TTL", "5"))
+
+INACTIVE = {"active": False, "version": 0, "changed_at": None}
+
+_memo = None
+_memo_at = 0.0
+_lock = threading.Lock()
+
+
+def fetch_spin_state():
+    """Read the state marker from GraphDB (inactive, version 0, if it was never set)."""
+    results = execute_query(ENDPOINT_URL, get_spin_state_query())
+    bindings = results["results"]["bindings"]
+    if not bindings:
+        return dict(INACTIVE)
+
+    row = bindings[0]
+    return {
+        "active": row["active"]["value"] in ("true", "1"),
+        "version": int(row["version"]["value"]),
+        "changed_at": row.get("changedAt", {}).get("value"),
+    }
+
+
+def remember(state):
+    """Store a state in the memo; a new version drops the cached query results of this process."""
+    global _memo, _memo_at
+
+    with _lock:
+        changed = _memo is not None and _memo["version"] != state["version"]
+        _memo, _memo_at = state, time.monotonic()
+
+    if changed:
+        # Another worker toggled the rules: pages cached here reflect the old inferences
+        invalidate_query_cache()
+
+
+def get_spin_state():
+    """
+    Returns the shared SPIN state, {"active", "version", "changed_at"}.
+
+    If GraphDB cannot be reached, the last known state is kept (or inactive).
+    """
+    with _lock:
+        if _memo is not None and time.monotonic() - _memo_at < SPIN_STATE_TTL:
+            return _memo
+
+    try:
+        state = fetch_spin_state()
+    except Exception as e:
+        print(f"Error reading SPIN state: {e}")
+        return _memo or dict(INACTIVE)
+
+    remember(state)
+    return state
+
+
+def is_spin_active():
+    """Whether the SPIN inferences are active (read through the local memo)."""
+    return get_spin_state()["active"]
+
+
+def set_spin_state(active):
+    """
+    Record in GraphDB that the inferences are now active or cleared, bumping
+    the version so other workers drop their cached pages.
+
+    Returns:
+        dict: The new state
+    """
+    execute_update(UPDATE_ENDPOINT_URL, get_set_spin_state_query(active))
+    state = fetch_spin_state()
+    remember(state)
+    return state
@@ -0,0 +1,133 @@
+"""
+Columnar stat matrices (entities x stat ids) for vectorized leaderboards,
+percentile ranks and per-90 normalization.
+
+A matrix is built from the stat columns of the read model snapshot. Its
+columns are the stat ids the converter generates from `stat_mappings`
+(data/data_converter_csv_to_nt.py). Missing values are NaN.
+"""
+
+import os
+
+import numpy as np
+
+# Stats that are already rates or measure playing time, so they are never normalized per 90 minutes
+NOT_PER_90 = {"mp", "starts", "min", "save_pct", "cs_pct", "ga90"}
+
+# Players below this many minutes get no per-90 values (tiny samples would top every ranking)
+PER_90_MIN_MINUTES = float(os.environ.get("PER90_MIN_MINUTES", "450"))
+
+
+class StatMatrix:
+    """Stat values of one entity type, one row per entity and one column per stat id."""
+
+    __slots__ = ("ids", "stat_ids", "stat_index", "values", "id_rank", "minutes")
+
+    def __init__(self, ids, stat_columns):
+        """
+        Args:
+            ids: Entity id of each row
+            stat_columns: Mapping of stat id -> float array indexed by row
+        """
+        self.ids = list(ids)
+        self.stat_ids = sorted(stat_columns)
+        self.stat_index = {stat_id: index for index, stat_id in enumerate(self.stat_ids)}
+
+        self.values = np.full((len(self.ids), len(self.stat_ids)), np.nan)
+        for stat_id, column in stat_columns.items():
+            self.values[:, self.stat_index[stat_id]] = np.frombuffer(column, dtype=np.float64)
+
+        # Position of each id in string order, used as the final tie-break (like ORDER BY ?id)
+        self.id_rank = np.empty(len(self.ids), dtype=np.int64)
+        self.id_rank[np.argsort(np.array(self.ids, dtype=object), kind="stable")] = np.arange(len(self.ids))
+
+        self.minutes = self.column("min") if "min" in self.stat_index else None
+
+    def column(self, stat_id, per90=False):
+        """
+        Returns the values of a stat for every row (NaN where missing).
+
+        With per90, counting stats are divided by minutes played and scaled to
+        90 minutes; rows under PER_90_MIN_MINUTES become NaN.
+        """
+        values = self.values[:, self.stat_index[stat_id]]
+        if not per90 or stat_id in NOT_PER_90:
+            return values
+        if self.minutes is None:
+            return np.full(len(self.ids), np.nan)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized = values / self.minutes * 90
+        normalized[~(self.minutes >= PER_90_MIN_MINUTES)] = np.nan
+        return normalized
+
+    def top(self, stat_id, limit=10, mask=None, per90=False, minutes_tiebreak=False):
+        """
+        Returns the rows of the top entities of a stat, best first.
+
+        Ties are broken by minutes played (descending) when minutes_tiebreak is
+        set, then by entity id, matching the ORDER BY of the SPARQL leaderboards.
+
+        Args:
+            stat_id: The stat to rank by
+            limit: Maximum number of rows
+            mask: Optional boolean array of the rows allowed in the ranking
+            per90: Rank by the per-90 value instead of the total
+            minutes_tiebreak: Use minutes played as the secondary sort key
+        """
+        if stat_id not in self.stat_index:
+            return np.array([], dtype=np.int64)
+
+        values = self.column(stat_id, per90)
+        valid = ~np.isnan(values)
+        if mask is not None:
+            valid &= mask
+        if minutes_tiebreak:
+            if self.minutes is None:
+                return np.array([], dtype=np.int64)
+            valid &= ~np.isnan(self.minutes)
+
+        rows = np.flatnonzero(valid)
+        keys = [self.id_rank[rows]]
+        if minutes_tiebreak:
+            keys.append(-self.minutes[rows])
+        keys.append(-values[rows])
+
+        # np.lexsort sorts by the last key first
+        return rows[np.lexsort(keys)[:limit]]
+
+    def percentiles(self, row, group_mask, per90=False):
+        """
+        Returns the percentile rank (0-100) of one row for every stat, within a group of rows.
+
+        The rank is the share of the group with a lower value, counting ties as
+        half, so the median entity of a group sits at 50.
+
+        Args:
+            row: The row to rank
+            group_mask: Boolean array of the rows to compare against
+            per90: Compare per-90 values instead of totals
+
+        Returns:
+            dict: Mapping of stat id -> (value, percentile), for the stats the row has
+        """
+        if per90:
+            matrix = np.column_stack([self.column(stat_id, per90=True) for stat_id in self.stat_ids])
+        else:
+            matrix = self.values
+
+        group = matrix[group_mask]
+        own = matrix[row]
+        counted = ~np.isnan(group)
+        less = np.sum(group < own, axis=0)
+        equal = np.sum(group == own, axis=0)
+        sizes = np.sum(counted, axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ranks = (less + 0.5 * equal) / sizes * 100
+
+        return {
+            stat_id: (float(own[index]), round(float(ranks[index]), 1))
+            for index, stat_id in enumerate(self.stat_ids)
+            if not np.isnan(own[index]) and sizes[index]
+        }
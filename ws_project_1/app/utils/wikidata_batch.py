@@ -0,0 +1,65 @@
+"""
+Batched, rate-limited fetching of Wikidata details for many entities.
+
+The details queries of wikidata_queries.py take a list of ids (a VALUES
+block) and return the rows of every entity together; the fetcher sends them
+in batches, waits between requests, backs off when a request fails (e.g. when
+rate limited) and splits the rows back per entity.
+"""
+
+import time
+
+from .wikidata_client import fetch_wikidata
+
+ENTITY_PREFIX = "http://www.wikidata.org/entity/"
+
+# Attempts per batch; the wait doubles after each failure
+RETRIES = 3
+
+
+class WikidataBatchFetcher:
+    """Fetches details in batches, keeping count of the requests sent."""
+
+    def __init__(self, batch_size=50, delay=1.0):
+        self.batch_size = batch_size
+        self.delay = delay
+        self.requests = 0
+
+    def fetch(self, query):
+        """Run one Wikidata request, waiting between requests and backing off on errors."""
+        wait = self.delay
+        for attempt in range(RETRIES):
+            if self.requests:
+                time.sleep(wait)
+            self.requests += 1
+            try:
+                return fetch_wikidata(query)
+            except Exception as e:
+                if attempt == RETRIES - 1:
+                    raise
+                print(f"Wikidata request failed ({e}), retrying")
+                wait = max(wait, 1) * 2
+
+    def fetch_rows(self, ids, get_batch_query, variable):
+        """
+        Yields the results of each entity, batch by batch.
+
+        Args:
+            ids: Wikidata ids (without the entity prefix)
+            get_batch_query: Builder of the query for a list of ids
+            variable: Name of the variable holding the entity of each row
+
+        Yields:
+            tuple: (id, SPARQL JSON results with only that entity's rows), for every id
+        """
+        ids = list(ids)
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start:start + self.batch_size]
+            results = self.fetch(get_batch_query(batch))
+
+            rows = {}
+            for row in results["results"]["bindings"]:
+                rows.setdefault(row[variable]["value"].replace(ENTITY_PREFIX, ""), []).append(row)
+
+            for id in batch:
+                yield id, {"head": results.get("head", {}), "results": {"bindings": rows.get(id, [])}}
@@ -0,0 +1,200 @@
+"""
+Persistent on-disk cache for Wikidata query results.
+
+Raw SPARQL JSON results are stored in a SQLite file, keyed on the normalized
+query text, so enrichment pages render without waiting on query.wikidata.org.
+Each query family has its own TTL. Once an entry expires it is still served
+right away while a background thread fetches a fresh copy (stale-while-
+revalidate); a failed refresh keeps the stale copy. Empty results are cached
+too, for a shorter time (negative caching), so lookups that find nothing do
+not hit the remote service on every page view. Only errors are never cached.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from .query_cache import normalize_query
+
+WIKIDATA_CACHE_PATH = os.environ.get(
+    "WIKIDATA_CACHE_PATH", str(Path(__file__).resolve().parents[2] / "wikidata_cache.sqlite3")
+)
+
+DAY = 24 * 60 * 60
+
+# Seconds an entry stays fresh, per query family (ids and history rarely change)
+FAMILY_TTL = {
+    "club_id": 30 * DAY,
+    "league_id": 30 * DAY,
+    "club_details": 7 * DAY,
+    "stadium_details": 7 * DAY,
+    "league_details": 7 * DAY,
+    "league_winners": 7 * DAY,
+}
+DEFAULT_TTL = int(os.environ.get("WIKIDATA_CACHE_TTL", str(DAY)))
+
+# Seconds an empty result is kept
+NEGATIVE_TTL = int(os.environ.get("WIKIDATA_NEGATIVE_TTL", str(6 * 60 * 60)))
+
+# Seconds to wait before retrying a failed background refresh of the same entry
+REFRESH_RETRY_DELAY = int(os.environ.get("WIKIDATA_REFRESH_RETRY_DELAY", "300"))
+
+_local = threading.local()
+_refreshing = {}
+_stats = {}
+_lock = threading.Lock()
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wikidata-refresh")
+
+
+def get_connection():
+    """Returns this thread's connection to the cache file, creating the table on first use."""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(WIKIDATA_CACHE_PATH, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS wikidata_cache (
+                key TEXT PRIMARY KEY,
+                family TEXT NOT NULL,
+                query TEXT NOT NULL,
+                results TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        connection.commit()
+        _local.connection = connection
+    return connection
+
+
+def get_cache_key(query):
+    return hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def is_empty(results):
+    return not results.get("results", {}).get("bindings") and "boolean" not in results
+
+
+def read_entry(key):
+    row = get_connection().execute(
+        "SELECT results, expires_at FROM wikidata_cache WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None:
+        return None
+    return json.loads(row[0]), row[1]
+
+
+def store_entry(key, query, results, family):
+    """Store fresh results, with the negative TTL when they are empty."""
+    fetched_at = time.time()
+    ttl = NEGATIVE_TTL if is_empty(results) else FAMILY_TTL.get(family, DEFAULT_TTL)
+    connection = get_connection()
+    connection.execute(
+        "INSERT OR REPLACE INTO wikidata_cache (key, family, query, results, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (key, family, normalize_query(query), json.dumps(results), fetched_at, fetched_at + ttl),
+    )
+    connection.commit()
+
+
+def store_results(query, results, family="raw"):
+    """Store results fetched elsewhere (e.g. split from a batched query) under the key of `query`."""
+    store_entry(get_cache_key(query), query, results, family)
+
+
+def is_fresh(query):
+    """Returns True if the cache holds an unexpired entry for the query."""
+    entry = read_entry(get_cache_key(query))
+    return entry is not None and entry[1] > time.time()
+
+
+def get_cached_results(query):
+    """Returns the cached results of a query, fresh or not, without fetching anything."""
+    entry = read_entry(get_cache_key(query))
+    return entry[0] if entry is not None else None
+
+
+def cached_wikidata_query(query, execute, family="raw"):
+    """
+    Return the results of a Wikidata query from the disk cache.
+
+    Fresh entries are returned as is; expired ones are returned too, while a
+    background refresh is scheduled. Only a query never seen before waits on
+    the remote service.
+
+    Args:
+        query: The SPARQL query string
+        execute: Function called with the query to fetch the results
+        family: Query family, which picks the TTL and groups the counters
+
+    Returns:
+        dict: SPARQL JSON results
+    """
+    key = get_cache_key(query)
+    entry = read_entry(key)
+
+    if entry is not None:
+        results, expires_at = entry
+        if expires_at > time.time():
+            _count(family, "negative_hits" if is_empty(results) else "hits")
+        else:
+            _count(family, "stale_hits")
+            schedule_refresh(key, query, execute, family)
+        return results
+
+    _count(family, "misses")
+    results = execute(query)
+    store_entry(key, query, results, family)
+    return results
+
+
+def schedule_refresh(key, query, execute, family):
+    """Refresh an expired entry in the background, at most once at a time per entry."""
+    with _lock:
+        retry_at = _refreshing.get(key)
+        if retry_at is not None and retry_at > time.time():
+            return
+        # Blocks new refreshes until this one finishes (or, if it fails, for the retry delay)
+        _refreshing[key] = float("inf")
+
+    _refresher.submit(refresh_entry, key, query, execute, family)
+
+
+def refresh_entry(key, query, execute, family):
+    try:
+        store_entry(key, query, execute(query), family)
+        _count(family, "refreshes")
+        retry_at = None
+    except Exception as e:
+        print(f"Wikidata cache refresh failed, keeping the stale entry: {e}")
+        _count(family, "refresh_errors")
+        retry_at = time.time() + REFRESH_RETRY_DELAY
+
+    with _lock:
+        if retry_at is None:
+            _refreshing.pop(key, None)
+        else:
+            _refreshing[key] = retry_at
+
+
+def _count(family, counter):
+    with _lock:
+        counters = _stats.setdefault(family, {
+            "hits": 0, "negative_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0,
+        })
+        counters[counter] += 1
+
+
+def get_wikidata_cache_stats():
+    """Returns the counters of each query family and the number of entries on disk."""
+    with _lock:
+        families = {family: dict(counters) for family, counters in _stats.items()}
+
+    entries, expired = get_connection().execute(
+        "SELECT COUNT(*), COALESCE(SUM(expires_at <= ?), 0) FROM wikidata_cache", (time.time(),)
+    ).fetchone()
+    return {"path": WIKIDATA_CACHE_PATH, "entries": entries, "expired": expired, "families": families}
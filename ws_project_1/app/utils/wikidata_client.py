@@ -1,27 +1,25 @@
-from SPARQLWrapper import SPARQLWrapper, JSON
 from datetime import datetime
 
 from .wikidata_queries import (
     get_club_id_query, get_club_details_query, get_stadium_details_query, get_league_id_query, get_league_details_query, get_league_winners_query
 )
+from .sparql_transport import execute_query
+from .wikidata_cache import cached_wikidata_query
+from .wikidata_ids import get_club_qid, get_league_qid, get_club_search, get_league_search
 
 WIKIDATA_ENDPOINT = "https://query.wikidata.org/sparql"
 
-def get_wikidata_client():
-    """Returns a configured SPARQLWrapper instance for Wikidata."""
-    sparql = SPARQLWrapper(WIKIDATA_ENDPOINT)
-    sparql.setReturnFormat(JSON)
-    return sparql
+def fetch_wikidata(query):
+    return execute_query(WIKIDATA_ENDPOINT, query, endpoint="wikidata")
 
-def process_query(query, process_func=None, additional_process_params=None, error_message=None, success_message=None):
+def process_query(query, process_func=None, additional_process_params=None, error_message=None, success_message=None, family="raw"):
     """
     Executes a SPARQL query on Wikidata and returns results.
+
+    Results come from the on-disk cache (see wikidata_cache.py); `family` picks its TTL.
     """
-    sparql = get_wikidata_client()
-    sparql.setQuery(query)
-    
     try:
-        results = sparql.query().convert()
+        results = cached_wikidata_query(query, fetch_wikidata, family)
         if process_func:
             if additional_process_params:
                 return process_func(results, **additional_process_params)
@@ -37,34 +35,45 @@ def process_query(query, process_func=None, additional_process_params=None, erro
         return None
     
 
-def query_club_details_extra(club_name):
+def query_club_details_extra(club_name, club_id=None):
     """
     Queries Wikidata for additional details about a football club.
 
-    First, it searches for the club Wikidata ID by name.
-    If found, it retrieves extra club details
+    The club Wikidata ID comes from the resolved mapping (see wikidata_ids.py);
+    clubs missing from it are searched by name. If found, it retrieves extra club details
 
     Args:
         club_name: The original club name from our dataset
+        club_id: Our club id, used to look up the mapping and the manual fixes
         
     Returns:
         list: List of processed extra club data ready for template rendering
     """
 
-    club_id = process_query(get_club_id_query(club_name), process_func=process_club_id,
-                         error_message="Error querying club wikidata id", success_message="Club wikidata id found")
+    wikidata_id = get_club_qid(club_id) or resolve_club_id(club_name, club_id)
     
-    if not club_id:
+    if not wikidata_id:
         return []
-    return process_query(get_club_details_query(club_id), process_func=process_club_details,
+    return process_query(get_club_details_query(wikidata_id), process_func=process_club_details, family="club_details",
                                  error_message="Error querying club details", success_message="Club details found")
     
 
+def get_club_id_search_query(club_name, club_id=None):
+    """The Wikidata query searching a club by its label, with the manual fixes applied."""
+    label, club_type = get_club_search(club_id, club_name)
+    return get_club_id_query(label, club_type)
+
+def resolve_club_id(club_name, club_id=None):
+    """Searches Wikidata for the ID of a club by its label. Returns the QID or None."""
+    return process_query(get_club_id_search_query(club_name, club_id), process_func=process_club_id, family="club_id",
+                         error_message="Error querying club wikidata id", success_message="Club wikidata id found")
     
 
 def process_club_id(id):
     """Process the WIKIDATA query results for club wikidata id into the format needed."""
-    return id["results"]["bindings"][0]["club"]["value"]
+    if not id["results"]["bindings"]:
+        return None
+    return id["results"]["bindings"][0]["club"]["value"].replace("http://www.wikidata.org/entity/", "")
 
 def process_club_details(details):
     """Process the WIKIDATA query results for club details into the format needed."""
@@ -135,7 +144,7 @@ def query_stadium_details(stadium_id):
         list: List of processed stadium data ready for template rendering
     """
 
-    return process_query(get_stadium_details_query(stadium_id), process_func=process_stadium_details,
+    return process_query(get_stadium_details_query(stadium_id), process_func=process_stadium_details, family="stadium_details",
                                  error_message="Error querying stadium details", success_message="Stadium details found")
 
 def process_stadium_details(details):
@@ -205,8 +214,8 @@ def process_stadium_details(details):
 def query_league_details(league_name):
     """
     Queries Wikidata for league details by name.
-    First, it searches for the league Wikidata ID by name.
-    If found, it retrieves league details
+    The league Wikidata ID comes from the resolved mapping (see wikidata_ids.py),
+    or a search by name for leagues missing from it. If found, it retrieves league details
 
     Args:
         league_name: The name of the league
@@ -215,12 +224,11 @@ def query_league_details(league_name):
         list: List of processed league data ready for template rendering
     """
 
-    league_id = process_query(get_league_id_query(league_name), process_func=process_league_id,
-                         error_message="Error querying league wikidata id", success_message="League wikidata id found")
+    league_id = get_league_qid(league_name) or resolve_league_id(league_name)
     
     if not league_id:
         return []
-    return process_query(get_league_details_query(league_id), process_func=process_league_details, additional_process_params={"league_id": league_id},
+    return process_query(get_league_details_query(league_id), process_func=process_league_details, family="league_details", additional_process_params={"league_id": league_id},
                                  error_message="Error querying league details", success_message="League details found")
 
 
@@ -235,13 +243,25 @@ def query_league_winners(league_id):
         list: List of processed league winners data ready for template rendering
     """
 
-    return process_query(get_league_winners_query(league_id), process_func=process_league_winners,
+    return process_query(get_league_winners_query(league_id), process_func=process_league_winners, family="league_winners",
                                  error_message="Error querying league winners", success_message="League winners found")
 
 
+def get_league_id_search_query(league_name):
+    """The Wikidata query searching a league by its label, with the manual fixes applied."""
+    return get_league_id_query(get_league_search(league_name))
+
+def resolve_league_id(league_name):
+    """Searches Wikidata for the ID of a league by its label. Returns the QID or None."""
+    return process_query(get_league_id_search_query(league_name), process_func=process_league_id, family="league_id",
+                         error_message="Error querying league wikidata id", success_message="League wikidata id found")
+
+
 def process_league_id(id):
     """Process the WIKIDATA query results for league wikidata id into the format needed."""
-    return id["results"]["bindings"][0]["league"]["value"]
+    if not id["results"]["bindings"]:
+        return None
+    return id["results"]["bindings"][0]["league"]["value"].replace("http://www.wikidata.org/entity/", "")
 
 def process_league_details(details, league_id=None):
     """Process the WIKIDATA query results for league details into the format needed."""
@@ -0,0 +1,114 @@
+"""
+Wikidata enrichment materialized into GraphDB.
+
+Details fetched from Wikidata (clubs, stadiums, leagues and their season
+winners) are written as triples into the named graph WIKIDATA_GRAPH: one
+resource per Wikidata entity, typed fut-wd:Club/Stadium/League and stamped
+with fut-wd:fetchedAt, which our clubs and leagues link to with
+fut-wd:wikidata. The variables of each Wikidata row become fut-wd: properties
+of the same name, so pages read local and Wikidata data with one local query
+and process the rows with the functions of wikidata_client.py. Each entity is
+replaced on its own, so a refresh only rewrites the entities that are too old.
+"""
+
+import os
+from datetime import datetime, timezone
+
+from .sparql_queries import (
+    WIKIDATA_NAMESPACE, WIKIDATA_FIELDS, XSD, term, serialize,
+    get_enrichment_ages_query, get_enrichment_stadiums_query, get_replace_enrichment_query
+)
+from .sparql_transport import execute_query, execute_update
+from .query_cache import invalidate_query_cache
+
+ENDPOINT_URL = os.environ.get("GRAPHDB_ENDPOINT", "http://graphdb:7200") + "/repositories/football"
+UPDATE_ENDPOINT_URL = ENDPOINT_URL + "/statements"
+
+ENTITY_PREFIX = "http://www.wikidata.org/entity/"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+
+def statement(subject, predicate, value):
+    return f"<{subject}> <{predicate}> {value} ."
+
+
+def get_entity_triples(kind, subject, row):
+    """Triples of the fields of one Wikidata row (only the variables stored for that kind)."""
+    return [
+        statement(subject, WIKIDATA_NAMESPACE + field, serialize(term(row[field])))
+        for field in WIKIDATA_FIELDS[kind]
+        if field in row
+    ]
+
+
+def get_materialized_triples(kind, qid, rows, fetched_at, linked=(), seasons=None):
+    """
+    Returns the triples of one materialized entity.
+
+    Args:
+        kind: "Club", "Stadium" or "League"
+        qid: Wikidata id of the entity
+        rows: Its Wikidata rows (the first one holds the details, like on the pages)
+        fetched_at: datetime of the fetch
+        linked: IRIs of our clubs/leagues linked to the entity
+        seasons: For leagues, the rows of the season winners, most recent first
+    """
+    entity = ENTITY_PREFIX + qid
+    triples = [
+        statement(entity, RDF_TYPE, f"<{WIKIDATA_NAMESPACE}{kind}>"),
+        statement(entity, WIKIDATA_NAMESPACE + "fetchedAt",
+                  f'"{fetched_at.isoformat(timespec="seconds")}"^^<{XSD}dateTime>'),
+    ]
+    for iri in linked:
+        triples.append(statement(iri, WIKIDATA_NAMESPACE + "wikidata", f"<{entity}>"))
+    if rows:
+        triples += get_entity_triples(kind, entity, rows[0])
+
+    for rank, row in enumerate(seasons or []):
+        season = f"{WIKIDATA_NAMESPACE}season/{qid}/{rank}"
+        triples.append(statement(entity, WIKIDATA_NAMESPACE + "season", f"<{season}>"))
+        triples.append(statement(season, WIKIDATA_NAMESPACE + "rank", f'"{rank}"^^<{XSD}integer>'))
+        triples += get_entity_triples("Season", season, row)
+
+    return triples
+
+
+def write_enrichment(qids, linked, triples):
+    """
+    Replace the materialized details of some entities in GraphDB.
+
+    Args:
+        qids: Wikidata ids of the entities being replaced
+        linked: IRIs of our clubs/leagues whose link is rewritten
+        triples: Serialized triples of the new details
+    """
+    entities = [ENTITY_PREFIX + qid for qid in qids]
+    execute_update(UPDATE_ENDPOINT_URL, get_replace_enrichment_query(entities, linked, triples))
+    invalidate_query_cache()
+
+
+def get_enrichment_ages():
+    """
+    Returns when each materialized entity was fetched.
+
+    Returns:
+        dict: Mapping of Wikidata id -> (kind, fetched-at datetime)
+    """
+    results = execute_query(ENDPOINT_URL, get_enrichment_ages_query())
+    ages = {}
+    for row in results["results"]["bindings"]:
+        fetched_at = datetime.fromisoformat(row["fetchedAt"]["value"].replace("Z", "+00:00"))
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        qid = row["entity"]["value"].replace(ENTITY_PREFIX, "")
+        ages[qid] = (row["kind"]["value"].replace(WIKIDATA_NAMESPACE, ""), fetched_at)
+    return ages
+
+
+def get_materialized_stadiums():
+    """Returns the Wikidata ids of the stadiums of every materialized club."""
+    results = execute_query(ENDPOINT_URL, get_enrichment_stadiums_query())
+    return {
+        row["stadiumInfo"]["value"].split("|")[0].replace(ENTITY_PREFIX, "")
+        for row in results["results"]["bindings"]
+    }
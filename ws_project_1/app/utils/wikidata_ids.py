@@ -0,0 +1,102 @@
+"""
+Mapping of our clubs and leagues to their Wikidata ids (QIDs).
+
+The mapping is built once by `python manage.py resolve_wikidata_ids`, which
+runs the label search of wikidata_queries.py for every club and league and
+saves the results in app/data/wikidata_ids.json. Pages then look the QID up
+instead of searching Wikidata on every view.
+
+Manual fixes live in app/data/wikidata_overrides.json, keyed by club id or
+league name: "qid" pins the id (no search at all), while "label" and "type"
+change what the resolver searches for.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+WIKIDATA_IDS_PATH = Path(os.environ.get("WIKIDATA_IDS_PATH", str(DATA_DIR / "wikidata_ids.json")))
+WIKIDATA_OVERRIDES_PATH = DATA_DIR / "wikidata_overrides.json"
+
+# Wikidata class searched for clubs unless an override says otherwise (association football club)
+DEFAULT_CLUB_TYPE = "Q476028"
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def load_json(path):
+    """Returns the contents of a mapping file, reloading it when it changes on disk."""
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return {"clubs": {}, "leagues": {}}
+
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, encoding="utf-8") as f:
+                cached = (mtime, json.load(f))
+            _loaded[path] = cached
+        return cached[1]
+
+
+def get_overrides(kind, key):
+    return load_json(WIKIDATA_OVERRIDES_PATH).get(kind, {}).get(key, {})
+
+
+def get_qid(kind, key):
+    """Returns the QID of a club (by id) or league (by name), or None if it was never resolved."""
+    pinned = get_overrides(kind, key).get("qid")
+    if pinned:
+        return pinned
+    return load_json(WIKIDATA_IDS_PATH).get(kind, {}).get(key, {}).get("qid")
+
+
+def get_club_qid(club_id):
+    return get_qid("clubs", club_id) if club_id else None
+
+
+def get_league_qid(league_name):
+    return get_qid("leagues", league_name)
+
+
+def get_club_search(club_id, club_name):
+    """
+    Returns the (label, Wikidata class) to search for a club, with the manual fixes applied.
+    """
+    override = get_overrides("clubs", club_id)
+    return override.get("label", club_name), override.get("type", DEFAULT_CLUB_TYPE)
+
+
+def get_league_search(league_name):
+    return get_overrides("leagues", league_name).get("label", league_name)
+
+
+def save_wikidata_ids(clubs, leagues):
+    """
+    Write the resolved mapping file.
+
+    Args:
+        clubs: Mapping of club id -> {"name", "qid"}
+        leagues: Mapping of league name -> {"qid"}
+    """
+    mapping = {
+        "resolved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "clubs": dict(sorted(clubs.items())),
+        "leagues": dict(sorted(leagues.items())),
+    }
+    WIKIDATA_IDS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temporary = WIKIDATA_IDS_PATH.with_suffix(".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=4)
+        f.write("\n")
+    os.replace(temporary, WIKIDATA_IDS_PATH)
+
+
+def get_wikidata_ids():
+    """Returns the resolved mapping as saved by the resolver command."""
+    return load_json(WIKIDATA_IDS_PATH)
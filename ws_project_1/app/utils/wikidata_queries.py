@@ -1,33 +1,15 @@
-def get_club_id_query(club_name):
-
-    if club_name == "Barcelona":
-        type = "Q103229495"
-        club_name = "FC Barcelona"
-    else:
-        type = "Q476028"
-
-    if "Monchengladbach" in club_name:
-        club_name = club_name.replace("Monchengladbach", "Mönchengladbach")
-    elif club_name == "Atlético Madrid":
-        club_name = "Atlético de Madrid"
-    elif club_name == "Bayer Leverkusen":
-        club_name = "Bayer 04 Leverkusen"
-    elif club_name == "Celta Vigo":
-        club_name = "Celta de Vigo"
-    elif club_name == "TSG Hoffenheim":
-        club_name = "TSG 1899 Hoffenheim"
-    elif club_name == "AS Roma":
-        club_name = "A.S. Roma"
-    elif club_name == "Internazionale":
-        club_name = "Inter Milan"
-        
+def get_club_id_query(club_name, club_type="Q476028"):
+    """
+    Returns SPARQL query for fetching club Wikidata ID.
 
-    """Returns SPARQL query for fetching club Wikidata ID."""
+    Name fixes for clubs whose Wikidata label differs from ours are kept in
+    app/data/wikidata_overrides.json (see wikidata_ids.py).
+    """
     return f"""
     SELECT DISTINCT 
         ?club 
     WHERE {{
-        ?club wdt:P31 wd:{type}.
+        ?club wdt:P31 wd:{club_type}.
         ?club rdfs:label ?label .
         FILTER(LANG(?label) = "en")
         FILTER(CONTAINS(LCASE(?label), "{club_name.lower().replace('_', ' ')}"))
@@ -37,16 +19,19 @@ def get_club_id_query(club_name):
     }}
     """
 
-def get_club_details_query(club_id):
-    print(f"Fetching details for club ID: {club_id}")
-    club_id = club_id.replace("http://www.wikidata.org/entity/", "")
-
-    if club_id == 'Q12217':
-        club_id = 'Q8682'
+def get_values(ids):
+    """Returns the `wd:` terms of a list of Wikidata IDs (with or without the entity prefix)."""
+    return " ".join(f"wd:{id.replace('http://www.wikidata.org/entity/', '')}" for id in ids)
 
+def get_club_details_query(club_id):
     """Returns SPARQL query for fetching club details by Wikidata ID."""
+    return get_clubs_details_query([club_id])
+
+def get_clubs_details_query(club_ids):
+    """Returns SPARQL query for fetching the details of several clubs, one group of rows per ?club."""
     return f"""
     SELECT
+        ?club
         (GROUP_CONCAT(DISTINCT ?sponsorInfo; separator=";") AS ?sponsors)
         ?kitInfo
         ?officialName 
@@ -58,7 +43,7 @@ def get_club_details_query(club_id):
         ?stadiumInfo
         (MAX(?followers) AS ?mediaFollowers)
     WHERE {{
-        BIND(wd:{club_id} AS ?club)
+        VALUES ?club {{ {get_values(club_ids)} }}
 
         OPTIONAL {{ 
             ?club wdt:P859 ?sponsorEntity . 
@@ -113,16 +98,20 @@ def get_club_details_query(club_id):
             ?statement ps:P8687 ?followers .
         }}
     }}
-    GROUP BY ?kitInfo ?officialName ?audio ?inception ?presidentInfo ?coachInfo ?stadiumInfo
+    GROUP BY ?club ?kitInfo ?officialName ?audio ?inception ?presidentInfo ?coachInfo ?stadiumInfo
     """
 
 
 
 def get_stadium_details_query(stadium_id):
     """Returns SPARQL query for fetching stadium details by Wikidata ID."""
-    
+    return get_stadiums_details_query([stadium_id])
+
+def get_stadiums_details_query(stadium_ids):
+    """Returns SPARQL query for fetching the details of several stadiums, one group of rows per ?stadium."""
     return f"""
     SELECT 
+        ?stadium
         ?label
         ?name
         ?opening
@@ -132,7 +121,7 @@ def get_stadium_details_query(stadium_id):
         ?categoryName
         (GROUP_CONCAT(DISTINCT ?eventName; separator=";") AS ?events) 
     WHERE {{
-        BIND(wd:{stadium_id} AS ?stadium)        
+        VALUES ?stadium {{ {get_values(stadium_ids)} }}
         
         ?stadium rdfs:label ?label .
         FILTER(LANG(?label) = "en")
@@ -177,11 +166,14 @@ def get_league_id_query(league_name):
     """
 
 def get_league_details_query(league_id):
-    league_id = league_id.replace("http://www.wikidata.org/entity/", "")
-    """Returns SPARQL query for fetching club details by Wikidata ID."""
+    """Returns SPARQL query for fetching league details by Wikidata ID."""
+    return get_leagues_details_query([league_id])
+
+def get_leagues_details_query(league_ids):
+    """Returns SPARQL query for fetching the details of several leagues, one group of rows per ?league."""
     return f"""
-    SELECT ?name ?logo ?numTeams ?website WHERE {{
-    BIND(wd:{league_id} AS ?league)        
+    SELECT ?league ?name ?logo ?numTeams ?website WHERE {{
+    VALUES ?league {{ {get_values(league_ids)} }}
 
     ?league rdfs:label ?name .
     FILTER(LANG(?name) = "en")
@@ -193,11 +185,15 @@ def get_league_details_query(league_id):
     """
 
 def get_league_winners_query(league_id):
-    league_id = league_id.replace("http://www.wikidata.org/entity/", "")
-    """Returns SPARQL query for fetching club details by Wikidata ID."""
+    """Returns SPARQL query for fetching the winners of each season of a league by Wikidata ID."""
+    return get_leagues_winners_query([league_id])
+
+def get_leagues_winners_query(league_ids):
+    """Returns SPARQL query for fetching the season winners of several leagues, one group of rows per ?league."""
     return f"""
-    SELECT ?seasonLabel ?winnerLabel ?team1 ?team1Label WHERE {{
-        ?season wdt:P3450 wd:{league_id};
+    SELECT ?league ?seasonLabel ?winnerLabel ?team1 ?team1Label WHERE {{
+        VALUES ?league {{ {get_values(league_ids)} }}
+        ?season wdt:P3450 ?league;
                 wdt:P580 ?startTime.
 
         OPTIONAL {{ ?season wdt:P1346 ?winner. }}
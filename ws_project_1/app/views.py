@@ -1,63 +1,27 @@
 from django.shortcuts import redirect, render
+from django.urls import reverse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import JsonResponse
-from .utils.sparql_client import add_new_player_position, query_player_club, query_player_details, query_club_details, query_club_players, query_all_players, query_all_clubs, query_graph_data, query_top_players_by_stat, query_top_clubs_by_stat, query_all_nations, create_player, update_player_club, check_player_connection, delete_player
+from .utils.sparql_client import add_new_player_position, query_player_club, query_player_profile, query_club_details, query_club_players, query_all_players, query_players_page, query_players_count, query_all_clubs, query_graph_data, query_top_players_by_stat, query_top_players_by_stats, query_club_enrichment, query_stadium_enrichment, query_league_enrichment, query_top_clubs_by_stats, query_player_percentiles, get_default_stat_ranking_data, query_all_nations, create_player, update_player_club, check_player_connection, delete_player, get_default_player_data
 from .utils.spin_client import (
-    execute_spin_rules, clear_spin_inferences, query_enhanced_player_details, 
-    query_enhanced_all_players, query_player_teammates, query_player_compatriots,
-    query_players_by_classification, query_club_rivals, query_efficiency_leaders,
-    check_enhanced_player_connection
+    query_enhanced_all_players, query_club_rivals, query_clubs_rivals, query_efficiency_leaders,
+    check_enhanced_player_connection, query_player_connections, update_player_spin_inferences
 )
 from .utils.wikidata_client import query_club_details_extra, query_stadium_details, query_league_details, query_league_winners
+from .utils.sparql_transport import get_pool_stats
+from .utils.query_cache import get_cache_stats
+from .utils.wikidata_cache import get_wikidata_cache_stats
+from .utils.read_model import get_read_model_stats
+from .utils.spin_state import get_spin_state, is_spin_active
+from .utils.spin_jobs import start_spin_toggle, get_spin_job
+from .utils.concurrent_queries import run_concurrently
 from unidecode import unidecode
 
-# Global variable to track SPIN rules state
-SPIN_RULES_ACTIVE = False
-
 def player_detail(request, player_id):
-    # Get player data from the SPARQL endpoint
-    if SPIN_RULES_ACTIVE:
-        enhanced_data = query_enhanced_player_details(player_id)
-        if enhanced_data:
-            # Merge enhanced data with base player data
-            player_data = query_player_details(player_id)
-            player_data["spin_inferences"] = enhanced_data["spin_inferences"]
-            
-            # Add efficiency as a stat if available
-            if "efficiency" in enhanced_data["spin_inferences"]:
-                efficiency_value = enhanced_data["spin_inferences"]["efficiency"]
-                
-                # Find the Attacking category
-                attacking_category = None
-                for category in player_data["stats"]:
-                    if category["name"] == "Attacking":
-                        attacking_category = category
-                        break
-                
-                if attacking_category:
-                    # Check if efficiency stat already exists
-                    efficiency_stat_exists = any(stat["name"] == "Efficiency" for stat in attacking_category["stats"])
-                    if not efficiency_stat_exists:
-                        # Add efficiency stat to the Attacking category with SPIN badge flag
-                        attacking_category["stats"].append({
-                            "name": "Efficiency",
-                            "value": efficiency_value,
-                            "is_spin_stat": True  # Flag to show SPIN badge
-                        })
-                    else:
-                        # Update existing efficiency stat with spin stat
-                        for stat in attacking_category["stats"]:
-                            if stat["name"] == "Efficiency":
-                                stat["is_spin_stat"] = True
+    spin_active = is_spin_active()
 
-            
-            # Add SPIN rule related data
-            player_data["teammates"] = query_player_teammates(player_id)
-            player_data["compatriots"] = query_player_compatriots(player_id)
-        else:
-            player_data = query_player_details(player_id)
-    else:
-        player_data = query_player_details(player_id)
+    # Get player data (details, stats and SPIN inferences) in a single SPARQL request
+    player_data = query_player_profile(player_id, include_spin=spin_active)
 
     available_clubs = query_all_clubs()
     position_mapping = {
@@ -77,6 +41,8 @@ def player_detail(request, player_id):
     })
 
 def club_detail(request, club_id):
+    spin_active = is_spin_active()
+
     # Get club data from the SPARQL endpoint
     club_data = query_club_details(club_id)
     
@@ -100,7 +66,7 @@ def club_detail(request, club_id):
     club_data["players"] = formatted_players
     
     # Add SPIN rule enhanced data if active
-    if SPIN_RULES_ACTIVE:
+    if spin_active:
         # Add rival clubs information
         rivals = query_club_rivals(club_id)
         club_data["rivals"] = rivals[:5]  # Show top 5 rivals
@@ -110,7 +76,7 @@ def club_detail(request, club_id):
         club_data["has_rivals"] = False
     
     # Add SPIN rules status for template
-    club_data["spin_rules_active"] = SPIN_RULES_ACTIVE
+    club_data["spin_rules_active"] = spin_active
     
     # Log the club data
     print(club_data)
@@ -125,15 +91,21 @@ def club_wikidata_details(request, club_id):
         return JsonResponse({'success': False, 'message': 'Invalid request method'})
     
     try:
-        # Get basic club data to extract the name
-        club_data = query_club_details(club_id)
-        club_name = club_data.get("name", "")
-        
-        if not club_name:
-            return JsonResponse({'success': False, 'message': 'Club not found'})
-        
-        # Get club data from WikiData
-        club_extra_data = query_club_details_extra(club_name)
+        # Club name and Wikidata details in one local query, when they were materialized in GraphDB
+        enrichment = query_club_enrichment(club_id)
+
+        if enrichment:
+            club_extra_data = enrichment["details"]
+        else:
+            # Get basic club data to extract the name
+            club_data = query_club_details(club_id)
+            club_name = club_data.get("name", "")
+            
+            if not club_name:
+                return JsonResponse({'success': False, 'message': 'Club not found'})
+            
+            # Get club data from WikiData
+            club_extra_data = query_club_details_extra(club_name, club_id)
         
         if club_extra_data:
             # Process the data for JSON response
@@ -166,18 +138,22 @@ def club_wikidata_details(request, club_id):
         })
 
 def stadium_detail(request, stadium_id):
-    # Get stadium data from the SPARQL endpoint
-    stadium_data = query_stadium_details(stadium_id)
+    # Get stadium data from GraphDB when it was materialized, from Wikidata otherwise
+    stadium_data = query_stadium_enrichment(stadium_id) or query_stadium_details(stadium_id)
 
     return render(request, "stadium.html", {"entity": stadium_data})
 
 def league_detail(request, league_name):
-    # Get league data from the SPARQL endpoint
-    league_data = query_league_details(league_name)
+    # Get league data (and its winners) from GraphDB when it was materialized
+    league_data = query_league_enrichment(league_name)
+
+    if league_data is None:
+        # Otherwise from Wikidata
+        league_data = query_league_details(league_name)
 
-    league_winners = query_league_winners(league_data["id"])
-    if league_winners:
-        league_data["winners"] = league_winners
+        league_winners = query_league_winners(league_data["id"])
+        if league_winners:
+            league_data["winners"] = league_winners
 
     return render(request, "league.html", {"entity": league_data})
 
@@ -194,18 +170,19 @@ def dashboard(request):
         yellow cards
         red cards
     """
+    spin_active = is_spin_active()
 
     stats_to_get = [
-        {"id": "mp",  "both_entities": False},
-        {"id": "gls", "both_entities": True},
-        {"id": "ast", "both_entities": False},
-        {"id": "pk", "both_entities": True},
-        {"id": "cmp_stats_passing_types", "both_entities": True},
-        {"id": "fls", "both_entities": True},
-        {"id": "saves", "both_entities": False},
-        {"id": "cs",  "both_entities": False},
-        {"id": "crdy",  "both_entities": True},
-        {"id": "crdr",  "both_entities": True}
+        {"id": "mp", "name": "Matches Played", "both_entities": False},
+        {"id": "gls", "name": "Goals", "both_entities": True},
+        {"id": "ast", "name": "Assists", "both_entities": False},
+        {"id": "pk", "name": "Penalties Scored", "both_entities": True},
+        {"id": "cmp_stats_passing_types", "name": "Passes Completed", "both_entities": True},
+        {"id": "fls", "name": "Fouls Committed", "both_entities": True},
+        {"id": "saves", "name": "Saves", "both_entities": False},
+        {"id": "cs", "name": "Clean Sheets", "both_entities": False},
+        {"id": "crdy", "name": "Yellow Cards", "both_entities": True},
+        {"id": "crdr", "name": "Red Cards", "both_entities": True}
     ]
 
     stats = [
@@ -218,19 +195,32 @@ def dashboard(request):
             "stats": []
         }
     ]
-    
+
+    # One query per entity fetches every leaderboard; they run concurrently and
+    # a slow or failing one leaves its cards empty
+    player_stat_ids = [stat_to_get["id"] for stat_to_get in stats_to_get]
+    club_stat_ids = [stat_to_get["id"] for stat_to_get in stats_to_get if stat_to_get["both_entities"]]
+
+    calls = {
+        "Player": (query_top_players_by_stats, (player_stat_ids,)),
+        "Club": (query_top_clubs_by_stats, (club_stat_ids,)),
+    }
+    if spin_active:
+        calls["efficiency"] = (query_efficiency_leaders, (10,))
+
+    results = run_concurrently(calls, default=lambda key: {})
 
     for stat_to_get in stats_to_get:
         if stat_to_get["both_entities"]:
-            clubs = query_top_clubs_by_stat(stat_to_get["id"])
+            clubs = results["Club"].get(stat_to_get["id"]) or get_default_stat_ranking_data(stat_to_get["name"])
             stats[1]["stats"].append(clubs)
-        players = query_top_players_by_stat(stat_to_get["id"])
+        players = results["Player"].get(stat_to_get["id"]) or get_default_stat_ranking_data(stat_to_get["name"])
         stats[0]["stats"].append(players)
 
     # Add SPIN rule enhanced data if active
-    if SPIN_RULES_ACTIVE:
+    if spin_active:
         # Add efficiency leaders section
-        efficiency_leaders_data = query_efficiency_leaders(10)
+        efficiency_leaders_data = results["efficiency"]
         if efficiency_leaders_data and efficiency_leaders_data.get("entities"):
             stats[0]["stats"].insert(0, efficiency_leaders_data)
 
@@ -239,6 +229,7 @@ def dashboard(request):
     return render(request, "dashboard.html", {"stats": stats})
 
 def players(request):
+    spin_active = is_spin_active()
 
     if request.method == "POST":
 
@@ -251,13 +242,35 @@ def players(request):
         id = unidecode(name).lower().replace(" ", "_")
 
 
-        create_player(id, name, born, positions, photo_url, nation, club)
+        if create_player(id, name, born, positions, photo_url, nation, club) and is_spin_active():
+            update_player_spin_inferences([id])
 
         return redirect("players")
 
+    # Filtering
+    search_name = request.GET.get("name", "").strip().lower()
+    position = request.GET.get("position", "").strip().lower()
+    club = request.GET.get("club", "").strip().lower()
+    nation = request.GET.get("nation", "").strip().lower()
+
+    filters = {"name": search_name, "position": position, "club": club, "nation": nation}
+
+    # Pagination (filters, ordering and paging run in SPARQL; only the current page is fetched)
+    paginator = Paginator(range(query_players_count(filters)), 15)
+    page = request.GET.get("page", 1)
+
+    try:
+        players_page = paginator.page(page)
+    except PageNotAnInteger:
+        players_page = paginator.page(1)
+    except EmptyPage:
+        players_page = paginator.page(paginator.num_pages)
+
+    offset = (players_page.number - 1) * paginator.per_page
+
     # Use enhanced query if SPIN rules are active
-    if SPIN_RULES_ACTIVE:
-        players_data = query_enhanced_all_players()
+    if spin_active:
+        players_data = query_players_page(paginator.per_page, offset, filters, include_spin=True) or []
         
         # Process enhanced data for template compatibility
         for player in players_data:
@@ -332,36 +345,12 @@ def players(request):
                         "icon": "fas fa-chart-line"
                     })
     else:
-        players_data = query_all_players() 
-
-    # Filtering
-    search_name = request.GET.get("name", "").strip().lower()
-    position = request.GET.get("position", "").strip().lower()
-    club = request.GET.get("club", "").strip().lower()
-    nation = request.GET.get("nation", "").strip().lower()
-
-    if search_name:
-        players_data = [p for p in players_data if search_name in p["name"].lower()]
-    if position:
-        players_data = [p for p in players_data if position in [pos.lower() for pos in p["positions"]]]
-    if club:
-        players_data = [p for p in players_data if club in p["current_club"].lower()]
-    if nation:
-        players_data = [p for p in players_data if nation in p["nation"].lower()]
+        players_data = query_players_page(paginator.per_page, offset, filters) or []
 
     for player in players_data:
             player["positions"] = ", ".join(player["positions"])
 
-    # Pagination
-    paginator = Paginator(players_data, 15)
-    page = request.GET.get("page", 1)
-
-    try:
-        players_page = paginator.page(page)
-    except PageNotAnInteger:
-        players_page = paginator.page(1)
-    except EmptyPage:
-        players_page = paginator.page(paginator.num_pages)
+    players_page.object_list = players_data
 
     nations = query_all_nations()
     clubs = query_all_clubs()
@@ -377,14 +366,9 @@ def players(request):
     })
 
 def clubs(request):
+    spin_active = is_spin_active()
+
     clubs_data = query_all_clubs()
-    
-    # Add SPIN rule enhanced data if active
-    if SPIN_RULES_ACTIVE:
-        for club in clubs_data:
-            # Add rival clubs information
-            rivals = query_club_rivals(club["id"])
-            club["rivals"] = rivals[:3]  # Show top 3 rivals
 
     search_name = request.GET.get("name", "").strip().lower()
     league = request.GET.get("league", "").strip().lower()
@@ -405,6 +389,13 @@ def clubs(request):
     except EmptyPage:
         clubs_page = paginator.page(paginator.num_pages)
 
+    # Add SPIN rule enhanced data if active
+    if spin_active:
+        # Add rival clubs information, fetched in one query for the clubs on this page
+        rivals_by_club = query_clubs_rivals([club["id"] for club in clubs_page])
+        for club in clubs_page:
+            club["rivals"] = rivals_by_club.get(club["id"], [])[:3]  # Show top 3 rivals
+
     return render(request, "clubs.html", {
         "entities_list": clubs_page,
         "search_name": search_name,
@@ -433,7 +424,8 @@ def add_club_to_player(request, player_id):
 
         current_club = query_player_club(player_id)
 
-        update_player_club(player_id, current_club, club_id)
+        if update_player_club(player_id, current_club, club_id) and is_spin_active():
+            update_player_spin_inferences([player_id])
 
         return redirect("player", player_id=player_id)
 
@@ -447,7 +439,8 @@ def add_position_to_player(request, player_id):
         if not position:
             return redirect("player", player_id=player_id)
 
-        add_new_player_position(player_id, position)
+        if add_new_player_position(player_id, position) and is_spin_active():
+            update_player_spin_inferences([player_id])
 
         # Redirect back to player detail page
         return redirect("player", player_id=player_id)
@@ -456,6 +449,8 @@ def player_connection_checker(request):
     """
     View for checking connections between two players using SPARQL ASK query
     """
+    spin_active = is_spin_active()
+
     # Initialize variables
     results = None
     player_list = None
@@ -463,7 +458,7 @@ def player_connection_checker(request):
     player2_id = request.GET.get("player2")
     
     # Get the list of all players for the selection dropdowns
-    if SPIN_RULES_ACTIVE:
+    if spin_active:
         player_list = query_enhanced_all_players()
         # Format for template compatibility
         for player in player_list:
@@ -473,22 +468,34 @@ def player_connection_checker(request):
     
     # If both players are selected, check connections
     if player1_id and player2_id:
+        # All connection types and both player profiles are fetched concurrently,
+        # one query each (the profiles include the SPIN inferences when active, but
+        # not the teammate/compatriot lists: the connection flags already cover them)
+        fetched = run_concurrently({
+            "connections": (query_player_connections, (player1_id, player2_id, spin_active)),
+            "player1": (query_player_profile, (player1_id, spin_active, False)),
+            "player2": (query_player_profile, (player2_id, spin_active, False)),
+        })
+        connection_flags = fetched["connections"]
+        player1_data = fetched["player1"] or get_default_player_data()
+        player2_data = fetched["player2"] or get_default_player_data()
+
         # Use enhanced connection checking if SPIN rules are active
-        if SPIN_RULES_ACTIVE:
-            enhanced_results = check_enhanced_player_connection(player1_id, player2_id)
-            results = check_player_connection(player1_id, player2_id)
+        if spin_active:
+            enhanced_results = check_enhanced_player_connection(player1_id, player2_id, connection_flags)
+            results = check_player_connection(player1_id, player2_id, connection_flags or {})
             
             # Merge enhanced connections
             if enhanced_results and enhanced_results.get("spin_connections"):
                 results["spin_connections"] = enhanced_results["spin_connections"]
         else:
-            results = check_player_connection(player1_id, player2_id)
+            results = check_player_connection(player1_id, player2_id, connection_flags or {})
         
         # Calculate connection status properly
         standard_connections_exist = any(conn["exists"] for conn in results["connections"].values())
         spin_connections_exist = False
         
-        if SPIN_RULES_ACTIVE and results.get("spin_connections"):
+        if spin_active and results.get("spin_connections"):
             spin_connections_exist = any(conn["exists"] for conn in results["spin_connections"].values())
         
         # Update connection flags
@@ -496,70 +503,10 @@ def player_connection_checker(request):
         results["has_spin_connections"] = spin_connections_exist
         results["has_connection"] = standard_connections_exist or spin_connections_exist
         
-        # Get player details for the results display
-        player1_data = query_player_details(player1_id)
-        player2_data = query_player_details(player2_id)
-        
         # Add SPIN inference data if available
-        if SPIN_RULES_ACTIVE:
-            enhanced_player1 = query_enhanced_player_details(player1_id)
-            enhanced_player2 = query_enhanced_player_details(player2_id)
-            
-            if enhanced_player1:
-                player1_data["spin_inferences"] = enhanced_player1["spin_inferences"]
-                
-                # Add efficiency as a stat if available
-                if "efficiency" in enhanced_player1["spin_inferences"]:
-                    efficiency_value = enhanced_player1["spin_inferences"]["efficiency"]
-                    
-                    # Find the Attacking category
-                    attacking_category = None
-                    for category in player1_data["stats"]:
-                        if category["name"] == "Attacking":
-                            attacking_category = category
-                            break
-                    
-                    efficiency_stat_exists = any(stat["name"] == "Efficiency" for stat in attacking_category["stats"])
-                    if not efficiency_stat_exists:
-                        # Add efficiency stat to the Attacking category with SPIN badge flag
-                        attacking_category["stats"].append({
-                            "name": "Efficiency",
-                            "value": efficiency_value,
-                            "is_spin_stat": True  # Flag to show SPIN badge
-                        })
-                    else:
-                        # Update existing efficiency stat with spin stat
-                        for stat in attacking_category["stats"]:
-                            if stat["name"] == "Efficiency":
-                                stat["is_spin_stat"] = True
-                        
-            if enhanced_player2:
-                player2_data["spin_inferences"] = enhanced_player2["spin_inferences"]
-                
-                # Add efficiency as a stat if available
-                if "efficiency" in enhanced_player2["spin_inferences"]:
-                    efficiency_value = enhanced_player2["spin_inferences"]["efficiency"]
-                    
-                    # Find the Attacking category
-                    attacking_category = None
-                    for category in player2_data["stats"]:
-                        if category["name"] == "Attacking":
-                            attacking_category = category
-                            break
-                    
-                    efficiency_stat_exists = any(stat["name"] == "Efficiency" for stat in attacking_category["stats"])
-                    if not efficiency_stat_exists:
-                        # Add efficiency stat to the Attacking category with SPIN badge flag
-                        attacking_category["stats"].append({
-                            "name": "Efficiency",
-                            "value": efficiency_value,
-                            "is_spin_stat": True  # Flag to show SPIN badge
-                        })
-                    else:
-                        # Update existing efficiency stat with spin stat
-                        for stat in attacking_category["stats"]:
-                            if stat["name"] == "Efficiency":
-                                stat["is_spin_stat"] = True
+        if spin_active:
+            enhanced_player1 = player1_data if "spin_inferences" in player1_data else None
+            enhanced_player2 = player2_data if "spin_inferences" in player2_data else None
             
             # Check for SPIN property connections
             if enhanced_player1 and enhanced_player2:
@@ -686,7 +633,7 @@ def player_connection_checker(request):
         "results": results,
         "selected_player1": player1_id,
         "selected_player2": player2_id,
-        "spin_rules_active": SPIN_RULES_ACTIVE,
+        "spin_rules_active": spin_active,
     })
 
 def check_spin_property_connections(player1_inferences, player2_inferences):
@@ -761,66 +708,132 @@ def delete_player_view(request, player_id):
 def toggle_spin_rules(request):
     """
     Toggle SPIN rules activation state and execute/clear rules accordingly.
+
+    A POST starts a background job (see spin_jobs.py) and answers right away
+    with its id; the job's progress and result are read from spin_job_status.
+    The state is shared by every worker through a marker in GraphDB (see spin_state.py).
     """
-    global SPIN_RULES_ACTIVE
-    
     if request.method == "POST":
-        SPIN_RULES_ACTIVE = not SPIN_RULES_ACTIVE
-        
         try:
-            if SPIN_RULES_ACTIVE:
-                # Execute SPIN rules
-                success = execute_spin_rules()
-                if success:
-                    message = "SPIN rules activated and executed successfully"
-                else:
-                    # Rollback state if execution failed
-                    SPIN_RULES_ACTIVE = False
-                    message = "Failed to execute SPIN rules"
-                    return JsonResponse({
-                        'success': False,
-                        'spin_rules_active': SPIN_RULES_ACTIVE,
-                        'message': message
-                    })
-            else:
-                # Clear SPIN rule inferences
-                success = clear_spin_inferences()
-                if success:
-                    message = "SPIN rules deactivated and inferences cleared"
-                else:
-                    # Rollback state if clearing failed
-                    SPIN_RULES_ACTIVE = True
-                    message = "Failed to clear SPIN rule inferences"
-                    return JsonResponse({
-                        'success': False,
-                        'spin_rules_active': SPIN_RULES_ACTIVE,
-                        'message': message
-                    })
-            
-            return JsonResponse({
-                'success': True,
-                'spin_rules_active': SPIN_RULES_ACTIVE,
-                'message': message
-            })
-            
+            job, created = start_spin_toggle()
         except Exception as e:
-            # Rollback state on any exception
-            SPIN_RULES_ACTIVE = not SPIN_RULES_ACTIVE
             return JsonResponse({
                 'success': False,
-                'spin_rules_active': SPIN_RULES_ACTIVE,
+                'spin_rules_active': is_spin_active(),
                 'message': f"Error toggling SPIN rules: {str(e)}"
             })
+
+        return JsonResponse({
+            'success': True,
+            'job_id': job['id'],
+            'action': job['action'],
+            'status': job['status'],
+            'status_url': reverse('spin_job_status', args=[job['id']]),
+            'message': f"SPIN rules job started ({job['action']})" if created else "A SPIN rules job is already running"
+        }, status=202 if created else 409)
     
     elif request.method == "GET":
         # Return the current status of SPIN rules
+        state = get_spin_state()
         return JsonResponse({
             'success': True,
-            'spin_rules_active': SPIN_RULES_ACTIVE,
+            'spin_rules_active': state['active'],
+            'spin_state_version': state['version'],
             'message': 'Current SPIN rules status retrieved successfully'
         })
     
     return JsonResponse({
         'success': False,
         'message': 'Invalid request method'
-    })
\ No newline at end of file
+    })
+
+def spin_job_status(request, job_id):
+    """
+    Return the progress of a SPIN toggle job: its status, the status and
+    timing of each rule, the elapsed time and, once finished, the result.
+    """
+    job = get_spin_job(job_id)
+    if job is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Unknown or expired SPIN rules job'
+        }, status=404)
+
+    return JsonResponse({
+        'success': True,
+        'job_id': job['id'],
+        'action': job['action'],
+        'status': job['status'],
+        'created_at': job['created_at'],
+        'finished_at': job['finished_at'],
+        'elapsed': job['elapsed'],
+        'completed': job['completed'],
+        'total': job['total'],
+        'rules': job['rules'],
+        'result': job['result']
+    })
+
+def sparql_pool_stats(request):
+    """
+    Return connection pool statistics for the SPARQL endpoints, so connection
+    reuse can be checked under load.
+    """
+    return JsonResponse({
+        'success': True,
+        'pools': get_pool_stats()
+    })
+
+def sparql_cache_stats(request):
+    """
+    Return hit/miss counters of the SPARQL result cache and of the on-disk
+    Wikidata cache for each query family.
+    """
+    return JsonResponse({
+        'success': True,
+        'cache': get_cache_stats(),
+        'wikidata': get_wikidata_cache_stats()
+    })
+
+def read_model_stats(request):
+    """
+    Return the state of the in-process read model snapshot.
+    """
+    return JsonResponse({
+        'success': True,
+        'read_model': get_read_model_stats()
+    })
+
+def player_percentiles(request, player_id):
+    """
+    Return the percentile rank of each stat of a player among players of the same position.
+
+    Query params: per90=1 to rank values per 90 minutes played.
+    """
+    per90 = request.GET.get('per90') == '1'
+    percentiles = query_player_percentiles(player_id, per90=per90)
+    if percentiles is None:
+        return JsonResponse({'success': False, 'message': 'Player not found or stats unavailable'})
+
+    return JsonResponse({
+        'success': True,
+        'per90': per90,
+        'percentiles': percentiles
+    })
+
+def stat_leaderboard(request, stat_id):
+    """
+    Return the top players of a stat.
+
+    Query params: limit (default 10, max 100), per90=1 to rank by value per 90 minutes.
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 100)
+    except ValueError:
+        limit = 10
+    per90 = request.GET.get('per90') == '1'
+
+    return JsonResponse({
+        'success': True,
+        'per90': per90,
+        'players': query_top_players_by_stat(stat_id, limit, per90=per90)
+    })
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'app',
 ]
 
 MIDDLEWARE = [
@@ -83,6 +84,35 @@ DATABASES = {
 }
 
 
+# Caches
+# The "sparql" cache holds read query results; it is cleared on every write to GraphDB
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # With several worker processes this must be a shared backend (e.g.
+    # django.core.cache.backends.redis.RedisCache): the generation counter that
+    # invalidates the results after a write lives in this cache too
+    'sparql': {
+        'BACKEND': os.environ.get('SPARQL_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SPARQL_CACHE_LOCATION', 'sparql-results'),
+        'TIMEOUT': int(os.environ.get('SPARQL_CACHE_TTL', '300')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('SPARQL_CACHE_MAX_ENTRIES', '500')),
+        },
+    },
+    # SPIN toggle jobs (records and the lock allowing one job at a time). With
+    # several worker processes this must be a shared backend too, or status
+    # polls miss jobs started by other workers and two toggles can run at once
+    'spin_jobs': {
+        'BACKEND': os.environ.get('SPIN_JOBS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SPIN_JOBS_CACHE_LOCATION', 'spin-jobs'),
+        'TIMEOUT': None,
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -24,6 +24,7 @@ from django.contrib.staticfiles.storage import staticfiles_storage
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("player/<str:player_id>", player_detail, name="player"),
+    path("player/<str:player_id>/percentiles/", player_percentiles, name="player_percentiles"),
     path("club/<str:club_id>", club_detail, name="club"),
     path("club/<str:club_id>/wikidata/", club_wikidata_details, name="club_wikidata_details"),
     path("players", players, name="players"),
@@ -35,6 +36,11 @@ urlpatterns = [
     path("player-connection/", player_connection_checker, name="player_connection"),
     path('players/<str:player_id>/delete/', delete_player_view, name='delete_player'),
     path('toggle-spin-rules/', toggle_spin_rules, name='toggle_spin_rules'),
+    path('spin-jobs/<str:job_id>/', spin_job_status, name='spin_job_status'),
+    path('sparql-pool-stats/', sparql_pool_stats, name='sparql_pool_stats'),
+    path('sparql-cache-stats/', sparql_cache_stats, name='sparql_cache_stats'),
+    path('read-model-stats/', read_model_stats, name='read_model_stats'),
+    path('stats/<str:stat_id>/leaderboard/', stat_leaderboard, name='stat_leaderboard'),
     path('favicon.ico', RedirectView.as_view(url=staticfiles_storage.url('images/favicon.ico')), name='favicon'),
     path('stadium/<str:stadium_id>', stadium_detail, name='stadium'),
     path('league/<str:league_name>', league_detail, name='league'),